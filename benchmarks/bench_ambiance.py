@@ -0,0 +1,56 @@
+# bench_ambiance.py - Débit de l'effet ambiance : lecture rawvideo + extraction + lissage + seuil ΔE
+#
+# Usage: python benchmarks/bench_ambiance.py [--frames 300]
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from commun.led_ambiance import ambient_colors, numpy_available, rawvideo_frames  # noqa: E402
+
+RESOLUTIONS = ((1920, 1080), (1280, 720), (160, 90))
+
+
+def synthetic_video(width, height, frames):
+    """Dégradé qui dérive lentement + bruit, rgb24 brut"""
+    import numpy as np
+    rng = np.random.default_rng(0)
+    base = np.zeros((height, width, 3), dtype=np.uint8)
+    base[..., 0] = np.linspace(0, 255, width, dtype=np.uint8)
+    data = bytearray()
+    for index in range(frames):
+        frame = base.copy()
+        frame[..., 1] = (index * 3) % 256
+        frame[::8, ::8, 2] = rng.integers(0, 255, frame[::8, ::8, 2].shape, dtype=np.uint8)
+        data += frame.tobytes()
+    return bytes(data)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=300)
+    args = parser.parse_args()
+
+    if not numpy_available():
+        print("NumPy n'est pas installé : pip install numpy")
+        return
+
+    for width, height in RESOLUTIONS:
+        video = synthetic_video(width, height, args.frames)
+        for mode in ('average', 'dominant'):
+            stream = io.BytesIO(video)
+            start = time.process_time()
+            sent = sum(1 for _ in ambient_colors(rawvideo_frames(stream, width, height), 30, mode))
+            cpu = time.process_time() - start
+            fps = args.frames / cpu if cpu else float('inf')
+            print(
+                f"{width}x{height} {mode:8s}: {cpu / args.frames * 1000:6.2f} ms/image, "
+                f"{fps:7.0f} images/s sur un cœur ({'OK' if fps >= 30 else 'trop lent'} pour 30 i/s), "
+                f"{sent} couleurs envoyées sur {args.frames}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# bench_audio.py - Coût CPU de l'effet audio par seconde de son (FFT NumPy + lissage + couleur)
+#
+# Usage: python benchmarks/bench_audio.py [--seconds 60] [--rate 44100] [--channels 2]
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from commun.led_audio import FFT_SIZE, PcmSource, audio_frames, numpy_available  # noqa: E402
+
+
+def synthetic_pcm(seconds, rate, channels):
+    """Basse pulsée + aigus intermittents + attaques de bruit, s16le entrelacé"""
+    import numpy as np
+    t = np.arange(int(seconds * rate)) / rate
+    signal = 0.3 * np.sin(2 * np.pi * 60 * t) * (np.sin(2 * np.pi * 2 * t) > 0)
+    signal += 0.1 * np.sin(2 * np.pi * 3000 * t) * (np.sin(2 * np.pi * 0.25 * t) > 0)
+    rng = np.random.default_rng(0)
+    for start in range(0, len(t), rate // 2):
+        signal[start:start + 500] += rng.standard_normal(len(signal[start:start + 500])) * 0.5
+    pcm = (np.clip(signal, -1, 1) * 32767).astype('<i2')
+    return np.repeat(pcm, channels).tobytes()
+
+
+def memory_source(data, rate, channels):
+    position = 0
+
+    def read(size):
+        nonlocal position
+        chunk = data[position:position + size]
+        position += len(chunk)
+        return chunk
+
+    return PcmSource(read, rate, channels)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=60)
+    parser.add_argument('--rate', type=int, default=44100)
+    parser.add_argument('--channels', type=int, default=2)
+    args = parser.parse_args()
+
+    if not numpy_available():
+        print("NumPy n'est pas installé : pip install numpy")
+        return
+
+    data = synthetic_pcm(args.seconds, args.rate, args.channels)
+    print(f"{args.seconds:.0f} s de son, {args.rate} Hz, {args.channels} canal(aux), FFT {FFT_SIZE}")
+
+    for fps in (10, 20, 43):
+        source = memory_source(data, args.rate, args.channels)
+        start = time.process_time()
+        frames = sum(1 for _ in audio_frames(source, fps))
+        cpu = time.process_time() - start
+        print(
+            f"{fps:3d} frames/s : {cpu / args.seconds * 1000:6.2f} ms CPU par seconde de son "
+            f"({cpu / args.seconds * 100:5.2f} % d'un cœur), {frames / args.seconds:5.1f} couleurs émises/s"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# bench_client.py - Appels/s : une connexion par appel (urllib) vs client keep-alive et lots
+#
+# Lance le serveur en simulation sur un port local (ou vise --url) puis mesure :
+#   urllib           : nouvelle connexion TCP à chaque appel (scripts actuels)
+#   LEDClient        : appels successifs sur une connexion keep-alive
+#   AsyncLEDClient   : --concurrency appels lancés ensemble (regroupés dans /api/batch)
+#
+# Usage:
+#   python benchmarks/bench_client.py [--calls 500] [--concurrency 16]
+#   python benchmarks/bench_client.py --url http://192.168.1.20:5000
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'serveur'))
+from client.led_client import AsyncLEDClient, LEDClient  # noqa: E402
+
+
+def start_server():
+    """Serveur en simulation sur un port libre (waitress si installé, comme en production). Retourne son URL"""
+    os.environ['LED_SIMULATION'] = 'true'
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    # Mesure du client : le contrôle d'admission limiterait les prévisualisations
+    os.environ['ADMISSION_ENABLED'] = 'false'
+    import led_serveur
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # une ligne par requête sinon
+    led_serveur.pool.start()
+    if led_serveur.waitress is not None:
+        from waitress.server import create_server
+        server = create_server(led_serveur.app, host='127.0.0.1', port=0, threads=led_serveur.HTTP_THREADS)
+        port = server.effective_port
+        threading.Thread(target=server.run, daemon=True).start()
+    else:
+        print("⚠️ waitress absent : le serveur de développement ferme chaque connexion (pas de keep-alive)")
+        from werkzeug.serving import make_server
+        server = make_server('127.0.0.1', 0, led_serveur.app, threaded=True)
+        port = server.server_port
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}"
+
+
+def bench_urllib(url, calls, path, body):
+    data = None if body is None else json.dumps(body).encode()
+    start = time.perf_counter()
+    for _ in range(calls):
+        request = urllib.request.Request(url + path, data=data, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request) as response:
+            json.load(response)
+    return calls / (time.perf_counter() - start)
+
+
+def bench_sync(url, calls, call):
+    with LEDClient(url) as leds:
+        start = time.perf_counter()
+        for _ in range(calls):
+            call(leds)
+        rate = calls / (time.perf_counter() - start)
+        return rate, leds.client_stats()
+
+
+async def bench_async(url, calls, concurrency, call):
+    async with AsyncLEDClient(url) as leds:
+        start = time.perf_counter()
+        for _ in range(calls // concurrency):
+            await asyncio.gather(*(call(leds) for _ in range(concurrency)))
+        rate = calls // concurrency * concurrency / (time.perf_counter() - start)
+        return rate, leds.client_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', help="Serveur existant (sinon : serveur simulé local)")
+    parser.add_argument('--calls', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+    url = args.url or start_server()
+
+    # Lecture d'état (sans Bluetooth) et prévisualisation (écriture qui n'attend pas le Bluetooth)
+    scenarios = [
+        ('state', '/api/state', None, lambda leds: leds.state()),
+        ('preview', '/api/preview', {'brightness': 50}, lambda leds: leds.preview(brightness=50)),
+    ]
+    print(f"Serveur : {url} ; {args.calls} appels par mesure\n")
+    print(f"{'appel':<10}{'urllib':>12}{'keep-alive':>14}{'asyncio+lots':>15}   aller-retours (lots)")
+    for name, path, body, call in scenarios:
+        cold = bench_urllib(url, args.calls, path, body)
+        warm, sync_stats = bench_sync(url, args.calls, call)
+        batched, async_stats = asyncio.run(bench_async(url, args.calls, args.concurrency, call))
+        print(
+            f"{name:<10}{cold:>9.0f}/s{warm:>11.0f}/s{batched:>12.0f}/s   "
+            f"{sync_stats['connections']} connexion(s) ; {async_stats['round_trips']} ({async_stats['batches']})"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# bench_connexion.py - Temps de connexion BLE avec et sans le registre d'appareils
+#
+# Usage:
+#   python benchmarks/bench_connexion.py --address AA:BB:CC:DD:EE:FF [--runs 5]
+#   python benchmarks/bench_connexion.py --simulation [--scan-ms 1500]
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'serveur'))
+from commun.led_registre import DeviceRegistry  # noqa: E402
+
+
+async def connect_once(registry, address, client_class, scanner_class, timeout):
+    """Une connexion complète (découverte éventuelle comprise). Retourne (secondes, cache utilisé)"""
+    start = time.perf_counter()
+    target, cached = await registry.resolve(address, scanner_class, timeout)
+    client = client_class(target, timeout=timeout)
+    await client.connect()
+    elapsed = time.perf_counter() - start
+    await client.disconnect()
+    return elapsed, cached
+
+
+async def run(args, client_class, scanner_class):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ('discovery', 'cached'):
+            times = []
+            for run_index in range(args.runs):
+                # Sans cache : registre vide à chaque connexion ; avec : registre rempli par un scan
+                registry = DeviceRegistry(Path(directory) / f'{mode}-{run_index}.json')
+                if mode == 'cached':
+                    await registry.scan(scanner_class, timeout=args.scan_timeout)
+                elapsed, cached = await connect_once(registry, args.address, client_class, scanner_class, args.timeout)
+                if cached != (mode == 'cached'):
+                    print(f"  ⚠️ {mode}: l'appareil n'a pas été trouvé par le scan préalable")
+                times.append(elapsed)
+                await asyncio.sleep(args.pause)
+            results[mode] = times
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--address', default='AA:00:00:00:00:01')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=15.0)
+    parser.add_argument('--scan-timeout', type=float, default=5.0)
+    parser.add_argument('--pause', type=float, default=1.0, help="Attente entre deux connexions (s)")
+    parser.add_argument('--simulation', action='store_true', help="Transport simulé (découverte de --scan-ms)")
+    parser.add_argument('--scan-ms', type=float, default=1500, help="Durée simulée d'une découverte")
+    args = parser.parse_args()
+
+    if args.simulation:
+        os.environ['LED_SIMULATION_SCAN_MS'] = str(args.scan_ms)
+        from led_simulation import SimulatedBleakClient, SimulatedBleakScanner
+        SimulatedBleakScanner.advertise(args.address)
+        client_class, scanner_class = SimulatedBleakClient, SimulatedBleakScanner
+        args.pause = 0
+    else:
+        from bleak import BleakClient, BleakScanner
+        client_class, scanner_class = BleakClient, BleakScanner
+
+    results = asyncio.run(run(args, client_class, scanner_class))
+    for mode, times in results.items():
+        label = 'sans cache (découverte)' if mode == 'discovery' else 'avec cache (registre)  '
+        print(
+            f"{label}: médiane {statistics.median(times) * 1000:7.1f} ms, "
+            f"min {min(times) * 1000:7.1f} ms, max {max(times) * 1000:7.1f} ms ({len(times)} connexions)"
+        )
+
+
+if __name__ == '__main__':
+    main()
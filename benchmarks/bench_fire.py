@@ -0,0 +1,65 @@
+# bench_fire.py - Coût CPU par frame de l'effet feu : random.choices vs table d'alias + tirages par blocs
+#
+# Usage: python benchmarks/bench_fire.py [--frames 200000]
+import argparse
+import collections
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from commun.led_aleatoire import FIRE_COLORS, FIRE_WEIGHTS, AliasSampler, fire_frames  # noqa: E402
+
+
+def legacy_frame():
+    """Frame de l'ancienne boucle : poids cumulés reconstruits + 5 appels randint/uniform"""
+    r, g, b = random.choices(FIRE_COLORS, weights=list(FIRE_WEIGHTS), k=1)[0]
+    r = min(255, r + random.randint(-10, 10))
+    g = min(255, max(0, g + random.randint(-15, 15)))
+    b = min(255, max(0, b + random.randint(-5, 5)))
+    if g > 150:
+        brightness = random.randint(85, 100)
+    elif g > 100:
+        brightness = random.randint(75, 95)
+    else:
+        brightness = random.randint(60, 85)
+    if g > 150:
+        delay = random.uniform(0.03, 0.08)
+    elif g > 80:
+        delay = random.uniform(0.05, 0.12)
+    else:
+        delay = random.uniform(0.1, 0.2)
+    # Deux écritures BLE par frame : couleur puis luminosité
+    return (r, g, b), brightness, delay
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=200000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        legacy_frame()
+    legacy = (time.perf_counter() - start) / args.frames * 1e6
+
+    frames = fire_frames()
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        next(frames)
+    alias = (time.perf_counter() - start) / args.frames * 1e6
+
+    print(f"random.choices + randint : {legacy:6.3f} µs/frame  (2 écritures BLE/frame)")
+    print(f"alias + tirages par blocs: {alias:6.3f} µs/frame  (1 écriture BLE/frame)")
+
+    # Contrôle : la distribution de l'alias suit les poids
+    sampler = AliasSampler(range(len(FIRE_WEIGHTS)), FIRE_WEIGHTS)
+    counts = collections.Counter(sampler.sample(random.random()) for _ in range(args.frames))
+    total = sum(FIRE_WEIGHTS)
+    worst = max(abs(counts[i] / args.frames - w / total) for i, w in enumerate(FIRE_WEIGHTS))
+    print(f"écart max à la distribution cible : {worst * 100:.2f} points")
+
+
+if __name__ == '__main__':
+    main()
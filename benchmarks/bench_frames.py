@@ -0,0 +1,86 @@
+# bench_frames.py - Coût CPU par frame : boucles d'interpolation d'origine vs tables précalculées,
+# et coût du pipeline couleur (rgb / hsv / oklab) avec nombre de paquets après déduplication
+#
+# Usage: python benchmarks/bench_frames.py [--cycles 20]
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from commun.led_couleur import COLOR_SPACES  # noqa: E402
+from commun.led_frames import compile_palette_cycle  # noqa: E402
+
+# Palette et réglages de wave_effect (10 couleurs x 80 étapes)
+WAVE_COLORS = (
+    (255, 0, 0), (255, 87, 34), (255, 165, 0), (255, 193, 7), (255, 255, 0),
+    (0, 255, 255), (0, 191, 255), (0, 0, 255), (75, 0, 130), (148, 0, 211)
+)
+STEPS = 80
+DELAY = 0.1
+
+
+def sink(r, g, b):
+    """Remplace set_color : ne mesure que le coût de génération des frames"""
+
+
+def legacy_loop(cycles):
+    """Boucle d'origine : interpolation recalculée à chaque frame, à chaque cycle"""
+    frames = 0
+    for _ in range(cycles):
+        for color_index, start_color in enumerate(WAVE_COLORS):
+            target_color = WAVE_COLORS[(color_index + 1) % len(WAVE_COLORS)]
+            for i in range(STEPS + 1):
+                progress = i / STEPS
+                r = int(start_color[0] + (target_color[0] - start_color[0]) * progress)
+                g = int(start_color[1] + (target_color[1] - start_color[1]) * progress)
+                b = int(start_color[2] + (target_color[2] - start_color[2]) * progress)
+                sink(r, g, b)
+                frames += 1
+    return frames
+
+
+def table_loop(cycles):
+    """Lecture d'une table compilée une fois (cache LRU) : on avance un index"""
+    table = compile_palette_cycle(WAVE_COLORS, STEPS, DELAY, 'rgb')
+    rgb, length = table.rgb, len(table)
+    frames = 0
+    index = 0
+    for _ in range(cycles * length):
+        base = index * 3
+        sink(rgb[base], rgb[base + 1], rgb[base + 2])
+        index = (index + 1) % length
+        frames += 1
+    return frames
+
+
+def measure(func, cycles):
+    start = time.perf_counter()
+    frames = func(cycles)
+    elapsed = time.perf_counter() - start
+    return frames, elapsed / frames * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cycles', type=int, default=20)
+    args = parser.parse_args()
+
+    print("== Lecture (wave_effect, 10 couleurs x 80 étapes)")
+    for name, func in (('boucle d\'origine', legacy_loop), ('table précalculée', table_loop)):
+        frames, per_frame = measure(func, args.cycles)
+        print(f"{name:20s} {frames:7d} frames  {per_frame:6.3f} µs/frame")
+
+    print("\n== Compilation par espace couleur (une fois par palette, puis cache)")
+    raw_frames = len(WAVE_COLORS) * (STEPS + 1)
+    for space in COLOR_SPACES:
+        compile_palette_cycle.cache_clear()
+        start = time.perf_counter()
+        table = compile_palette_cycle(WAVE_COLORS, STEPS, DELAY, space)
+        elapsed = time.perf_counter() - start
+        print(f"{space:6s} {elapsed * 1000:7.2f} ms  {elapsed / raw_frames * 1e6:6.2f} µs/frame  "
+              f"paquets/cycle: {len(table)} (sans déduplication: {raw_frames})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# bench_pages.py - Octets transférés par chargement de /dashboard et /pomodoro
+#
+# Compare un client sans cache ni compression (équivalent des anciennes pages tout en
+# ligne) à un navigateur : 1re visite compressée, puis visite suivante (ressources en
+# cache immuable, page revalidée par ETag).
+#
+# Usage:
+#   python benchmarks/bench_pages.py [--encoding "gzip, br"]
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'serveur'))
+os.environ['LED_SIMULATION'] = 'true'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+import led_serveur  # noqa: E402
+
+
+def load(client, route, encoding, cache):
+    """Un chargement de page par un navigateur : (octets reçus, nombre de requêtes)"""
+    headers = {'Accept-Encoding': encoding}
+    if route in cache:
+        headers['If-None-Match'] = cache[route]
+    page = client.get(route, headers=headers)
+    cache[route] = page.headers.get('ETag')
+    received, requests = len(page.data), 1
+    for name in led_serveur.assets.pages[route][1]:
+        if name in cache:
+            continue  # Cache-Control: immutable, aucune requête
+        received += len(client.get(f'/static/{name}', headers=headers).data)
+        requests += 1
+        cache[name] = True
+    return received, requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--encoding', default='gzip, deflate, br', help="Accept-Encoding du navigateur simulé")
+    args = parser.parse_args()
+
+    client = led_serveur.app.test_client()
+    weights = led_serveur.assets.weights()
+    print(f"brotli : {'oui' if led_serveur.assets.status()['brotli'] else 'non (gzip seul)'}")
+    print(f"{'page':<12}{'avant':>10}{'1re visite':>14}{'suivante':>12}{'requêtes':>11}")
+    for route in ('/dashboard', '/pomodoro'):
+        cache = {}
+        first, first_requests = load(client, route, args.encoding, cache)
+        repeat, repeat_requests = load(client, route, args.encoding, cache)
+        print(
+            f"{route:<12}{weights[route]['before_bytes']:>9} o{first:>12} o{repeat:>10} o"
+            f"{first_requests:>6} / {repeat_requests}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,505 @@
+# led_client.py - Client Python de l'API LED (scripts domotiques)
+#
+# Connexions HTTP/1.1 keep-alive réutilisées, appels rapprochés regroupés dans
+# POST /api/batch, abonnements à l'état (/api/state?since=) et au Pomodoro (SSE).
+# Bibliothèque standard uniquement.
+#
+# Usage:
+#   from client.led_client import LEDClient, AsyncLEDClient
+#
+#   with LEDClient('http://192.168.1.20:5000') as leds:
+#       leds.set_color(255, 120, 0, transition_ms=800)
+#       leds.pomodoro(work_minutes=50, break_minutes=10)
+#       for state in leds.subscribe_state():
+#           print(state['devices'])
+#
+#   async with AsyncLEDClient('http://192.168.1.20:5000') as leds:
+#       # Lancés ensemble : un seul aller-retour HTTP (/api/batch)
+#       await asyncio.gather(leds.power_on(), leds.set_color(0, 0, 255), leds.set_brightness(40))
+import asyncio
+import concurrent.futures
+import http.client
+import json
+import queue
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+# Appels regroupés dans un seul POST /api/batch (limite par défaut du serveur)
+BATCH_MAX_CALLS = 32
+# Attente d'un long-poll côté serveur (STATE_POLL_TIMEOUT) ; la socket attend un peu plus
+STATE_POLL_TIMEOUT = 25.0
+# Pause avant de rouvrir un abonnement coupé
+RESUBSCRIBE_DELAY_S = 1.0
+# Erreurs d'une connexion keep-alive fermée par le serveur pendant qu'elle était au repos
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class LEDError(Exception):
+    """Réponse d'erreur de l'API (status HTTP >= 400)"""
+
+    def __init__(self, status, message, body=None, retry_after=None):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+        self.body = body
+        # 429 : secondes avant de réessayer (en-tête Retry-After)
+        self.retry_after = retry_after
+
+
+class ConnectionPool:
+    """Connexions keep-alive vers le serveur, gardées au repos (au plus `size`)"""
+
+    def __init__(self, base_url, timeout=5.0, size=4):
+        parts = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.host = parts.hostname or 'localhost'
+        self.port = parts.port
+        self.timeout = timeout
+        self.idle = queue.LifoQueue(maxsize=size)
+        self.stats = {'requests': 0, 'connections': 0, 'reused': 0}
+
+    def connect(self, timeout=None):
+        """Nouvelle connexion (hors pool : abonnements)"""
+        self.stats['connections'] += 1
+        return self.connection_class(self.host, self.port, timeout=timeout or self.timeout)
+
+    def _acquire(self):
+        try:
+            return self.idle.get_nowait(), True
+        except queue.Empty:
+            return self.connect(), False
+
+    def _release(self, connection):
+        try:
+            self.idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def request(self, method, path, body=None):
+        """(status, en-têtes, corps JSON ou None). Une connexion au repos fermée est rouverte une fois"""
+        payload = None if body is None else json.dumps(body).encode('utf-8')
+        headers = {'Content-Type': 'application/json'} if payload is not None else {}
+        for attempt in range(2):
+            connection, reused = self._acquire()
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except STALE_CONNECTION_ERRORS:
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                connection.close()
+                raise
+            self.stats['requests'] += 1
+            self.stats['reused'] += reused
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+            return response.status, response.headers, _decode(data)
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _decode(data):
+    """Corps JSON, texte brut s'il n'est pas du JSON (page d'erreur), None s'il est vide"""
+    if not data:
+        return None
+    try:
+        return json.loads(data)
+    except ValueError:
+        return data.decode('utf-8', 'replace')
+
+
+def _result(status, headers, body):
+    """Corps JSON d'une réponse, LEDError si status >= 400"""
+    if status >= 400:
+        message = body.get('message') if isinstance(body, dict) else str(body)
+        raise LEDError(status, message, body, headers.get('Retry-After') if headers else None)
+    return body
+
+
+class Batcher:
+    """Envoie les appels dans l'ordre, sur `workers` connexions au plus.
+
+    Les appels en attente partent ensemble dans un POST /api/batch (après `window` s) :
+    aucune attente ajoutée pour un appel isolé. Les lectures (GET) partent en parallèle ;
+    un lot qui contient une commande attend la fin du lot de commandes précédent.
+    """
+
+    def __init__(self, pool, window=0.0, max_calls=BATCH_MAX_CALLS, workers=1):
+        self.pool = pool
+        self.window = window
+        self.max_calls = max_calls
+        self.condition = threading.Condition()
+        self.calls = []
+        self.closed = False
+        self.writing = False  # Un lot de commandes est en cours d'aller-retour
+        self.in_flight = 0
+        self.stats = {'calls': 0, 'round_trips': 0, 'batches': 0, 'max_in_flight': 0}
+        self.threads = [
+            threading.Thread(target=self._run, name=f'led-client-batch-{index}', daemon=True)
+            for index in range(max(workers, 1))
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, method, path, body=None):
+        """Future concurrent du corps de la réponse"""
+        future = concurrent.futures.Future()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Client fermé")
+            self.calls.append((method, path, body, future))
+            self.condition.notify()
+        return future
+
+    def _ready(self):
+        return self.calls and (self.calls[0][0] == 'GET' or not self.writing)
+
+    def _take(self):
+        """(Sous le verrou) Prochain lot : les lectures en tête, ou tout ce qui attend derrière une commande"""
+        if not self._ready():
+            return [], False
+        if self.calls[0][0] == 'GET':
+            count = 0
+            while count < min(len(self.calls), self.max_calls) and self.calls[count][0] == 'GET':
+                count += 1
+            writing = False
+        else:
+            count = min(len(self.calls), self.max_calls)
+            writing = self.writing = True
+        calls, self.calls = self.calls[:count], self.calls[count:]
+        self.in_flight += 1
+        self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.in_flight)
+        return calls, writing
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self._ready() or (self.closed and not self.calls))
+                if not self.calls:
+                    return
+            if self.window:
+                time.sleep(self.window)
+            with self.condition:
+                calls, writing = self._take()
+            if not calls:
+                continue
+            try:
+                self._send(calls)
+            finally:
+                with self.condition:
+                    self.in_flight -= 1
+                    if writing:
+                        self.writing = False
+                        self.condition.notify_all()
+
+    def _send(self, calls):
+        calls = [call for call in calls if call[3].set_running_or_notify_cancel()]
+        if not calls:
+            return
+        with self.condition:
+            self.stats['calls'] += len(calls)
+            self.stats['round_trips'] += 1
+            if len(calls) > 1:
+                self.stats['batches'] += 1
+        try:
+            if len(calls) == 1:
+                method, path, body, _ = calls[0]
+                outcomes = [self.pool.request(method, path, body)]
+            else:
+                results = _result(*self.pool.request('POST', '/api/batch', {
+                    'calls': [{'method': method, 'path': path, 'body': body} for method, path, body, _ in calls]
+                }))['results']
+                outcomes = [(r['status'], {'Retry-After': r.get('retry_after')}, r['body']) for r in results]
+        except Exception as e:
+            for call in calls:
+                call[3].set_exception(e)
+            return
+        for call, outcome in zip(calls, outcomes):
+            try:
+                call[3].set_result(_result(*outcome))
+            except LEDError as e:
+                call[3].set_exception(e)
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join(timeout=5)
+
+
+class Subscription:
+    """Itérateur bloquant d'événements ; close() l'interrompt depuis un autre thread"""
+
+    def __init__(self, pool, read_events):
+        self.pool = pool
+        self.read_events = read_events
+        self.connection = None
+        self.closed = False
+        self.events = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while not self.closed:
+            try:
+                if self.events is None:
+                    self.connection = self.pool.connect(timeout=STATE_POLL_TIMEOUT + 10)
+                    self.events = self.read_events(self.connection)
+                return next(self.events)
+            except StopIteration:
+                self.events = None
+            except (OSError, http.client.HTTPException, ValueError, AttributeError):
+                # AttributeError : socket fermée par close() pendant une lecture
+                if self.closed:
+                    break
+                self.events = None
+                time.sleep(RESUBSCRIBE_DELAY_S)
+        raise StopIteration
+
+    def close(self):
+        self.closed = True
+        if self.connection is not None:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _state_events(since):
+    """Long-polls successifs de /api/state : un événement par nouvelle version"""
+    def read(connection):
+        nonlocal since
+        while True:
+            path = '/api/state' if since is None else f"/api/state?{urlencode({'since': since})}"
+            connection.request('GET', path)
+            response = connection.getresponse()
+            state = _result(response.status, response.headers, json.loads(response.read()))
+            if state['version'] != since:
+                since = state['version']
+                yield state
+    return read
+
+
+def _pomodoro_events(connection):
+    """Événements SSE de /api/pomodoro/stream"""
+    connection.request('GET', '/api/pomodoro/stream', headers={'Accept': 'text/event-stream'})
+    response = connection.getresponse()
+    if response.status >= 400:
+        raise LEDError(response.status, response.reason)
+    for line in response:
+        if line.startswith(b'data: '):
+            yield json.loads(line[6:])
+
+
+class _Operations:
+    """Méthodes de l'API, communes aux clients synchrone et asyncio (voir _call)"""
+
+    # --- Commandes de base (PersistentLEDController) ---
+    def power_on(self, target=None):
+        return self._call('POST', '/api/led/on', _target({}, target))
+
+    def power_off(self, target=None):
+        return self._call('POST', '/api/led/off', _target({}, target))
+
+    def set_color(self, r, g, b, transition_ms=0, target=None):
+        """Couleur RGB (0-255), avec transition douce optionnelle"""
+        return self._call('POST', '/api/led/color', _target({'r': r, 'g': g, 'b': b, 'transition_ms': transition_ms}, target))
+
+    def set_brightness(self, brightness, transition_ms=0, target=None):
+        """Luminosité 0-100"""
+        return self._call('POST', '/api/led/brightness', _target({'brightness': brightness, 'transition_ms': transition_ms}, target))
+
+    def white(self, brightness=255, transition_ms=0, target=None):
+        return self._call('POST', '/api/led/white', _target({'brightness': brightness, 'transition_ms': transition_ms}, target))
+
+    def preview(self, color=None, brightness=None, target=None):
+        """Prévisualisation de faible priorité (réponse sans attendre le Bluetooth)"""
+        body = {key: value for key, value in (('color', color), ('brightness', brightness)) if value is not None}
+        return self._call('POST', '/api/preview', _target(body, target))
+
+    def home_arrival(self):
+        return self._call('POST', '/api/home-arrival', {})
+
+    def scene(self, name, target=None):
+        return self._call('POST', f'/api/scene/{name}', _target({}, target))
+
+    # --- Effets ---
+    def rainbow(self):
+        return self._call('POST', '/api/effect/rainbow', {})
+
+    def breathing(self, r=None, g=None, b=None):
+        return self._call('POST', '/api/effect/breathing', _color({}, r, g, b))
+
+    def strobe(self, r=None, g=None, b=None):
+        return self._call('POST', '/api/effect/strobe', _color({}, r, g, b))
+
+    def police(self):
+        return self._call('POST', '/api/effect/police', {})
+
+    def aurora(self):
+        return self._call('POST', '/api/effect/aurora', {})
+
+    def fire(self):
+        return self._call('POST', '/api/effect/fire', {})
+
+    def fade(self, colors=None, speed=1.0):
+        """colors : liste de (r, g, b), palette par défaut si None"""
+        body = {'speed': speed}
+        if colors is not None:
+            body['colors'] = [list(color) for color in colors]
+        return self._call('POST', '/api/effect/fade', body)
+
+    def wave(self, speed=1.0):
+        return self._call('POST', '/api/effect/wave', {'speed': speed})
+
+    def blink(self, count=10, speed=1.0, r=None, g=None, b=None):
+        return self._call('POST', '/api/effect/blink', _color({'count': count, 'speed': speed}, r, g, b))
+
+    def timeline(self, name=None, timeline=None):
+        """Timeline intégrée (name) ou définition JSON (timeline)"""
+        body = {'name': name} if timeline is None else {'timeline': timeline}
+        return self._call('POST', '/api/effect/timeline', body)
+
+    def group_effect(self, effect, target=None, phase_ms=0, speed=1.0):
+        return self._call('POST', '/api/effect/group', _target({'effect': effect, 'phase_ms': phase_ms, 'speed': speed}, target))
+
+    def stop_effect(self):
+        return self._call('POST', '/api/effect/stop', {})
+
+    def pomodoro(self, work_minutes=25, break_minutes=5, cycles=4):
+        return self._call('POST', '/api/effect/pomodoro', {
+            'work_minutes': work_minutes, 'break_minutes': break_minutes, 'cycles': cycles
+        })
+
+    # --- Lecture ---
+    def state(self):
+        return self._call('GET', '/api/state')
+
+    def status(self):
+        return self._call('GET', '/api/status')
+
+    def health(self):
+        return self._call('GET', '/api/health')
+
+    def stats(self, device=None):
+        return self._call('GET', '/api/stats' if device is None else f"/api/stats?{urlencode({'device': device})}")
+
+
+def _target(body, target):
+    if target is not None:
+        body['target'] = target
+    return body
+
+
+def _color(body, r, g, b):
+    if r is not None:
+        body.update(r=r, g=g, b=b)
+    return body
+
+
+class LEDClient(_Operations):
+    """Client synchrone : chaque méthode bloque jusqu'à la réponse (dict JSON), LEDError sinon.
+
+    Plusieurs threads qui appellent en même temps partagent un aller-retour (/api/batch) ;
+    les lectures utilisent jusqu'à `pool_size` connexions en parallèle.
+    """
+
+    def __init__(self, base_url='http://localhost:5000', timeout=5.0, pool_size=4, batch_window=0.0):
+        self.base_url = base_url
+        self.pool = ConnectionPool(base_url, timeout, pool_size)
+        # Un aller-retour en cours par connexion du pool
+        self.batcher = Batcher(self.pool, batch_window, workers=pool_size)
+
+    def _call(self, method, path, body=None):
+        return self.batcher.submit(method, path, body).result()
+
+    def submit(self, method, path, body=None):
+        """Appel sans attente (Future) : des submit() successifs partent dans le même lot"""
+        return self.batcher.submit(method, path, body)
+
+    def subscribe_state(self, since=None):
+        """Itérateur des états successifs (long-poll) ; le premier est l'état courant si since=None"""
+        return Subscription(self.pool, _state_events(since))
+
+    def subscribe_pomodoro(self):
+        """Itérateur des états du Pomodoro (SSE, un par seconde)"""
+        return Subscription(self.pool, _pomodoro_events)
+
+    def client_stats(self):
+        return {**self.pool.stats, **self.batcher.stats}
+
+    def close(self):
+        self.batcher.close()
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _AsyncSubscription:
+    """Itérateur asynchrone au-dessus d'une Subscription (lecture dans un thread)"""
+
+    def __init__(self, subscription):
+        self.subscription = subscription
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await asyncio.get_running_loop().run_in_executor(None, next, self.subscription, None)
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    async def aclose(self):
+        self.subscription.close()
+
+
+class AsyncLEDClient(_Operations):
+    """Client asyncio : mêmes méthodes, en coroutines. Les appels lancés ensemble
+    (asyncio.gather, tâches) partent dans un seul POST /api/batch.
+    """
+
+    def __init__(self, base_url='http://localhost:5000', timeout=5.0, pool_size=4, batch_window=0.0):
+        self.client = LEDClient(base_url, timeout, pool_size, batch_window)
+
+    def _call(self, method, path, body=None):
+        return asyncio.wrap_future(self.client.submit(method, path, body))
+
+    def subscribe_state(self, since=None):
+        return _AsyncSubscription(self.client.subscribe_state(since))
+
+    def subscribe_pomodoro(self):
+        return _AsyncSubscription(self.client.subscribe_pomodoro())
+
+    def client_stats(self):
+        return self.client.client_stats()
+
+    async def close(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.client.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,117 @@
+# led_aleatoire.py - Tirages aléatoires O(1) pour les effets stochastiques (feu, aurores)
+import random
+
+
+# Palette de flammes (du plus chaud au plus sombre) et poids associés
+FIRE_COLORS = (
+    # Coeur du feu (très chaud - blanc/jaune)
+    (255, 255, 200), (255, 245, 150), (255, 235, 100),
+    # Flammes principales (orange chaud)
+    (255, 200, 50), (255, 180, 40), (255, 160, 30), (255, 140, 20),
+    # Base des flammes (rouge-orange)
+    (255, 120, 10), (255, 100, 5), (255, 80, 0), (245, 70, 0),
+    # Braises (rouge sombre)
+    (220, 50, 0), (200, 40, 0), (180, 30, 0),
+)
+FIRE_WEIGHTS = (
+    8, 10, 12,       # Coeur (plus rare)
+    15, 20, 20, 18,  # Flammes (fréquent)
+    15, 12, 10, 8,   # Base (moyen)
+    5, 3, 2,         # Braises (rare)
+)
+
+
+class AliasSampler:
+    """Tirage pondéré en O(1) (méthode d'alias de Vose), table construite une seule fois.
+
+    Remplace random.choices(..., weights=...) qui reconstruit les poids
+    cumulés à chaque appel.
+    """
+
+    def __init__(self, items, weights):
+        count = len(items)
+        total = float(sum(weights))
+        scaled = [weight * count / total for weight in weights]
+        self.items = tuple(items)
+        self.count = count
+        self.prob = [1.0] * count
+        self.alias = list(range(count))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+
+    def sample(self, u):
+        """Un tirage à partir d'un seul uniforme u dans [0, 1)"""
+        position = u * self.count
+        column = int(position)
+        if position - column < self.prob[column]:
+            return self.items[column]
+        return self.items[self.alias[column]]
+
+
+class UniformBatch:
+    """Uniformes [0, 1) générés par blocs pour amortir les appels au générateur"""
+
+    def __init__(self, size=1024, rng=None):
+        self.size = size
+        self.rng = rng or random.random
+        self.values = []
+        self.index = 0
+
+    def next(self):
+        if self.index >= len(self.values):
+            rng = self.rng
+            self.values = [rng() for _ in range(self.size)]
+            self.index = 0
+        value = self.values[self.index]
+        self.index += 1
+        return value
+
+    def randint(self, low, high):
+        """Entier dans [low, high] (bornes incluses, comme random.randint)"""
+        return low + int(self.next() * (high - low + 1))
+
+    def uniform(self, low, high):
+        return low + (high - low) * self.next()
+
+
+def scale(color, level):
+    """Replie une luminosité 0-100 dans la couleur : une seule écriture BLE par frame"""
+    return color[0] * level // 100, color[1] * level // 100, color[2] * level // 100
+
+
+def fire_frames(batch=None):
+    """Générateur infini de frames de feu : ((r, g, b) corrigé gamma, délai)"""
+    sampler = AliasSampler(FIRE_COLORS, FIRE_WEIGHTS)
+    batch = batch or UniformBatch()
+
+    while True:
+        r, g, b = sampler.sample(batch.next())
+
+        # Variations subtiles pour plus de naturel
+        r = min(255, r + batch.randint(-10, 10))
+        g = min(255, max(0, g + batch.randint(-15, 15)))
+        b = min(255, max(0, b + batch.randint(-5, 5)))
+
+        # Scintillement : plus lumineux et plus rapide pour le coeur du feu
+        if g > 150:
+            level = batch.randint(85, 100)
+        elif g > 100:
+            level = batch.randint(75, 95)
+        else:
+            level = batch.randint(60, 85)
+
+        if g > 150:
+            delay = batch.uniform(0.03, 0.08)
+        elif g > 80:
+            delay = batch.uniform(0.05, 0.12)
+        else:
+            delay = batch.uniform(0.1, 0.2)
+
+        yield scale((r, g, b), level), delay
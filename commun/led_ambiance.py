@@ -0,0 +1,170 @@
+# led_ambiance.py - Éclairage d'ambiance : couleur dominante/moyenne d'images ou de vidéo
+#
+# Sources (images RGB 8 bits, lues une par une dans un tampon réutilisé) :
+#   - vidéo décodée par ffmpeg (sortie rawvideo rgb24 réduite à SAMPLE_WIDTH x SAMPLE_HEIGHT)
+#   - séquence d'images : .ppm lus directement, autres formats via ffmpeg
+#   - tube nommé (FIFO) recevant des frames rawvideo rgb24 de taille connue, par exemple
+#     ffmpeg -f x11grab -i :0 -vf scale=160:90 -f rawvideo -pix_fmt rgb24 - > /tmp/led-ambiance.fifo
+import os
+import select
+import subprocess
+from pathlib import Path
+
+from commun.led_couleur import oklab_distance
+
+try:
+    import numpy as np
+except ImportError:  # Dépendance optionnelle : seul l'effet ambiance en a besoin
+    np = None
+
+# Résolution d'analyse : largement suffisante pour une couleur moyenne
+SAMPLE_WIDTH = 64
+SAMPLE_HEIGHT = 36
+# Couleur dominante : histogramme sur 4 bits par canal (4096 cases)
+DOMINANT_BITS = 4
+# Lissage exponentiel (0 = figé, 1 = aucun lissage)
+SMOOTHING = 0.3
+# Écart perceptuel minimal (ΔE OKLab) pour envoyer une nouvelle couleur
+DELTA_E = 0.02
+MODES = ('average', 'dominant')
+
+
+def numpy_available():
+    return np is not None
+
+
+def rawvideo_frames(stream, width, height, should_stop=lambda: False):
+    """Frames rgb24 d'un flux binaire, dans un seul tampon réutilisé (mémoire bornée)"""
+    size = width * height * 3
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    frame = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 3)
+    while not should_stop():
+        filled = 0
+        while filled < size:
+            count = stream.readinto(view[filled:])
+            if not count:
+                return
+            filled += count
+        yield frame
+
+
+class _PollingReader:
+    """readinto() qui rend la main toutes les 0,5 s pour vérifier l'arrêt (0 = arrêté)"""
+
+    def __init__(self, raw, should_stop):
+        self.raw = raw
+        self.should_stop = should_stop
+
+    def readinto(self, view):
+        while not self.should_stop():
+            ready, _, _ = select.select([self.raw], [], [], 0.5)
+            if ready:
+                return self.raw.readinto(view)
+        return 0
+
+
+def fifo_available():
+    """Tubes nommés (os.mkfifo) et select() sur un tube : absents sous Windows"""
+    return hasattr(os, 'mkfifo')
+
+
+def fifo_frames(path, width, height, should_stop=lambda: False):
+    """Frames d'un tube nommé (créé s'il n'existe pas).
+
+    Ouvert en lecture/écriture : l'ouverture ne bloque pas en attendant un producteur
+    et le départ d'un producteur n'est pas une fin de flux (un autre peut prendre le relais).
+    """
+    if not fifo_available():
+        raise OSError("tube nommé indisponible sur cette plateforme")
+    path = Path(path)
+    if not path.exists():
+        os.mkfifo(path)
+    raw = os.fdopen(os.open(path, os.O_RDWR), 'rb', buffering=0)
+    try:
+        yield from rawvideo_frames(_PollingReader(raw, should_stop), width, height, should_stop)
+    finally:
+        raw.close()
+
+
+def ffmpeg_frames(arguments, fps, should_stop=lambda: False, width=SAMPLE_WIDTH, height=SAMPLE_HEIGHT):
+    """Décode via ffmpeg, rééchantillonné à fps et réduit à width x height ; tué à l'arrêt"""
+    command = ['ffmpeg', '-loglevel', 'error', *arguments,
+               '-vf', f'fps={fps},scale={width}:{height}', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-']
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stdin=subprocess.DEVNULL)
+    try:
+        yield from rawvideo_frames(process.stdout, width, height, should_stop)
+    finally:
+        process.kill()
+        process.wait()
+
+
+def read_ppm(path):
+    """Image PPM binaire (P6, 8 bits) -> tableau (hauteur, largeur, 3)"""
+    data = Path(path).read_bytes()
+    fields = []
+    position = 0
+    while len(fields) < 4:
+        # En-tête : P6, largeur, hauteur, valeur max (commentaires '#' ignorés)
+        while data[position:position + 1].isspace():
+            position += 1
+        if data[position:position + 1] == b'#':
+            position = data.index(b'\n', position) + 1
+            continue
+        end = position
+        while not data[end:end + 1].isspace():
+            end += 1
+        fields.append(data[position:end])
+        position = end
+    if fields[0] != b'P6' or int(fields[3]) != 255:
+        raise ValueError(f"{path}: seuls les PPM P6 8 bits sont lus directement")
+    width, height = int(fields[1]), int(fields[2])
+    return np.frombuffer(data, dtype=np.uint8, count=width * height * 3, offset=position + 1).reshape(height, width, 3)
+
+
+def video_frames(path, fps, should_stop=lambda: False):
+    return ffmpeg_frames(['-i', str(path)], fps, should_stop)
+
+
+def image_frames(directory, fps, should_stop=lambda: False):
+    """Séquence d'images d'un dossier, triée par nom"""
+    paths = sorted(p for p in Path(directory).iterdir() if p.is_file())
+    if paths and all(p.suffix.lower() == '.ppm' for p in paths):
+        for path in paths:
+            if should_stop():
+                return
+            yield read_ppm(path)
+        return
+    suffix = paths[0].suffix if paths else '.png'
+    pattern = str(Path(directory) / f'*{suffix}')
+    yield from ffmpeg_frames(['-framerate', str(fps), '-pattern_type', 'glob', '-i', pattern], fps, should_stop)
+
+
+def extract_color(frame, mode='average'):
+    """Couleur d'une image (moyenne ou dominante) sur une version sous-échantillonnée"""
+    height, width = frame.shape[:2]
+    # Sous-échantillonnage par pas : vue sans copie sur ~SAMPLE_WIDTH x SAMPLE_HEIGHT pixels
+    step = max(1, min(width // SAMPLE_WIDTH, height // SAMPLE_HEIGHT))
+    pixels = frame[::step, ::step].reshape(-1, 3)
+
+    if mode == 'dominant':
+        shift = 8 - DOMINANT_BITS
+        quantized = pixels >> shift
+        bins = (quantized[:, 0].astype(np.int32) << (2 * DOMINANT_BITS)) | (quantized[:, 1].astype(np.int32) << DOMINANT_BITS) | quantized[:, 2]
+        counts = np.bincount(bins, minlength=1 << (3 * DOMINANT_BITS))
+        pixels = pixels[bins == counts.argmax()]
+
+    return pixels.mean(axis=0)
+
+
+def ambient_colors(frames, fps, mode='average', smoothing=SMOOTHING, delta_e=DELTA_E):
+    """Générateur (instant en s, (r, g, b)) : seules les couleurs perceptiblement différentes sortent"""
+    smoothed = None
+    last = None
+    for index, frame in enumerate(frames):
+        color = extract_color(frame, mode)
+        smoothed = color if smoothed is None else smoothed + (color - smoothed) * smoothing
+        candidate = tuple(int(c + 0.5) for c in smoothed)
+        if last is None or oklab_distance(candidate, last) >= delta_e:
+            last = candidate
+            yield index / fps, candidate
@@ -0,0 +1,197 @@
+# led_audio.py - Effet audio-réactif : PCM 16 bits -> FFT fenêtrée -> couleur par bandes
+#
+# Sources : fichier WAV, entrée standard ou socket TCP local (PCM brut s16le), par exemple
+#   arecord -f S16_LE -r 44100 -c 1 | nc 127.0.0.1 5055
+#   ffmpeg -i musique.mp3 -f s16le -ac 1 -ar 44100 - | nc 127.0.0.1 5055
+import socket
+import sys
+import wave
+
+from commun.led_aleatoire import scale
+from commun.led_couleur import correct
+
+try:
+    import numpy as np
+except ImportError:  # Dépendance optionnelle : seul l'effet audio en a besoin
+    np = None
+
+FFT_SIZE = 2048
+# Bandes (Hz) : graves -> rouge, médiums -> vert, aigus -> bleu
+BANDS = ((20, 250), (250, 2000), (2000, 8000))
+SAMPLE_WIDTH = 2  # s16le uniquement
+
+# Lissage exponentiel par frame : montée rapide, descente lente
+ATTACK = 0.6
+RELEASE = 0.15
+# Décroissance du pic de référence (normalisation automatique du volume)
+PEAK_DECAY = 0.995
+# Seuil d'attaque : flux spectral > moyenne + ONSET_SENSITIVITY * écart-type (sur ~1 s)
+ONSET_SENSITIVITY = 1.5
+
+
+def numpy_available():
+    return np is not None
+
+
+class PcmSource:
+    """Flux PCM s16le entrelacé : read(n_frames) -> bytes (b'' en fin de flux)"""
+
+    def __init__(self, read, rate, channels, close=None):
+        self._read = read
+        self.rate = rate
+        self.channels = channels
+        self._close = close
+
+    def read(self, frames):
+        wanted = frames * self.channels * SAMPLE_WIDTH
+        data = b''
+        while len(data) < wanted:
+            chunk = self._read(wanted - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def close(self):
+        if self._close:
+            self._close()
+
+
+def wav_source(path):
+    wav = wave.open(str(path), 'rb')
+    if wav.getsampwidth() != SAMPLE_WIDTH:
+        wav.close()
+        raise ValueError("seuls les WAV 16 bits sont pris en charge")
+    channels = wav.getnchannels()
+    return PcmSource(
+        lambda size: wav.readframes(size // (channels * SAMPLE_WIDTH)),
+        wav.getframerate(), channels, wav.close
+    )
+
+
+def stdin_source(rate, channels):
+    return PcmSource(sys.stdin.buffer.read, rate, channels)
+
+
+def socket_source(port, rate, channels, should_stop, host='127.0.0.1'):
+    """Attend un producteur sur host:port (un seul client), arrêtable via should_stop()"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind((host, port))
+    server.listen(1)
+    server.settimeout(0.5)
+    connection = None
+    while connection is None:
+        if should_stop():
+            server.close()
+            return None
+        try:
+            connection, _ = server.accept()
+        except socket.timeout:
+            continue
+    connection.settimeout(0.5)
+
+    def read(size):
+        while not should_stop():
+            try:
+                return connection.recv(size)
+            except socket.timeout:
+                continue
+        return b''
+
+    def close():
+        connection.close()
+        server.close()
+
+    return PcmSource(read, rate, channels, close)
+
+
+class AudioAnalyzer:
+    """Énergie par bande lissée + détection d'attaques sur une fenêtre glissante"""
+
+    def __init__(self, rate, fps, fft_size=FFT_SIZE):
+        self.rate = rate
+        self.hop = max(1, int(rate / fps))
+        self.fft_size = max(fft_size, self.hop)
+        self.buffer = np.zeros(self.fft_size, dtype=np.float32)
+        self.window = np.hanning(self.fft_size).astype(np.float32)
+
+        # Bornes des bandes en indices de l'FFT, pour np.add.reduceat
+        freqs = np.fft.rfftfreq(self.fft_size, 1 / rate)
+        edges = []
+        for low, high in BANDS:
+            edges.extend((np.searchsorted(freqs, low), np.searchsorted(freqs, min(high, rate / 2))))
+        self.edges = np.array(edges)
+        self.widths = np.maximum(self.edges[1::2] - self.edges[::2], 1)
+
+        self.levels = np.zeros(len(BANDS), dtype=np.float32)
+        self.peaks = np.full(len(BANDS), 1e-3, dtype=np.float32)
+        self.previous = None
+        self.flux_history = np.zeros(max(4, int(fps)), dtype=np.float32)
+        self.flux_index = 0
+
+    def feed(self, pcm, channels):
+        """Ajoute un bloc PCM s16le ; retourne (niveaux 0-1 par bande, attaque détectée)"""
+        samples = np.frombuffer(pcm, dtype='<i2').astype(np.float32)
+        if channels > 1:
+            samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+        samples *= 1 / 32768
+        count = min(len(samples), self.fft_size)
+        # Fenêtre glissante : décale puis ajoute le bloc à la fin
+        self.buffer[:-count] = self.buffer[count:]
+        self.buffer[-count:] = samples[-count:]
+
+        magnitude = np.abs(np.fft.rfft(self.buffer * self.window))
+        power = magnitude * magnitude
+        energy = np.sqrt(np.add.reduceat(power, self.edges)[::2] / self.widths)
+
+        self.peaks = np.maximum(energy, self.peaks * PEAK_DECAY)
+        target = energy / self.peaks
+        rate = np.where(target > self.levels, ATTACK, RELEASE)
+        self.levels += (target - self.levels) * rate
+
+        # Flux spectral (log) : somme des hausses d'amplitude d'une frame à l'autre
+        log_magnitude = np.log1p(magnitude)
+        onset = False
+        if self.previous is not None:
+            flux = float(np.maximum(log_magnitude - self.previous, 0).sum())
+            history = self.flux_history
+            onset = flux > history.mean() + ONSET_SENSITIVITY * history.std() and flux > 1.0
+            history[self.flux_index] = flux
+            self.flux_index = (self.flux_index + 1) % len(history)
+        self.previous = log_magnitude
+        return self.levels, onset
+
+
+def levels_to_color(levels, onset):
+    """Graves/médiums/aigus -> R/G/B, luminosité repliée dans la couleur (une écriture)"""
+    bass, mid, treble = (float(level) for level in levels)
+    color = (int(255 * bass), int(255 * mid), int(255 * treble))
+    level = 30 + int(70 * max(bass, mid, treble))
+    if onset:
+        # Attaque : flash vers le blanc à pleine luminosité
+        color = tuple(c + (255 - c) * 2 // 5 for c in color)
+        level = 100
+    return scale(color, min(level, 100))
+
+
+def audio_frames(source, fps):
+    """Générateur (instant en s, (r, g, b)) : une frame par bloc de 1/fps s de son.
+
+    Les couleurs identiques à la précédente ne sont pas émises (aucun paquet BLE).
+    """
+    analyzer = AudioAnalyzer(source.rate, fps)
+    hop = analyzer.hop
+    position = 0
+    last = None
+    while True:
+        pcm = source.read(hop)
+        if len(pcm) < SAMPLE_WIDTH * source.channels:
+            return
+        levels, onset = analyzer.feed(pcm, source.channels)
+        color = levels_to_color(levels, onset)
+        position += hop
+        # Instant de fin du bloc : c'est là qu'un flux en direct le rend disponible
+        if correct(color) != last:
+            yield position / source.rate, color
+            last = correct(color)
@@ -0,0 +1,147 @@
+# led_couleur.py - Pipeline couleur perceptuel : LUT gamma, interpolation OKLab / HSV
+import colorsys
+import math
+import os
+from array import array
+
+# Correction gamma appliquée à chaque couleur écrite sur le lien (led_protocole.to_wire ;
+# 1.0 = aucune correction, 2.2 convient à la plupart des bandes : sans elle, les niveaux
+# bas paraissent bien trop lumineux)
+LED_GAMMA = float(os.getenv('LED_GAMMA', '2.2'))
+# Espace d'interpolation par défaut : 'oklab', 'hsv' ou 'rgb' (linéaire brut, ancien comportement)
+LED_COLOR_SPACE = os.getenv('LED_COLOR_SPACE', 'oklab').lower()
+
+COLOR_SPACES = ('oklab', 'hsv', 'rgb')
+
+# Résolution de la LUT linéaire -> sRGB
+_LINEAR_LUT_SIZE = 4096
+
+
+def _srgb_to_linear(value):
+    value /= 255
+    if value <= 0.04045:
+        return value / 12.92
+    return ((value + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(value):
+    if value <= 0.0031308:
+        value *= 12.92
+    else:
+        value = 1.055 * value ** (1 / 2.4) - 0.055
+    return max(0, min(255, round(value * 255)))
+
+
+# Tables précalculées une fois au chargement du module
+SRGB_TO_LINEAR = array('d', (_srgb_to_linear(v) for v in range(256)))
+LINEAR_TO_SRGB = array('B', (_linear_to_srgb(i / (_LINEAR_LUT_SIZE - 1)) for i in range(_LINEAR_LUT_SIZE)))
+
+
+def build_gamma_lut(gamma):
+    return array('B', (round(255 * (v / 255) ** gamma) for v in range(256)))
+
+
+GAMMA_LUT = build_gamma_lut(LED_GAMMA)
+
+
+def correct(color):
+    """Applique la LUT gamma à un triplet RGB (couleur réellement affichée, pour comparer)"""
+    return GAMMA_LUT[int(color[0])], GAMMA_LUT[int(color[1])], GAMMA_LUT[int(color[2])]
+
+
+def _linear_to_byte(value):
+    if value <= 0.0:
+        return 0
+    if value >= 1.0:
+        return 255
+    return LINEAR_TO_SRGB[int(value * (_LINEAR_LUT_SIZE - 1) + 0.5)]
+
+
+def _cbrt(value):
+    return math.copysign(abs(value) ** (1 / 3), value)
+
+
+def rgb_to_oklab(color):
+    r, g, b = (SRGB_TO_LINEAR[int(component)] for component in color)
+    l_ = _cbrt(0.4122214708 * r + 0.5363325363 * g + 0.0514459929 * b)
+    m_ = _cbrt(0.2119034982 * r + 0.6806995451 * g + 0.1073969566 * b)
+    s_ = _cbrt(0.0883024619 * r + 0.2817188376 * g + 0.6299787005 * b)
+    return (
+        0.2104542553 * l_ + 0.7936177850 * m_ - 0.0040720468 * s_,
+        1.9779984951 * l_ - 2.4285922050 * m_ + 0.4505937099 * s_,
+        0.0259040371 * l_ + 0.7827717662 * m_ - 0.8086757660 * s_,
+    )
+
+
+def oklab_to_rgb(lab):
+    lightness, a, b = lab
+    l_ = lightness + 0.3963377774 * a + 0.2158037573 * b
+    m_ = lightness - 0.1055613458 * a - 0.0638541728 * b
+    s_ = lightness - 0.0894841775 * a - 1.2914855480 * b
+    l, m, s = l_ ** 3, m_ ** 3, s_ ** 3
+    return (
+        _linear_to_byte(4.0767416621 * l - 3.3077115913 * m + 0.2309699292 * s),
+        _linear_to_byte(-1.2684380046 * l + 2.6097574011 * m - 0.3413193965 * s),
+        _linear_to_byte(-0.0041960863 * l - 0.7034186147 * m + 1.7076147010 * s),
+    )
+
+
+def oklab_distance(color_a, color_b):
+    """Distance perceptuelle (ΔE OKLab, ~0.02 = différence à peine visible)"""
+    lab_a, lab_b = rgb_to_oklab(color_a), rgb_to_oklab(color_b)
+    return math.sqrt(sum((x - y) ** 2 for x, y in zip(lab_a, lab_b)))
+
+
+def mix(start, target, progress, space=None):
+    """Couleur intermédiaire à `progress` (0-1) entre start et target, non corrigée gamma"""
+    space = space or LED_COLOR_SPACE
+    if space == 'oklab':
+        lab_start, lab_target = rgb_to_oklab(start), rgb_to_oklab(target)
+        return oklab_to_rgb([s + (t - s) * progress for s, t in zip(lab_start, lab_target)])
+    if space == 'hsv':
+        return interpolate_hsv(start, target, progress)
+    return tuple(int(s + (t - s) * progress) for s, t in zip(start, target))
+
+
+def interpolate_hsv(start, target, progress):
+    h1, s1, v1 = colorsys.rgb_to_hsv(*(c / 255 for c in start))
+    h2, s2, v2 = colorsys.rgb_to_hsv(*(c / 255 for c in target))
+    # Teinte : plus court chemin sur le cercle ; teinte indéfinie pour le gris
+    if s1 == 0:
+        h1 = h2
+    if s2 == 0:
+        h2 = h1
+    dh = (h2 - h1 + 0.5) % 1.0 - 0.5
+    r, g, b = colorsys.hsv_to_rgb((h1 + dh * progress) % 1.0, s1 + (s2 - s1) * progress, v1 + (v2 - v1) * progress)
+    return round(r * 255), round(g * 255), round(b * 255)
+
+
+def interpolate(start, target, steps, space=None):
+    """steps + 1 couleurs de start à target (incluses), non corrigées gamma"""
+    space = space or LED_COLOR_SPACE
+    steps = max(1, steps)
+    frames = []
+
+    if space == 'oklab':
+        lab_start, lab_target = rgb_to_oklab(start), rgb_to_oklab(target)
+        deltas = [t - s for s, t in zip(lab_start, lab_target)]
+        for i in range(steps + 1):
+            progress = i / steps
+            frames.append(oklab_to_rgb([s + d * progress for s, d in zip(lab_start, deltas)]))
+
+    elif space == 'hsv':
+        for i in range(steps + 1):
+            frames.append(interpolate_hsv(start, target, i / steps))
+
+    else:
+        for i in range(steps + 1):
+            progress = i / steps
+            frames.append(tuple(int(s + (t - s) * progress) for s, t in zip(start, target)))
+
+    return frames
+
+
+def brightness_ramp(steps):
+    """Niveaux de luminosité 0-100 perceptuellement réguliers (L OKLab -> luminance = L³)"""
+    steps = max(1, steps)
+    return [round(100 * (i / steps) ** 3) for i in range(steps + 1)]
@@ -0,0 +1,123 @@
+# led_frames.py - Tables de frames précalculées pour les effets (serveur et CLI)
+from array import array
+from functools import lru_cache
+
+from commun.led_couleur import brightness_ramp, correct, interpolate
+
+# Nombre de tables gardées en cache (une par combinaison palette / étapes / délai / espace)
+FRAME_CACHE_SIZE = 64
+
+
+class FrameTable:
+    """Effet compilé : triplets RGB contigus (array 'B') + délai après chaque frame.
+
+    Les frames consécutives identiques après quantification et LUT gamma sont
+    fusionnées (leurs délais s'additionnent) : aucun paquet BLE n'est envoyé pour rien.
+    `segments` donne l'index de la première frame de chaque transition.
+    """
+
+    __slots__ = ('rgb', 'delays', 'segments')
+
+    def __init__(self):
+        self.rgb = array('B')
+        self.delays = array('d')
+        self.segments = array('I')
+
+    def __len__(self):
+        return len(self.delays)
+
+    def color(self, index):
+        base = index * 3
+        return self.rgb[base], self.rgb[base + 1], self.rgb[base + 2]
+
+    def frames(self):
+        """Itère sur (r, g, b, délai)"""
+        rgb = self.rgb
+        for index, delay in enumerate(self.delays):
+            base = index * 3
+            yield rgb[base], rgb[base + 1], rgb[base + 2], delay
+
+    def segment(self, number):
+        """Indices des frames de la transition `number`"""
+        start = self.segments[number]
+        end = self.segments[number + 1] if number + 1 < len(self.segments) else len(self.delays)
+        return range(start, end)
+
+    def _append(self, color, delay):
+        if self.delays and correct(self.color(len(self.delays) - 1)) == correct(color):
+            self.delays[-1] += delay
+            return
+        self.rgb.extend(color)
+        self.delays.append(delay)
+
+    def _append_transition(self, start, target, steps, delay, space):
+        self.segments.append(len(self.delays))
+        for color in interpolate(start, target, steps, space):
+            self._append(color, delay)
+
+
+@lru_cache(maxsize=FRAME_CACHE_SIZE)
+def compile_transition(start, target, steps, delay, space=None):
+    """Transition unique start -> target (tuples RGB)"""
+    table = FrameTable()
+    table._append_transition(start, target, steps, delay, space)
+    return table
+
+
+@lru_cache(maxsize=FRAME_CACHE_SIZE)
+def compile_palette_cycle(colors, steps, delay, space=None):
+    """Cycle complet colors[0] -> colors[1] -> ... -> colors[0].
+
+    `colors` est un tuple de tuples RGB (hashable, sert de clé de cache).
+    """
+    table = FrameTable()
+    for index, start in enumerate(colors):
+        target = colors[(index + 1) % len(colors)]
+        table._append_transition(start, target, steps, delay, space)
+
+    # En boucle, la dernière frame (colors[0]) est aussi la première : on les fusionne
+    if len(table) > 1 and correct(table.color(len(table) - 1)) == correct(table.color(0)):
+        table.delays[0] += table.delays.pop()
+        del table.rgb[-3:]
+    return table
+
+
+@lru_cache(maxsize=FRAME_CACHE_SIZE)
+def compile_breathing(steps, delay):
+    """Montée puis descente de luminosité perceptuellement régulière.
+
+    Retourne (niveaux array 'B', délais array 'd'), niveaux identiques fusionnés, y compris
+    au rebouclage : le cycle joué en boucle n'envoie pas deux fois de suite le niveau 0.
+    """
+    ramp = brightness_ramp(steps)
+    levels, delays = array('B'), array('d')
+    for level in ramp + ramp[::-1]:
+        if levels and levels[-1] == level:
+            delays[-1] += delay
+            continue
+        levels.append(level)
+        delays.append(delay)
+    if len(levels) > 1 and levels[-1] == levels[0]:
+        levels.pop()
+        delays[0] += delays.pop()
+    return levels, delays
+
+
+def normalize_palette(colors):
+    """Liste JSON [[r, g, b], ...] -> tuple de tuples bornés 0-255 (ValueError si invalide)"""
+    palette = []
+    for color in colors:
+        r, g, b = (max(0, min(int(component), 255)) for component in color)
+        palette.append((r, g, b))
+    if len(palette) < 2:
+        raise ValueError("au moins deux couleurs sont nécessaires")
+    return tuple(palette)
+
+
+def cache_info():
+    """Statistiques du cache LRU des tables"""
+    return {
+        'transitions': compile_transition.cache_info()._asdict(),
+        'palettes': compile_palette_cycle.cache_info()._asdict(),
+        'breathing': compile_breathing.cache_info()._asdict(),
+    }
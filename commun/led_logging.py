@@ -0,0 +1,161 @@
+# led_logging.py - Journalisation asynchrone (file d'attente) partagée serveur / CLI
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+# Format par défaut du serveur (le CLI passe '%(message)s' pour garder son affichage)
+DEFAULT_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+
+_listener = None
+_handler = None
+_setup_lock = threading.Lock()
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui ne bloque jamais : si la file est pleine, le message est abandonné"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """Échantillonnage par sous-système : ne garde qu'un message sur N sous WARNING.
+
+    `rates` associe un préfixe de logger ('led.effect') à un taux entre 0 et 1.
+    Les WARNING et au-delà passent toujours.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        # Préfixes les plus longs d'abord pour que 'led.effect.fire' gagne sur 'led.effect'
+        self.rules = sorted(
+            ((prefix, max(0.0, min(rate, 1.0))) for prefix, rate in rates.items()),
+            key=lambda rule: len(rule[0]),
+            reverse=True
+        )
+        self.counters = {}
+        # filter() est appelé depuis tous les threads qui journalisent
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rules:
+            return True
+        for prefix, rate in self.rules:
+            if record.name == prefix or record.name.startswith(prefix + '.'):
+                if rate >= 1.0:
+                    return True
+                if rate <= 0.0:
+                    return False
+                # Compteur déterministe : 1 message gardé tous les round(1/rate)
+                with self.lock:
+                    count = self.counters.get(prefix, 0)
+                    self.counters[prefix] = count + 1
+                return count % round(1 / rate) == 0
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par message (LOG_FORMAT=json)"""
+
+    def format(self, record):
+        entry = {
+            'time': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        data = getattr(record, 'data', None)
+        if data:
+            entry.update(data)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def parse_sampling(spec):
+    """'led.effect=0.01,led.bt=0.5' -> {'led.effect': 0.01, 'led.bt': 0.5}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        prefix, _, rate = item.partition('=')
+        try:
+            rates[prefix.strip()] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+
+def setup_logging(fmt=DEFAULT_FORMAT, queued=True):
+    """Installe le handler à file d'attente sur le logger 'led' (idempotent).
+
+    queued=False écrit directement depuis le thread appelant : dans le CLI, les messages
+    restent dans l'ordre des print() et des invites de saisie.
+
+    Variables d'environnement :
+      LOG_LEVEL       niveau minimal (INFO par défaut)
+      LOG_SAMPLING    taux par sous-système, ex. 'led.effect=0.01'
+      LOG_FORMAT      'json' pour une sortie structurée
+      LOG_QUEUE_SIZE  taille max de la file (10000 par défaut)
+    """
+    global _listener, _handler
+
+    with _setup_lock:
+        if _handler is not None:
+            return _handler
+
+        level = getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO)
+        log_queue = queue.Queue(maxsize=int(os.getenv('LOG_QUEUE_SIZE', '10000')))
+
+        output = logging.StreamHandler(sys.stdout)
+        if os.getenv('LOG_FORMAT', '').lower() == 'json':
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter(fmt, datefmt='%H:%M:%S'))
+
+        _handler = NonBlockingQueueHandler(log_queue) if queued else output
+        _handler.addFilter(SamplingFilter(parse_sampling(os.getenv('LOG_SAMPLING', ''))))
+
+        root = logging.getLogger('led')
+        root.setLevel(level)
+        root.addHandler(_handler)
+        root.propagate = False
+
+        if queued:
+            # Le thread du listener fait les écritures bloquantes (console, pipe)
+            _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+            _listener.start()
+            atexit.register(_listener.stop)
+
+        return _handler
+
+
+def route_logger(name):
+    """Fait passer un logger tiers (ex. 'werkzeug') par la file d'attente"""
+    handler = setup_logging()
+    logger = logging.getLogger(name)
+    if handler not in logger.handlers:
+        logger.addHandler(handler)
+    logger.propagate = False
+    return logger
+
+
+def get_logger(name):
+    """Logger d'un sous-système ('bt', 'api', 'effect', ...)"""
+    return logging.getLogger(f'led.{name}')
+
+
+def dropped_messages():
+    """Nombre de messages abandonnés parce que la file était pleine"""
+    return getattr(_handler, 'dropped', 0)
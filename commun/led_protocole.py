@@ -0,0 +1,44 @@
+# led_protocole.py - Paquets du protocole BLEDDM (9 octets, 0x7e ... 0xef)
+#
+# Les paquets portent les couleurs demandées ; la LUT gamma n'est appliquée qu'à l'écriture
+# sur le lien (to_wire) : même rendu quelle que soit la route, état mémorisé inchangé.
+from commun.led_couleur import GAMMA_LUT, LED_GAMMA
+
+PACKET_SIZE = 9
+
+# Octet 2 : type de commande
+TYPE_BRIGHTNESS = 0x01
+TYPE_POWER = 0x04
+TYPE_COLOR = 0x05
+
+POWER_ON = bytes([0x7e, 0x00, 0x04, 0xf0, 0x00, 0x01, 0xff, 0x00, 0xef])
+POWER_OFF = bytes([0x7e, 0x00, 0x04, 0x00, 0x00, 0x00, 0xff, 0x00, 0xef])
+
+
+def color_packet(r, g, b):
+    return bytes([0x7e, 0x00, 0x05, 0x03, r, g, b, 0x00, 0xef])
+
+
+def brightness_packet(brightness):
+    """Luminosité 0-100"""
+    value = int((brightness / 100) * 255)
+    return bytes([0x7e, 0x00, 0x01, value, 0x00, 0x00, 0x00, 0x00, 0xef])
+
+
+def to_wire(packet):
+    """Paquet tel qu'écrit sur le lien : couleur corrigée par la LUT gamma"""
+    if packet[2] != TYPE_COLOR or LED_GAMMA == 1.0:
+        return packet
+    return bytes([0x7e, 0x00, 0x05, 0x03, GAMMA_LUT[packet[4]], GAMMA_LUT[packet[5]], GAMMA_LUT[packet[6]], 0x00, 0xef])
+
+
+def decode(packet):
+    """Retourne (type, valeur) : couleur (r, g, b), luminosité 0-100 ou allumage bool"""
+    kind = packet[2]
+    if kind == TYPE_COLOR:
+        return kind, (packet[4], packet[5], packet[6])
+    if kind == TYPE_BRIGHTNESS:
+        return kind, round(packet[3] * 100 / 255)
+    if kind == TYPE_POWER:
+        return kind, packet[3] == 0xf0
+    return kind, None
@@ -0,0 +1,205 @@
+# led_registre.py - Registre des appareils BLEDDM découverts (adresse, nom, RSSI, handles GATT)
+#
+# Partagé par le serveur et la CLI, persisté en JSON. Une connexion réutilise l'appareil vu
+# au dernier scan (ou, sous Linux, le chemin BlueZ mémorisé) au lieu de relancer une
+# découverte, et écrit sur le handle de caractéristique mis en cache.
+import atexit
+import collections
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+from commun.led_logging import get_logger
+
+log = get_logger('registre')
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / 'appareils.json'
+# Préfixes des noms annoncés par les contrôleurs BLEDDM / ELK-BLEDOM
+NAME_PREFIXES = ('ELK-BLEDOM', 'ELK-BLEDDM', 'BLEDDM', 'ELK-BLE', 'MELK', 'LEDBLE')
+# Un appareil vu par le scanner depuis moins longtemps est connecté sans nouvelle découverte
+FRESH_S = 300
+CONNECT_HISTORY = 100
+# Écritures rapprochées (scan, connexion, handles) regroupées en une seule, après ce délai (s)
+PERSIST_DELAY_S = 1.0
+
+
+def is_bleddm(name):
+    return bool(name) and name.upper().startswith(NAME_PREFIXES)
+
+
+def _ble_device(address, name, path):
+    """BLEDevice BlueZ reconstruit depuis le registre (évite find_device_by_address)"""
+    from bleak.backends.device import BLEDevice
+    details = {'path': path, 'props': {}}
+    try:
+        return BLEDevice(address, name, details)
+    except TypeError:  # bleak < 0.22 : rssi obligatoire
+        return BLEDevice(address, name, details, 0)
+
+
+class DeviceRegistry:
+    """Appareils connus, indexés par adresse MAC (majuscules)"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.devices = {}
+        # Objets BLEDevice vus par un scan de ce processus : adresse -> (appareil, instant monotone)
+        self.seen = {}
+        self.connects = {mode: collections.deque(maxlen=CONNECT_HISTORY) for mode in ('cached', 'discovery')}
+        self._dirty = threading.Event()
+        self._writer = None
+        self._write_lock = threading.Lock()
+        if self.path.exists():
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    devices = json.load(f)
+                if not isinstance(devices, dict):
+                    raise ValueError("objet JSON attendu")
+                self.devices = devices
+            except (OSError, ValueError) as e:  # json.JSONDecodeError est un ValueError
+                log.warning("Registre %s illisible (%s) : démarrage avec un registre vide", self.path, e)
+        atexit.register(self.flush)
+
+    def _persist(self):
+        """Demande une écriture (appelé sous self.lock) : faite hors de la boucle BLE, regroupée"""
+        self._dirty.set()
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name='registre-writer', daemon=True)
+            self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            self._dirty.wait()
+            time.sleep(PERSIST_DELAY_S)
+            self.flush()
+
+    def flush(self):
+        """Écrit le registre s'il a changé (écriture atomique : fichier temporaire puis remplacement)"""
+        with self._write_lock:
+            self._write()
+
+    def _write(self):
+        with self.lock:
+            if not self._dirty.is_set():
+                return
+            self._dirty.clear()
+            data = json.dumps(self.devices, indent=2)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_suffix('.tmp')
+            temporary.write_text(data, encoding='utf-8')
+            os.replace(temporary, self.path)
+        except OSError as e:
+            log.warning("Écriture du registre %s impossible : %s", self.path, e)
+
+    def observe(self, device, rssi=None):
+        """Appareil vu par un scan (persisté par l'appelant)"""
+        address = device.address.upper()
+        details = getattr(device, 'details', None)
+        with self.lock:
+            entry = self.devices.setdefault(address, {'handles': {}})
+            entry['name'] = device.name or entry.get('name')
+            if rssi is not None:
+                entry['rssi'] = rssi
+            entry['last_seen'] = time.time()
+            if isinstance(details, dict) and details.get('path'):
+                entry['path'] = details['path']
+            self.seen[address] = (device, time.monotonic())
+
+    async def scan(self, scanner_class, timeout=5.0):
+        """Un scan : met à jour les appareils BLEDDM visibles. Retourne leur nombre"""
+        found = await scanner_class.discover(timeout=timeout, return_adv=True)
+        count = 0
+        for device, advertisement in found.values():
+            if is_bleddm(device.name or advertisement.local_name):
+                self.observe(device, advertisement.rssi)
+                count += 1
+        if count:
+            with self.lock:
+                self._persist()
+        return count
+
+    async def resolve(self, address, scanner_class, timeout):
+        """Cible de connexion : (BLEDevice ou adresse, True si aucune découverte n'a été nécessaire)"""
+        address = address.upper()
+        with self.lock:
+            device, seen_at = self.seen.get(address, (None, 0.0))
+            entry = self.devices.get(address, {})
+        if device is not None and time.monotonic() - seen_at < FRESH_S:
+            return device, True
+        if entry.get('path') and sys.platform.startswith('linux'):
+            return _ble_device(address, entry.get('name'), entry['path']), True
+
+        device = await scanner_class.find_device_by_address(address, timeout=timeout)
+        if device is None:
+            # Laisser le backend tenter sa propre découverte
+            return address, False
+        self.observe(device, getattr(device, 'rssi', None))
+        with self.lock:
+            self._persist()
+        return device, False
+
+    def forget(self, address):
+        """Cache invalide (connexion échouée) : la prochaine tentative refait une découverte"""
+        address = address.upper()
+        with self.lock:
+            self.seen.pop(address, None)
+            entry = self.devices.get(address)
+            if entry and entry.pop('path', None):
+                self._persist()
+
+    def characteristic(self, address, char_uuid, services):
+        """Handle de la caractéristique (mis en cache) ; l'UUID si introuvable"""
+        address = address.upper()
+        with self.lock:
+            entry = self.devices.setdefault(address, {'handles': {}})
+            handle = entry.setdefault('handles', {}).get(char_uuid)
+        if services is not None:
+            cached = services.get_characteristic(handle) if handle is not None else None
+            if cached is None or str(cached.uuid).lower() != char_uuid.lower():
+                found = services.get_characteristic(char_uuid)
+                if found is None:
+                    return char_uuid
+                handle = found.handle
+                with self.lock:
+                    entry['handles'][char_uuid] = handle
+                    self._persist()
+        return char_uuid if handle is None else handle
+
+    def record_connect(self, address, seconds, cached):
+        """Durée d'établissement d'une connexion (découverte comprise)"""
+        with self.lock:
+            self.connects['cached' if cached else 'discovery'].append(seconds)
+            entry = self.devices.setdefault(address.upper(), {'handles': {}})
+            entry['last_connect_ms'] = round(seconds * 1000, 1)
+            entry['last_connect_cached'] = cached
+            self._persist()
+
+    def connect_stats(self):
+        with self.lock:
+            return {
+                mode: {
+                    'count': len(values),
+                    'mean_ms': round(statistics.fmean(values) * 1000, 1) if values else None,
+                    'p50_ms': round(statistics.median(values) * 1000, 1) if values else None,
+                    'max_ms': round(max(values) * 1000, 1) if values else None,
+                }
+                for mode, values in self.connects.items()
+            }
+
+    def list(self):
+        now = time.monotonic()
+        with self.lock:
+            return [
+                {
+                    'address': address,
+                    **entry,
+                    'fresh': address in self.seen and now - self.seen[address][1] < FRESH_S
+                }
+                for address, entry in sorted(self.devices.items())
+            ]
@@ -3,19 +3,37 @@ import asyncio
 import threading
 import random
 import os
+import sys
+import time
 from pathlib import Path
-from bleak import BleakClient
+from bleak import BleakClient, BleakScanner
 from dotenv import load_dotenv
 
 # Charger les variables d'environnement depuis .env
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
+# Modules partagés avec le serveur (dossier commun/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from commun.led_logging import setup_logging, get_logger
+from commun.led_frames import compile_transition, compile_palette_cycle, compile_breathing
+from commun import led_protocole as protocole
+from commun.led_aleatoire import UniformBatch, fire_frames, scale
+from commun.led_registre import DEFAULT_PATH as REGISTRY_DEFAULT_PATH, DeviceRegistry
+
+# Messages du contrôleur via la journalisation (affichage identique au print). Écriture
+# directe, sans file : les messages restent dans l'ordre des print() du menu et des invites
+setup_logging(fmt='%(message)s', queued=False)
+log = get_logger('cli')
+
 # Configuration depuis les variables d'environnement
 LED_ADDRESS = os.getenv('LED_ADDRESS', 'XX:XX:XX:XX:XX:XX')
 CHAR_UUID = os.getenv('CHAR_UUID', '0000fff3-0000-1000-8000-00805f9b34fb')
 BLUETOOTH_TIMEOUT = float(os.getenv('BLUETOOTH_TIMEOUT', '15'))
 
+# Registre partagé avec le serveur : appareil et handle GATT réutilisés d'un lancement à l'autre
+registry = DeviceRegistry(os.getenv('DEVICE_REGISTRY') or REGISTRY_DEFAULT_PATH)
+
 # Variable globale pour arrêter les effets
 stop_effect = False
 
@@ -29,48 +47,60 @@ class LEDController:
     def __init__(self, address):
         self.address = address
         self.client = None
+        self.write_target = CHAR_UUID
         self.is_on = False
         self.current_color = (0, 0, 0)
         self.current_brightness = 100
     
     async def connect(self):
         """Connexion aux LEDs"""
-        print(f"Connexion a {self.address}...")
+        log.info("Connexion a %s...", self.address)
+        cached = False
         try:
-            self.client = BleakClient(self.address, timeout=BLUETOOTH_TIMEOUT)
+            start = time.perf_counter()
+            target, cached = await registry.resolve(self.address, BleakScanner, BLUETOOTH_TIMEOUT)
+            self.client = BleakClient(target, timeout=BLUETOOTH_TIMEOUT)
             await self.client.connect()
-            print("Connecte avec succes!\n")
+            elapsed = time.perf_counter() - start
+            registry.record_connect(self.address, elapsed, cached)
+            self.write_target = registry.characteristic(self.address, CHAR_UUID, self.client.services)
+            log.info("Connecte avec succes! (%.1f s%s)\n", elapsed, ", sans decouverte" if cached else "")
             return True
         except Exception as e:
-            print(f"Erreur de connexion: {e}")
+            if cached:
+                # Appareil mémorisé périmé : nouvelle tentative avec découverte
+                log.warning("Echec avec l'appareil en cache (%s), nouvelle decouverte...", e)
+                registry.forget(self.address)
+                return await self.connect()
+            log.error("Erreur de connexion: %s", e)
             return False
     
     async def disconnect(self):
         """Déconnexion"""
         if self.client and self.client.is_connected:
             await self.client.disconnect()
-            print("\nDeconnecte")
+            log.info("\nDeconnecte")
     
     async def send_command(self, command):
         """Envoyer une commande aux LEDs"""
         try:
             if self.client and self.client.is_connected:
-                await self.client.write_gatt_char(CHAR_UUID, bytearray(command), response=False)
+                await self.client.write_gatt_char(self.write_target, bytearray(protocole.to_wire(command)), response=False)
                 await asyncio.sleep(0.1)
         except Exception as e:
-            print(f"Erreur lors de l'envoi de la commande: {e}")
+            log.warning("Erreur lors de l'envoi de la commande: %s", e)
     
     async def power_on(self):
         """Allumer les LEDs"""
         await self.send_command([0x7e, 0x00, 0x04, 0xf0, 0x00, 0x01, 0xff, 0x00, 0xef])
         self.is_on = True
-        print("[ON] LEDs allumees")
+        log.info("[ON] LEDs allumees")
     
     async def power_off(self):
         """Éteindre les LEDs"""
         await self.send_command([0x7e, 0x00, 0x04, 0x00, 0x00, 0x00, 0xff, 0x00, 0xef])
         self.is_on = False
-        print("[OFF] LEDs eteintes")
+        log.info("[OFF] LEDs eteintes")
     
     async def set_color(self, red, green, blue):
         """Définir la couleur RGB (0-255)"""
@@ -88,22 +118,16 @@ class LEDController:
         await self.set_color(255, 255, 255)
         if brightness < 255:
             await self.set_brightness(int((brightness / 255) * 100))
-        print(f"[WHITE] {brightness}")
+        log.info("[WHITE] %s", brightness)
     
     # Effets de base
     async def fade_to_color(self, target_r, target_g, target_b, duration=2.0):
         """Transition douce vers une couleur"""
-        print(f"[FADE] Transition vers RGB({target_r}, {target_g}, {target_b})...")
+        log.info("[FADE] Transition vers RGB(%d, %d, %d)...", target_r, target_g, target_b)
         steps = 30
-        delay = duration / steps
+        table = compile_transition(self.current_color, (target_r, target_g, target_b), steps, duration / steps)
         
-        start_r, start_g, start_b = self.current_color
-        
-        for i in range(steps + 1):
-            progress = i / steps
-            r = int(start_r + (target_r - start_r) * progress)
-            g = int(start_g + (target_g - start_g) * progress)
-            b = int(start_b + (target_b - start_b) * progress)
+        for r, g, b, delay in table.frames():
             await self.set_color(r, g, b)
             await asyncio.sleep(delay)
     
@@ -112,7 +136,7 @@ class LEDController:
         global stop_effect
         stop_effect = False
         
-        print("[RAINBOW] Effet arc-en-ciel demarre (Appuyez sur ENTREE pour arreter)")
+        log.info("[RAINBOW] Effet arc-en-ciel demarre (Appuyez sur ENTREE pour arreter)")
         
         thread = threading.Thread(target=wait_for_enter, daemon=True)
         thread.start()
@@ -134,14 +158,14 @@ class LEDController:
                 await self.set_color(*color)
                 await asyncio.sleep(1.0)
         
-        print("[RAINBOW] Effet arrete")
+        log.info("[RAINBOW] Effet arrete")
     
     async def strobe_effect(self, color=(255, 255, 255)):
         """Effet stroboscopique en boucle"""
         global stop_effect
         stop_effect = False
         
-        print("[STROBE] Effet stroboscopique demarre (Appuyez sur ENTREE pour arreter)")
+        log.info("[STROBE] Effet stroboscopique demarre (Appuyez sur ENTREE pour arreter)")
         
         thread = threading.Thread(target=wait_for_enter, daemon=True)
         thread.start()
@@ -152,57 +176,53 @@ class LEDController:
             await self.set_color(0, 0, 0)
             await asyncio.sleep(0.1)
         
-        print("[STROBE] Effet arrete")
+        log.info("[STROBE] Effet arrete")
     
     async def breathing_effect(self, color=(0, 0, 255)):
         """Effet respiration en boucle"""
         global stop_effect
         stop_effect = False
         
-        print("[BREATH] Effet respiration demarre (Appuyez sur ENTREE pour arreter)")
+        log.info("[BREATH] Effet respiration demarre (Appuyez sur ENTREE pour arreter)")
         
         thread = threading.Thread(target=wait_for_enter, daemon=True)
         thread.start()
         
         await self.set_color(*color)
         
+        # Montée puis descente perceptuellement régulières (niveaux identiques fusionnés)
+        levels, delays = compile_breathing(20, 0.05)
+        index = 0
+        
         while not stop_effect:
-            # Montée
-            for brightness in range(0, 101, 5):
-                if stop_effect:
-                    break
-                await self.set_brightness(brightness)
-                await asyncio.sleep(0.05)
-            
-            # Descente
-            for brightness in range(100, -1, -5):
-                if stop_effect:
-                    break
-                await self.set_brightness(brightness)
-                await asyncio.sleep(0.05)
+            await self.set_brightness(levels[index])
+            await asyncio.sleep(delays[index])
+            index = (index + 1) % len(levels)
         
         await self.set_brightness(100)
-        print("[BREATH] Effet arrete")
+        log.info("[BREATH] Effet arrete")
     
     async def police_effect(self):
         """Effet sirène de police en boucle"""
         global stop_effect
         stop_effect = False
         
-        print("[POLICE] Effet sirene de police demarre (Appuyez sur ENTREE pour arreter)")
+        log.info("[POLICE] Effet sirene de police demarre (Appuyez sur ENTREE pour arreter)")
         
         thread = threading.Thread(target=wait_for_enter, daemon=True)
         thread.start()
         
+        red, blue = (255, 0, 0), (0, 0, 255)
+        
         while not stop_effect:
-            await self.set_color(255, 0, 0)  # Rouge
+            await self.set_color(*red)  # Rouge
             await asyncio.sleep(0.3)
             if stop_effect:
                 break
-            await self.set_color(0, 0, 255)  # Bleu
+            await self.set_color(*blue)  # Bleu
             await asyncio.sleep(0.3)
         
-        print("[POLICE] Effet arrete")
+        log.info("[POLICE] Effet arrete")
     
     # NOUVEAUX EFFETS
     
@@ -211,80 +231,23 @@ class LEDController:
         global stop_effect
         stop_effect = False
     
-        print("[FIRE] Effet flammes demarre (Appuyez sur ENTREE pour arreter)")
-        print("[FIRE] Simulation de feu avec variations chaudes aleatoires...")
+        log.info("[FIRE] Effet flammes demarre (Appuyez sur ENTREE pour arreter)")
+        log.info("[FIRE] Simulation de feu avec variations chaudes aleatoires...")
         
         thread = threading.Thread(target=wait_for_enter, daemon=True)
         thread.start()
         
-        # Palette de couleurs de flammes (du plus chaud au plus sombre)
-        fire_colors = [
-            # Coeur du feu (très chaud - blanc/jaune)
-            (255, 255, 200),  # Blanc-jaune chaud
-            (255, 245, 150),  # Jaune brillant
-            (255, 235, 100),  # Jaune intense
-            
-            # Flammes principales (orange chaud)
-            (255, 200, 50),   # Orange-jaune
-            (255, 180, 40),   # Orange vif
-            (255, 160, 30),   # Orange profond
-            (255, 140, 20),   # Orange foncé
-            
-            # Base des flammes (rouge-orange)
-            (255, 120, 10),   # Rouge-orange
-            (255, 100, 5),    # Rouge chaud
-            (255, 80, 0),     # Rouge vif
-            (245, 70, 0),     # Rouge profond
-            
-            # Braises (rouge sombre)
-            (220, 50, 0),     # Rouge sombre
-            (200, 40, 0),     # Braise chaude
-            (180, 30, 0),     # Braise moyenne
-        ]
+        # Palette pondérée (commun/led_aleatoire.py) : tirage O(1) par table d'alias,
+        # luminosité repliée dans la couleur -> une seule écriture par frame
+        await self.set_brightness(100)
         
-        while not stop_effect:
-            # Choix aléatoire pondéré (plus de couleurs chaudes)
-            color_choice = random.choices(
-                fire_colors,
-                weights=[
-                    8, 10, 12,  # Coeur (plus rare)
-                    15, 20, 20, 18,  # Flammes (fréquent)
-                    15, 12, 10, 8,   # Base (moyen)
-                    5, 3, 2          # Braises (rare)
-                ],
-                k=1
-            )[0]
-            
-            r, g, b = color_choice
-            
-            # Ajoute des variations subtiles pour plus de naturel
-            r = min(255, r + random.randint(-10, 10))
-            g = min(255, max(0, g + random.randint(-15, 15)))
-            b = min(255, max(0, b + random.randint(-5, 5)))
-            
-            await self.set_color(r, g, b)
-            
-            # Variation de luminosité pour effet scintillement
-            # Plus lumineux pour les couleurs chaudes
-            if g > 150:  # Couleurs jaunes (coeur)
-                brightness = random.randint(85, 100)
-            elif g > 100:  # Couleurs oranges (flammes)
-                brightness = random.randint(75, 95)
-            else:  # Couleurs rouges (base)
-                brightness = random.randint(60, 85)
-            
-            await self.set_brightness(brightness)
-            
-            # Délai aléatoire variable selon l'intensité
-            if g > 150:  # Coeur : change vite
-                await asyncio.sleep(random.uniform(0.03, 0.08))
-            elif g > 80:  # Flammes : vitesse moyenne
-                await asyncio.sleep(random.uniform(0.05, 0.12))
-            else:  # Braises : change lentement
-                await asyncio.sleep(random.uniform(0.1, 0.2))
+        for color, delay in fire_frames():
+            if stop_effect:
+                break
+            await self.set_color(*color)
+            await asyncio.sleep(delay)
         
-        await self.set_brightness(100)
-        print("[FIRE] Effet arrete")
+        log.info("[FIRE] Effet arrete")
 
     
     async def aurora_effect(self):
@@ -292,58 +255,52 @@ class LEDController:
         global stop_effect
         stop_effect = False
         
-        print("[AURORA] Effet aurores boreales demarre (Appuyez sur ENTREE pour arreter)")
-        print("[AURORA] Variations douces de vert, bleu et violet...")
+        log.info("[AURORA] Effet aurores boreales demarre (Appuyez sur ENTREE pour arreter)")
+        log.info("[AURORA] Variations douces de vert, bleu et violet...")
         
         thread = threading.Thread(target=wait_for_enter, daemon=True)
         thread.start()
         
         # Palette d'aurores boréales
-        aurora_colors = [
+        aurora_colors = (
             (0, 255, 100),    # Vert brillant
             (50, 255, 150),   # Vert-cyan
             (0, 200, 255),    # Cyan
             (100, 150, 255),  # Bleu-violet
             (150, 100, 255),  # Violet
             (100, 255, 200),  # Vert d'eau
-        ]
-        
-        color_index = 0
+        )
+        steps = 10
+        delay = 0.1
+        batch = UniformBatch()
+        await self.set_brightness(100)
         
-        while not stop_effect:
-            target_color = aurora_colors[color_index]
-            
-            # Transition douce vers la couleur suivante
-            steps = 10
-            delay = 0.1
-            start_r, start_g, start_b = self.current_color
-            target_r, target_g, target_b = target_color
-            
-            for i in range(steps + 1):
+        async def play_transition(table, number):
+            rgb, delays = table.rgb, table.delays
+            for index in table.segment(number):
                 if stop_effect:
-                    break
-                
-                progress = i / steps
-                r = int(start_r + (target_r - start_r) * progress)
-                g = int(start_g + (target_g - start_g) * progress)
-                b = int(start_b + (target_b - start_b) * progress)
-                
-                await self.set_color(r, g, b)
-                
-                # Légère variation de luminosité
-                brightness = random.randint(70, 100)
-                await self.set_brightness(brightness)
+                    return
+                base = index * 3
                 
-                await asyncio.sleep(delay)
+                # Légère variation de luminosité, repliée dans la couleur
+                level = batch.randint(70, 100)
+                await self.set_color(*scale((rgb[base], rgb[base + 1], rgb[base + 2]), level))
+                await asyncio.sleep(delays[index])
             
             # Pause sur la couleur
-            await asyncio.sleep(random.uniform(1.5, 3.0))
-            
+            await asyncio.sleep(batch.uniform(1.5, 3.0))
+        
+        # Transition douce depuis la couleur actuelle, puis cycle précalculé
+        await play_transition(compile_transition(self.current_color, aurora_colors[0], steps, delay), 0)
+        cycle = compile_palette_cycle(aurora_colors, steps, delay)
+        transition = 0
+        
+        while not stop_effect:
+            await play_transition(cycle, transition)
             # Couleur suivante
-            color_index = (color_index + 1) % len(aurora_colors)
+            transition = (transition + 1) % len(aurora_colors)
         
-        await self.set_brightness(100)
-        print("[AURORA] Effet arrete")
+        log.info("[AURORA] Effet arrete")
     
     async def pomodoro_mode(self, work_minutes=25, break_minutes=5, cycles=4):
         """Mode concentration Pomodoro"""
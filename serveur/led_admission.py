@@ -0,0 +1,116 @@
+# led_admission.py - Contrôle d'admission des commandes BLE : seaux à jetons par client et par route
+import math
+import threading
+import time
+
+# Seaux inactifs et pleins supprimés après ce délai (mémoire bornée face à des clients de passage)
+IDLE_BUCKET_S = 60.0
+PRUNE_EVERY = 256
+
+
+class TokenBucket:
+    """Débit `rate` jetons/s, réserve maximale `burst`"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def refill(self, now, rate, burst):
+        self.tokens = min(burst, self.tokens + (now - self.updated) * self.rate)
+        self.rate, self.burst, self.updated = rate, burst, now
+
+    def wait_for(self, cost):
+        """Secondes avant que `cost` jetons soient disponibles (0 = tout de suite)"""
+        return 0.0 if self.tokens >= cost else (cost - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """Seaux par client (part de la capacité du lien) et par route (capacité du lien entière).
+
+    capacity() donne le débit d'écritures BLE mesuré (écritures/s). Une requête coûte le
+    nombre d'écritures qu'elle déclenche ; elle n'est admise que si le seau du client et
+    celui de la route ont assez de jetons (les deux sont alors débités).
+    """
+
+    def __init__(self, capacity, client_share=0.5, client_burst=5):
+        self.capacity = capacity
+        self.client_share = client_share
+        self.client_burst = client_burst
+        self.lock = threading.Lock()
+        self.clients = {}
+        self.routes = {}
+        self.admissions = 0
+        self.counters = {'admitted': 0, 'limited': 0, 'coalesced': 0, 'flushed': 0}
+        # Requêtes fusionnées : clé -> [rejeu de la plus récente, Timer]
+        self.pending = {}
+
+    def _bucket(self, table, key, rate, burst, now):
+        bucket = table.get(key)
+        if bucket is None:
+            bucket = table[key] = TokenBucket(rate, burst, now)
+        else:
+            bucket.refill(now, rate, burst)
+        return bucket
+
+    def _prune(self, now):
+        for table in (self.clients, self.routes):
+            for key in [k for k, b in table.items() if now - b.updated > IDLE_BUCKET_S]:
+                del table[key]
+
+    def admit(self, client, route, cost=1):
+        """Retourne 0 si la requête est admise, sinon le délai conseillé (Retry-After, s)"""
+        capacity = max(self.capacity(), 0.1)
+        client_rate = capacity * self.client_share
+        now = time.monotonic()
+        with self.lock:
+            self.admissions += 1
+            if self.admissions % PRUNE_EVERY == 0:
+                self._prune(now)
+            client_bucket = self._bucket(self.clients, (client, route), client_rate, max(self.client_burst, cost), now)
+            route_bucket = self._bucket(self.routes, route, capacity, max(capacity, cost), now)
+            wait = max(client_bucket.wait_for(cost), route_bucket.wait_for(cost))
+            if wait > 0:
+                self.counters['limited'] += 1
+                return wait
+            client_bucket.tokens -= cost
+            route_bucket.tokens -= cost
+            self.counters['admitted'] += 1
+            return 0.0
+
+    def coalesce(self, key, replay, delay):
+        """Garde seulement la plus récente requête refusée pour `key`, rejouée après `delay` s"""
+        with self.lock:
+            self.counters['coalesced'] += 1
+            entry = self.pending.get(key)
+            if entry is not None:
+                entry[0] = replay
+                return
+            timer = threading.Timer(delay, self._flush, args=(key,))
+            timer.daemon = True
+            self.pending[key] = [replay, timer]
+        timer.start()
+
+    def _flush(self, key):
+        with self.lock:
+            replay, _ = self.pending.pop(key)
+            self.counters['flushed'] += 1
+        replay()
+
+    @staticmethod
+    def retry_after(wait):
+        """Valeur de l'en-tête Retry-After (secondes entières, au moins 1)"""
+        return str(max(1, math.ceil(wait)))
+
+    def status(self):
+        with self.lock:
+            return {
+                'capacity_per_s': round(self.capacity(), 2),
+                'client_share': self.client_share,
+                'clients': len({client for client, _ in self.clients}),
+                'pending': len(self.pending),
+                **self.counters
+            }
@@ -0,0 +1,107 @@
+# led_assets.py - Pages et ressources statiques : versionnées, précompressées et gardées en mémoire
+#
+# Les CSS/JS sont servis sous un nom contenant l'empreinte de leur contenu
+# (dashboard.3f2a9c1e0b.css) : le navigateur les garde un an sans revalider, et une
+# modification du fichier change l'URL. Les pages HTML sont rendues une seule fois au
+# démarrage ; tous les corps sont compressés (gzip, brotli si installé) à ce moment-là.
+import gzip
+import hashlib
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # optionnel : gzip seul
+    brotli = None
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Pages : toujours revalidées (304 grâce à l'ETag), elles portent les URL versionnées
+REVALIDATE = 'no-cache'
+MIMETYPES = {
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'text/javascript; charset=utf-8',
+    '.html': 'text/html; charset=utf-8',
+}
+# Ordre de préférence quand le client accepte plusieurs encodages
+ENCODINGS = ('br', 'gzip')
+
+
+def brotli_available():
+    return brotli is not None
+
+
+class Encoded:
+    """Corps précompressé : une variante par encodage (identity, gzip, br)"""
+
+    __slots__ = ('content_type', 'etag', 'bodies')
+
+    def __init__(self, data, content_type):
+        self.content_type = content_type
+        self.etag = hashlib.sha256(data).hexdigest()[:16]
+        self.bodies = {'identity': data}
+        variants = {'gzip': gzip.compress(data, 9, mtime=0)}
+        if brotli is not None:
+            variants['br'] = brotli.compress(data, quality=11)
+        # Une variante plus lourde que l'original (très petits fichiers) n'est pas gardée
+        self.bodies.update({name: body for name, body in variants.items() if len(body) < len(data)})
+
+    def choose(self, accept_encodings):
+        """Encodage à envoyer d'après Accept-Encoding (Accept de werkzeug)"""
+        for encoding in ENCODINGS:
+            if encoding in self.bodies and accept_encodings[encoding] > 0:
+                return encoding
+        return 'identity'
+
+    def best(self):
+        return min(len(body) for body in self.bodies.values())
+
+
+class AssetStore:
+    """Fichiers CSS/JS d'un dossier, indexés par nom versionné"""
+
+    def __init__(self, directory, url_prefix='/static'):
+        self.assets = {}  # nom versionné -> Encoded
+        self.urls = {}    # nom source -> URL versionnée
+        self.pages = {}   # route -> (Encoded, noms versionnés des ressources utilisées)
+        for path in sorted(Path(directory).iterdir()):
+            if path.suffix not in MIMETYPES:
+                continue
+            data = path.read_bytes()
+            name = f"{path.stem}.{hashlib.sha256(data).hexdigest()[:10]}{path.suffix}"
+            self.assets[name] = Encoded(data, MIMETYPES[path.suffix])
+            self.urls[path.name] = f"{url_prefix}/{name}"
+
+    def render(self, route, render_template, template):
+        """Rend une page une fois ; `asset('x.css')` y donne l'URL versionnée. Lève KeyError si absente"""
+        used = []
+
+        def asset(name):
+            url = self.urls[name]
+            used.append(url.rsplit('/', 1)[1])
+            return url
+
+        html = render_template(template, asset=asset)
+        self.pages[route] = (Encoded(html.encode('utf-8'), MIMETYPES['.html']), used)
+        return self.pages[route][0]
+
+    def weights(self):
+        """Octets transférés par chargement de page : avant (tout en ligne, non compressé) / après"""
+        report = {}
+        for route, (page, used) in self.pages.items():
+            assets = [self.assets[name] for name in used]
+            report[route] = {
+                'before_bytes': len(page.bodies['identity']) + sum(len(a.bodies['identity']) for a in assets),
+                'first_visit_bytes': page.best() + sum(a.best() for a in assets),
+                # Ressources en cache immuable : seule la page est revalidée (304 si inchangée)
+                'repeat_visit_bytes': page.best(),
+            }
+        return report
+
+    def status(self):
+        return {
+            'brotli': brotli_available(),
+            'assets': {
+                name: {encoding: len(body) for encoding, body in encoded.bodies.items()}
+                for name, encoded in self.assets.items()
+            },
+            'pages': self.weights()
+        }
@@ -0,0 +1,89 @@
+# led_breaker.py - Disjoncteur autour du transport BLE + tampon du dernier état voulu
+import threading
+import time
+
+from commun.led_protocole import TYPE_BRIGHTNESS, TYPE_COLOR, TYPE_POWER
+
+CLOSED = 'closed'        # Lien OK : les commandes partent normalement
+OPEN = 'open'            # Lien coupé : échec immédiat, dernier état mémorisé
+HALF_OPEN = 'half_open'  # Reconnecté : réconciliation en cours
+
+# Ordre d'application à la réconciliation (octet de type du paquet BLEDDM)
+RECONCILE_ORDER = (TYPE_POWER, TYPE_COLOR, TYPE_BRIGHTNESS)
+
+
+class CircuitBreaker:
+    """Ouvert à la déconnexion, semi-ouvert à la reconnexion, fermé après réconciliation.
+
+    Tant que le disjoncteur n'est pas fermé, les commandes ne sont pas envoyées :
+    seul le dernier paquet de chaque type (allumage, couleur, luminosité) est gardé,
+    le tampon est donc borné à trois entrées.
+    """
+
+    def __init__(self):
+        self.state = OPEN  # Pas encore connecté au démarrage
+        self.condition = threading.Condition()
+        self.pending = {}
+        self.opened_count = 0
+        self.buffered_count = 0
+        self.last_change = time.time()
+
+    def _set_state(self, state):
+        self.state = state
+        self.last_change = time.time()
+        self.condition.notify_all()
+
+    def is_closed(self):
+        return self.state == CLOSED
+
+    def open(self):
+        with self.condition:
+            if self.state != OPEN:
+                self.opened_count += 1
+                self._set_state(OPEN)
+
+    def half_open(self):
+        with self.condition:
+            if self.state == OPEN:
+                self._set_state(HALF_OPEN)
+
+    def buffer(self, command):
+        """Mémorise le paquet s'il ne peut pas partir. Retourne False si le lien est fermé (OK)"""
+        with self.condition:
+            if self.state == CLOSED:
+                return False
+            self.pending[command[2]] = bytes(command)
+            self.buffered_count += 1
+            return True
+
+    def take_pending_or_close(self):
+        """Retourne les paquets à réconcilier, ou ferme le disjoncteur s'il n'y en a plus.
+
+        Atomique : une commande tamponnée pendant la réconciliation est reprise
+        au tour suivant au lieu d'être perdue.
+        """
+        with self.condition:
+            if self.state != HALF_OPEN:
+                return []
+            if not self.pending:
+                self._set_state(CLOSED)
+                return []
+            packets = [self.pending.pop(kind) for kind in RECONCILE_ORDER if kind in self.pending]
+            packets.extend(self.pending.values())
+            self.pending.clear()
+            return packets
+
+    def wait_closed(self, timeout):
+        """Bloque jusqu'à la fermeture (ou timeout). Retourne True si fermé"""
+        with self.condition:
+            return self.condition.wait_for(self.is_closed, timeout=timeout)
+
+    def status(self):
+        with self.condition:
+            return {
+                'state': self.state,
+                'opened_count': self.opened_count,
+                'buffered_commands': self.buffered_count,
+                'pending': len(self.pending),
+                'since': self.last_change
+            }
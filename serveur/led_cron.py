@@ -0,0 +1,177 @@
+# led_cron.py - Échéances du planificateur : expressions cron et lever/coucher du soleil
+#
+# Tout est calculé localement (heure locale du serveur) : aucun service externe.
+import datetime
+import math
+import time
+
+FIELDS = (
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day', 1, 31),
+    ('month', 1, 12),
+    ('weekday', 0, 7),  # 0 et 7 = dimanche
+)
+NAMES = {
+    'month': {name: index for index, name in enumerate(
+        ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), 1)},
+    'weekday': {name: index for index, name in enumerate(('sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'))},
+}
+MACROS = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+    '@yearly': '0 0 1 1 *',
+}
+# Recherche de la prochaine échéance bornée (29 février d'une année bissextile compris)
+SEARCH_DAYS = 366 * 4 + 1
+# Soleil : réfraction et rayon apparent (-0,833°), obliquité de l'écliptique
+SUN_ALTITUDE = -0.833
+OBLIQUITY = 23.4397
+J2000 = 2451545.0
+UNIX_EPOCH_JD = 2440587.5
+
+
+class CronError(ValueError):
+    """Expression ou échéance invalide (message destiné au client de l'API)"""
+
+
+def _value(text, field):
+    text = text.lower()
+    if text in NAMES.get(field, {}):
+        return NAMES[field][text]
+    try:
+        return int(text)
+    except ValueError:
+        raise CronError(f"valeur invalide pour {field}: {text}")
+
+
+def _parse_field(text, field, low, high):
+    values = set()
+    for part in text.split(','):
+        body, _, step = part.partition('/')
+        try:
+            step = int(step) if step else 1
+        except ValueError:
+            step = 0
+        if step < 1:
+            raise CronError(f"pas invalide pour {field}: {part}")
+        if body == '*':
+            start, end = low, high
+        elif '-' in body:
+            start, end = (_value(bound, field) for bound in body.split('-', 1))
+        else:
+            start = _value(body, field)
+            end = high if step > 1 else start
+        if not low <= start <= end <= high:
+            raise CronError(f"{field} hors limites ({low}-{high}): {part}")
+        values.update(range(start, end + 1, step))
+    if field == 'weekday' and 7 in values:
+        values = (values - {7}) | {0}
+    return frozenset(values)
+
+
+class CronExpression:
+    """Expression cron à 5 champs (minute heure jour mois jour-de-semaine) ou macro @daily...
+
+    Comme cron, si le jour du mois et le jour de la semaine sont tous deux restreints,
+    l'un ou l'autre suffit.
+    """
+
+    def __init__(self, text):
+        self.text = text.strip()
+        fields = MACROS.get(self.text.lower(), self.text).split()
+        if len(fields) != 5:
+            raise CronError("5 champs attendus : minute heure jour mois jour-de-semaine")
+        parsed = [_parse_field(text, *spec) for text, spec in zip(fields, FIELDS)]
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (sorted(values) for values in parsed)
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    def _day_matches(self, day):
+        if day.month not in self.months:
+            return False
+        in_month = day.day in self.days
+        # isoweekday : lundi = 1 ... dimanche = 7 -> dimanche = 0
+        in_week = day.isoweekday() % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_month and in_week
+        return in_month or in_week
+
+    def next_after(self, moment):
+        """Prochaine échéance strictement après `moment` (horodatage Unix), heure locale"""
+        start = datetime.datetime.fromtimestamp(moment).replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        day = start.date()
+        for _ in range(SEARCH_DAYS):
+            if self._day_matches(day):
+                for hour in self.hours:
+                    if day == start.date() and hour < start.hour:
+                        continue
+                    for minute in self.minutes:
+                        if day == start.date() and hour == start.hour and minute < start.minute:
+                            continue
+                        return time.mktime(datetime.datetime.combine(day, datetime.time(hour, minute)).timetuple())
+            day += datetime.timedelta(days=1)
+        return None
+
+
+def sun_times(day, latitude, longitude):
+    """(lever, coucher) du jour `day` en horodatages Unix ; None si le soleil ne se lève/couche pas.
+
+    Équation du lever du soleil (précision de l'ordre de la minute).
+    """
+    cycle = day.toordinal() - datetime.date(2000, 1, 1).toordinal() - longitude / 360
+    anomaly = math.radians((357.5291 + 0.98560028 * cycle) % 360)
+    center = 1.9148 * math.sin(anomaly) + 0.0200 * math.sin(2 * anomaly) + 0.0003 * math.sin(3 * anomaly)
+    ecliptic = math.radians((math.degrees(anomaly) + center + 180 + 102.9372) % 360)
+    transit = J2000 + cycle + 0.0053 * math.sin(anomaly) - 0.0069 * math.sin(2 * ecliptic)
+    declination = math.asin(math.sin(ecliptic) * math.sin(math.radians(OBLIQUITY)))
+    phi = math.radians(latitude)
+    cos_hour = (
+        (math.sin(math.radians(SUN_ALTITUDE)) - math.sin(phi) * math.sin(declination))
+        / (math.cos(phi) * math.cos(declination))
+    )
+    if not -1 <= cos_hour <= 1:
+        return None  # nuit polaire ou soleil de minuit
+    half_day = math.degrees(math.acos(cos_hour)) / 360
+    return tuple((transit + sign * half_day - UNIX_EPOCH_JD) * 86400 for sign in (-1, 1))
+
+
+class SunSchedule:
+    """Lever ou coucher du soleil décalé de `offset_min` minutes, tous les jours"""
+
+    def __init__(self, event, offset_min, latitude, longitude):
+        if event not in ('sunrise', 'sunset'):
+            raise CronError("sun doit valoir sunrise ou sunset")
+        if latitude is None or longitude is None:
+            raise CronError("LATITUDE et LONGITUDE doivent être configurées pour sunrise/sunset")
+        self.event = event
+        self.offset = offset_min * 60
+        self.latitude = latitude
+        self.longitude = longitude
+
+    def next_after(self, moment):
+        day = datetime.date.fromtimestamp(moment) - datetime.timedelta(days=1)
+        for _ in range(SEARCH_DAYS):
+            times = sun_times(day, self.latitude, self.longitude)
+            if times is not None:
+                due = times[self.event == 'sunset'] + self.offset
+                if due > moment:
+                    return due
+            day += datetime.timedelta(days=1)
+        return None
+
+
+class OneShot:
+    """Échéance unique (date ISO locale)"""
+
+    def __init__(self, text):
+        try:
+            self.due = time.mktime(datetime.datetime.fromisoformat(text).timetuple())
+        except (TypeError, ValueError):
+            raise CronError(f"date invalide (ISO 8601 attendu): {text}")
+
+    def next_after(self, moment):
+        return self.due if self.due > moment else None
@@ -0,0 +1,173 @@
+# led_enregistrement.py - Enregistrement binaire des paquets BLE et relecture par mmap
+#
+# Format (little-endian) :
+#   en-tête 16 octets : b'LEDR', version (uint16), taille d'un record (uint16), started_at (double)
+#   records 13 octets : delta depuis le paquet précédent en µs (uint32) + paquet BLEDDM (9 octets)
+import mmap
+import struct
+import threading
+import time
+from pathlib import Path
+
+from commun.led_protocole import PACKET_SIZE
+
+MAGIC = b'LEDR'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHd')
+RECORD = struct.Struct(f'<I{PACKET_SIZE}s')
+EXTENSION = '.ledrec'
+
+# Un delta uint32 couvre ~71 minutes ; au-delà la pause est raccourcie à ce maximum
+MAX_DELTA_US = 0xFFFFFFFF
+# Les records sont écrits sur disque par un thread dédié, à cette période (secondes)
+FLUSH_INTERVAL_S = 0.5
+
+
+class RecordingError(ValueError):
+    """Fichier d'enregistrement invalide"""
+
+
+class PacketRecorder:
+    """Écrit chaque paquet réellement envoyé aux LEDs avec son instant relatif.
+
+    record() est appelé depuis la boucle BLE : il n'ajoute le record qu'à un tampon en
+    mémoire, un thread dédié l'écrit sur disque (aucune E/S fichier sur la boucle).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Sérialise start/stop : un arrêt en cours d'écriture finale n'est pas doublé par un départ
+        self._session = threading.Lock()
+        self.active = False
+        self.path = None
+        self._file = None
+        self._last = None
+        self._buffer = bytearray()
+        self._stop = threading.Event()
+        self._writer = None
+        self.count = 0
+
+    def start(self, path):
+        with self._session, self.lock:
+            if self.active:
+                return False
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(path, 'wb')
+            self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size, time.time()))
+            self._last = None
+            self._buffer.clear()
+            self.path = path
+            self.count = 0
+            self.active = True
+            self._stop.clear()
+            self._writer = threading.Thread(target=self._run, name='recorder-writer', daemon=True)
+            self._writer.start()
+            return True
+
+    def stop(self):
+        with self._session:
+            with self.lock:
+                if not self.active:
+                    return None
+                self.active = False
+            self._stop.set()
+            self._writer.join()
+            self._flush()
+            self._file.close()
+            self._file = None
+            return {'file': str(self.path), 'packets': self.count}
+
+    def _run(self):
+        while not self._stop.wait(FLUSH_INTERVAL_S):
+            self._flush()
+
+    def _flush(self):
+        with self.lock:
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        if data:
+            self._file.write(data)
+
+    def record(self, packet):
+        if not self.active:
+            return
+        now = time.monotonic()
+        with self.lock:
+            if not self.active:
+                return
+            # Le premier paquet part à t=0 : le silence avant la première commande n'est pas rejoué
+            delta = 0 if self._last is None else round((now - self._last) * 1_000_000)
+            self._last = now
+            self._buffer += RECORD.pack(min(delta, MAX_DELTA_US), bytes(packet))
+            self.count += 1
+
+    def status(self):
+        return {
+            'active': self.active,
+            'file': str(self.path) if self.path else None,
+            'packets': self.count
+        }
+
+
+class RecordingReader:
+    """Lecture d'un enregistrement par mmap : rien n'est chargé en mémoire d'avance"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        try:
+            size = self.path.stat().st_size
+            if size < HEADER.size:
+                raise RecordingError("fichier trop court")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        magic, version, record_size, self.started_at = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD.size:
+            self.close()
+            raise RecordingError("format d'enregistrement inconnu")
+        # Un record tronqué en fin de fichier (arrêt brutal) est ignoré
+        self.count = (size - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def events(self):
+        """Itère sur (instant en s depuis le début, paquet)"""
+        data = self._map
+        offset_us = 0
+        position = HEADER.size
+        for _ in range(self.count):
+            delta, packet = RECORD.unpack_from(data, position)
+            offset_us += delta
+            position += RECORD.size
+            yield offset_us / 1_000_000, packet
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def list_recordings(directory):
+    """Enregistrements disponibles (nom, paquets, taille) sans les ouvrir"""
+    recordings = []
+    for path in sorted(Path(directory).glob(f'*{EXTENSION}')):
+        size = path.stat().st_size
+        recordings.append({
+            'name': path.stem,
+            'packets': max(0, (size - HEADER.size) // RECORD.size),
+            'bytes': size
+        })
+    return recordings
+
@@ -0,0 +1,57 @@
+# led_etat.py - État versionné des LEDs (ETag, long-poll)
+import threading
+import time
+
+
+class VersionedState:
+    """État compact (bandes, effet actif, Pomodoro) avec un numéro de version.
+
+    Seul un changement effectif incrémente la version et réveille les long-polls. Les
+    dictionnaires publiés ne sont jamais modifiés (copie à l'écriture) : un instantané
+    peut être sérialisé hors verrou.
+    """
+
+    def __init__(self, initial):
+        self.condition = threading.Condition()
+        self.version = 1
+        self.state = initial
+        # Préfixe d'ETag propre à ce démarrage (les versions repartent de 1)
+        self.boot = format(int(time.time()), 'x')
+
+    def _publish(self, state):
+        self.state = state
+        self.version += 1
+        self.condition.notify_all()
+
+    def update(self, **changes):
+        """Champs de premier niveau (effect, pomodoro)"""
+        with self.condition:
+            if any(self.state.get(key) != value for key, value in changes.items()):
+                self._publish({**self.state, **changes})
+            return self.version
+
+    def update_devices(self, values):
+        """{bande: {power, color, brightness}} : une seule nouvelle version pour toutes les bandes"""
+        with self.condition:
+            devices = self.state['devices']
+            changed = {
+                name: {**devices[name], **fields}
+                for name, fields in values.items()
+                if any(devices[name].get(key) != value for key, value in fields.items())
+            }
+            if changed:
+                self._publish({**self.state, 'devices': {**devices, **changed}})
+            return self.version
+
+    def snapshot(self):
+        with self.condition:
+            return self.version, self.state
+
+    def wait(self, since, timeout):
+        """Long-poll : rend la main dès que la version diffère de `since` (ou au bout de timeout s)"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != since, timeout)
+            return self.version, self.state
+
+    def tag(self, version):
+        return f"{self.boot}-{version}"
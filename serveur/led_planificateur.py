@@ -0,0 +1,344 @@
+# led_planificateur.py - Tâches planifiées (réveil, baisse du soir, extinction à minuit)
+#
+# Fichier JSON : {"<nom>": {"cron": "30 6 * * 1-5", "action": {"scene": "maison"}}, ...}
+# Échéance : "cron" (5 champs), "at" (date ISO, une fois) ou "sun" ("sunrise"/"sunset")
+# avec "offset_min". Action : {"scene": nom}, {"effect": nom, "params": {...}} ou
+# {"power": bool, "color": [r, g, b], "brightness": 0-100, "transition_ms": ms}, "target" optionnel.
+#
+# Un seul minuteur sur la boucle asyncio du pool : les échéances sont dans un tas, seule
+# la plus proche est armée. Les actions s'exécutent hors de la boucle (executor).
+import collections
+import heapq
+import json
+import os
+import re
+import statistics
+import threading
+import time
+from pathlib import Path
+
+from commun.led_logging import get_logger
+from led_cron import CronError, CronExpression, OneShot, SunSchedule
+
+log = get_logger('planificateur')
+
+NAME_PATTERN = re.compile(r'^[a-z0-9_-]{1,40}$')
+MAX_JOBS = 200
+# Une échéance dépassée de plus de ce délai (serveur arrêté, machine en veille) est manquée
+MISFIRE_GRACE_S = 60.0
+# Réveil au moins toutes les minutes : un changement d'heure système est rattrapé
+MAX_SLEEP_S = 60.0
+# Échéances manquées comptées une à une au redémarrage (au-delà : saut direct à la suivante)
+MAX_CATCH_UP = 1000
+LATENESS_HISTORY = 256
+
+
+class JobError(ValueError):
+    """Tâche invalide ou introuvable (message destiné au client de l'API)"""
+
+
+def compile_action(action, known_path):
+    """Action -> [(route, corps)] dans l'ordre d'exécution. Lève JobError"""
+    if not isinstance(action, dict):
+        raise JobError("action doit être un objet JSON")
+    target = {'target': action['target']} if action.get('target') else {}
+    kinds = [kind for kind in ('scene', 'effect') if kind in action]
+    if len(kinds) > 1 or (kinds and any(key in action for key in ('power', 'color', 'brightness'))):
+        raise JobError("action : scene, effect ou power/color/brightness, pas plusieurs")
+
+    for kind in kinds:
+        # Nom interpolé dans la route : pas de / ni de ..
+        if not NAME_PATTERN.match(str(action[kind])):
+            raise JobError(f"{kind} invalide : {action[kind]}")
+
+    if 'scene' in action:
+        calls = [(f"/api/scene/{action['scene']}", target)]
+    elif 'effect' in action:
+        params = action.get('params') or {}
+        if not isinstance(params, dict):
+            raise JobError("params doit être un objet JSON")
+        calls = [(f"/api/effect/{action['effect']}", {**params, **target})]
+    else:
+        transition = {'transition_ms': action['transition_ms']} if action.get('transition_ms') else {}
+        calls = []
+        if action.get('power') is True:
+            calls.append(('/api/led/on', target))
+        if 'color' in action:
+            color = action['color']
+            if not isinstance(color, (list, tuple)) or len(color) != 3:
+                raise JobError("color doit être [r, g, b]")
+            calls.append(('/api/led/color', {'r': color[0], 'g': color[1], 'b': color[2], **transition, **target}))
+        if 'brightness' in action:
+            calls.append(('/api/led/brightness', {'brightness': action['brightness'], **transition, **target}))
+        if action.get('power') is False:
+            calls.append(('/api/led/off', target))
+        if not calls:
+            raise JobError("action vide")
+
+    for path, _ in calls:
+        if not known_path(path):
+            raise JobError(f"action inconnue : {path}")
+    return calls
+
+
+class Job:
+    """Tâche validée : spécification, échéancier et appels de routes"""
+
+    __slots__ = ('name', 'spec', 'schedule', 'calls', 'checked_at', 'next_run', 'generation',
+                 'fired', 'missed', 'last_run', 'last_status')
+
+    def __init__(self, name, spec, schedule, calls, checked_at):
+        self.name = name
+        self.spec = spec
+        self.schedule = schedule
+        self.calls = calls
+        # Échéances traitées jusqu'à cet instant (persisté : rattrapage au redémarrage)
+        self.checked_at = checked_at
+        self.next_run = None
+        self.generation = 0
+        self.fired = 0
+        self.missed = 0
+        self.last_run = None
+        self.last_status = None
+
+    @property
+    def enabled(self):
+        return self.spec.get('enabled', True)
+
+
+def _iso(moment):
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(moment)) if moment is not None else None
+
+
+class Scheduler:
+    """Tâches planifiées sur disque, déclenchées par un seul minuteur de la boucle asyncio"""
+
+    def __init__(self, path, run, latitude=None, longitude=None, known_path=lambda path: True,
+                 grace=MISFIRE_GRACE_S):
+        self.path = Path(path)
+        self.run = run  # run([(route, corps)]) -> statut HTTP le plus élevé
+        self.latitude = latitude
+        self.longitude = longitude
+        self.known_path = known_path
+        self.grace = grace
+        self.lock = threading.Lock()
+        self.jobs = {}
+        # Tâches du fichier refusées au chargement (ex. sun sans LATITUDE) : réécrites telles quelles
+        self.invalid = {}
+        self.heap = []  # (échéance, génération, nom) ; entrées périmées ignorées au dépilement
+        # Commune à toutes les tâches et toujours croissante : une tâche supprimée puis recréée
+        # sous le même nom ne reprend jamais la génération d'une ancienne entrée du tas
+        self.generation = 0
+        self.loop = None
+        self.handle = None
+        self.counters = {'fired': 0, 'missed': 0, 'failed': 0, 'wakeups': 0}
+        self.lateness = collections.deque(maxlen=LATENESS_HISTORY)
+        self._load()
+
+    def compile(self, name, spec, checked_at):
+        """Valide une tâche. Lève JobError"""
+        if not NAME_PATTERN.match(name):
+            raise JobError("nom invalide (a-z, 0-9, - et _, 40 caractères max)")
+        if not isinstance(spec, dict):
+            raise JobError("la tâche doit être un objet JSON")
+        kinds = [kind for kind in ('cron', 'at', 'sun') if kind in spec]
+        if len(kinds) != 1:
+            raise JobError("une échéance attendue : cron, at ou sun")
+        try:
+            if 'cron' in spec:
+                schedule = CronExpression(str(spec['cron']))
+            elif 'at' in spec:
+                schedule = OneShot(spec['at'])
+            else:
+                schedule = SunSchedule(spec['sun'], float(spec.get('offset_min', 0)), self.latitude, self.longitude)
+        except (CronError, TypeError, ValueError) as e:
+            raise JobError(str(e))
+        clean = {kinds[0]: spec[kinds[0]], 'action': spec.get('action'), 'enabled': bool(spec.get('enabled', True))}
+        if 'sun' in spec:
+            clean['offset_min'] = float(spec.get('offset_min', 0))
+        return Job(name, clean, schedule, compile_action(spec.get('action'), self.known_path), checked_at)
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                specs = json.load(f)
+            if not isinstance(specs, dict):
+                raise ValueError("objet JSON attendu")
+        except ValueError as e:  # json.JSONDecodeError est un ValueError
+            # Mis de côté : le prochain enregistrement n'écrase pas le fichier à réparer
+            aside = self.path.with_name(self.path.name + '.corrompu')
+            log.error("Planning %s illisible (%s) : aucune tâche, fichier déplacé vers %s", self.path, e, aside)
+            os.replace(self.path, aside)
+            return
+        except OSError as e:
+            log.error("Planning %s illisible (%s) : aucune tâche", self.path, e)
+            return
+        now = time.time()
+        for name, spec in specs.items():
+            try:
+                checked_at = float(spec.get('checked_at', now)) if isinstance(spec, dict) else now
+                self.jobs[name] = self.compile(name, spec, checked_at)
+            except (JobError, TypeError, ValueError) as e:
+                log.error("Tâche %s ignorée : %s", name, e)
+                self.invalid[name] = spec
+
+    def _persist(self):
+        """Écriture atomique (fichier temporaire puis remplacement)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix('.tmp')
+        specs = {**self.invalid, **{name: {**job.spec, 'checked_at': job.checked_at} for name, job in self.jobs.items()}}
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(specs, f, indent=2)
+        os.replace(temporary, self.path)
+
+    def _plan(self, job, now):
+        """Pousse la prochaine échéance dans le tas ; celles dépassées de plus de grace sont manquées"""
+        self.generation += 1
+        job.generation = self.generation
+        due = job.schedule.next_after(job.checked_at)
+        missed = 0
+        while due is not None and due < now - self.grace:
+            missed += 1
+            job.checked_at = due
+            due = job.schedule.next_after(now if missed >= MAX_CATCH_UP else due)
+        job.missed += missed
+        self.counters['missed'] += missed
+        job.next_run = due if job.enabled else None
+        if job.next_run is not None:
+            heapq.heappush(self.heap, (due, job.generation, job.name))
+
+    def start(self, loop):
+        """Planifie toutes les tâches sur la boucle `loop` (rattrapage des échéances manquées)"""
+        self.loop = loop
+        now = time.time()
+        with self.lock:
+            for job in self.jobs.values():
+                self._plan(job, now)
+            self._persist()
+        loop.call_soon_threadsafe(self._arm)
+
+    def _arm(self):
+        """(Boucle asyncio) Arme le minuteur sur l'échéance la plus proche"""
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        with self.lock:
+            while self.heap and self._stale(self.heap[0]):
+                heapq.heappop(self.heap)
+            due = self.heap[0][0] if self.heap else None
+        if due is not None:
+            self.handle = self.loop.call_later(min(max(due - time.time(), 0), MAX_SLEEP_S), self._fire)
+
+    def _stale(self, entry):
+        job = self.jobs.get(entry[2])
+        return job is None or job.generation != entry[1]
+
+    def _fire(self):
+        """(Boucle asyncio) Lance les tâches échues et replanifie"""
+        self.handle = None
+        now = time.time()
+        ready = []
+        with self.lock:
+            self.counters['wakeups'] += 1
+            while self.heap and self.heap[0][0] <= now:
+                entry = heapq.heappop(self.heap)
+                if self._stale(entry):
+                    continue
+                due, _, name = entry
+                job = self.jobs[name]
+                if now - due > self.grace:
+                    # Boucle bloquée ou machine en veille pendant l'échéance
+                    job.missed += 1
+                    self.counters['missed'] += 1
+                else:
+                    ready.append((job, due))
+                job.checked_at = due
+                self._plan(job, now)
+            if ready:
+                self._persist()
+        for job, due in ready:
+            self.loop.run_in_executor(None, self._execute, job, due)
+        self._arm()
+
+    def _execute(self, job, due=None):
+        """(Thread de l'executor) Exécute l'action ; retourne le statut HTTP le plus élevé"""
+        started = time.time()
+        try:
+            status = self.run(job.calls)
+        except Exception:
+            status = 500
+        with self.lock:
+            if due is not None:
+                self.lateness.append(started - due)
+                job.fired += 1
+                self.counters['fired'] += 1
+            job.last_run = started
+            job.last_status = status
+            if status >= 400:
+                self.counters['failed'] += 1
+        return status
+
+    def _rearm(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._arm)
+
+    def save(self, name, spec):
+        job = self.compile(name, spec, time.time())
+        if job.schedule.next_after(job.checked_at) is None:
+            raise JobError("aucune échéance à venir")
+        with self.lock:
+            if name not in self.jobs and len(self.jobs) >= MAX_JOBS:
+                raise JobError(f"au plus {MAX_JOBS} tâches")
+            self.jobs[name] = job
+            self.invalid.pop(name, None)
+            if self.loop is not None:
+                self._plan(job, time.time())
+            self._persist()
+        self._rearm()
+        return self.describe(job)
+
+    def delete(self, name):
+        with self.lock:
+            if self.jobs.pop(name, None) is None and self.invalid.pop(name, None) is None:
+                raise JobError(f"tâche inconnue: {name}")
+            self._persist()
+        self._rearm()
+
+    def run_now(self, name):
+        """Exécute immédiatement (test d'une tâche) sans toucher à son échéancier"""
+        job = self.jobs.get(name)
+        if job is None:
+            raise JobError(f"tâche inconnue: {name}")
+        return self._execute(job)
+
+    def describe(self, job):
+        return {
+            **job.spec,
+            'next_run': _iso(job.next_run),
+            'last_run': _iso(job.last_run),
+            'last_status': job.last_status,
+            'fired': job.fired,
+            'missed': job.missed,
+        }
+
+    def list(self):
+        with self.lock:
+            return {name: self.describe(job) for name, job in sorted(self.jobs.items())}
+
+    def status(self):
+        with self.lock:
+            lateness = sorted(self.lateness)
+            upcoming = min(((job.next_run, name) for name, job in self.jobs.items() if job.next_run), default=None)
+            return {
+                'jobs': len(self.jobs),
+                'running': self.loop is not None,
+                'next': {'job': upcoming[1], 'at': _iso(upcoming[0])} if upcoming else None,
+                **self.counters,
+                'lateness_ms': {
+                    'mean': round(statistics.fmean(lateness) * 1000, 2) if lateness else None,
+                    'p95': round(lateness[int(0.95 * (len(lateness) - 1))] * 1000, 2) if lateness else None,
+                    'max': round(lateness[-1] * 1000, 2) if lateness else None,
+                }
+            }
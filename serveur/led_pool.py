@@ -0,0 +1,96 @@
+# led_pool.py - Plusieurs bandes LED gérées par un seul serveur, sur une seule boucle asyncio
+import asyncio
+import threading
+import time
+
+
+def parse_devices(addresses, fallback_address):
+    """LED_ADDRESSES 'salon=AA:..,bureau=BB:..' (ou MAC seules) -> [(nom, adresse)]"""
+    devices = []
+    for index, entry in enumerate(part.strip() for part in addresses.split(',') if part.strip()):
+        name, _, address = entry.rpartition('=')
+        name = name.strip() or f"led{index + 1}"
+        if any(name == known for known, _ in devices):
+            raise ValueError(f"LED_ADDRESSES: nom de bande en double : {name}")
+        devices.append((name, address.strip()))
+    return devices or [('led', fallback_address)]
+
+
+def parse_groups(text, names):
+    """LED_GROUPS 'salon=led1+led2;bureau=led3' -> {groupe: [appareils]}"""
+    groups = {}
+    for entry in (part.strip() for part in text.split(';') if part.strip()):
+        group, _, members = entry.partition('=')
+        members = [m.strip() for m in members.split('+') if m.strip()]
+        unknown = [m for m in members if m not in names]
+        if unknown:
+            raise ValueError(f"LED_GROUPS: appareil(s) inconnu(s) dans {group}: {', '.join(unknown)}")
+        groups[group.strip()] = members
+    return groups
+
+
+class ControllerPool:
+    """Contrôleurs (un superviseur de connexion + une file d'écriture chacun) sur une boucle commune.
+
+    Les commandes de groupe sont soumises à toutes les bandes avant d'attendre les
+    résultats : la latence totale est celle de la bande la plus lente, pas la somme.
+    """
+
+    def __init__(self, controllers, groups=None):
+        self.devices = {controller.name: controller for controller in controllers}
+        self.groups = groups or {}
+        self.loop = None
+        self.thread = None
+
+    @property
+    def primary(self):
+        return next(iter(self.devices.values()))
+
+    def start(self, timeout=15):
+        """Démarre la boucle et les superviseurs. Retourne le nombre de bandes connectées"""
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        for controller in self.devices.values():
+            controller.attach(self.loop)
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and not all(c.is_connected for c in self.devices.values()):
+            time.sleep(0.5)
+        return sum(1 for c in self.devices.values() if c.is_connected)
+
+    def resolve(self, target):
+        """'all', un groupe ou un appareil -> liste de contrôleurs (KeyError si inconnu ou pas une chaîne)"""
+        if target is not None and not isinstance(target, str):
+            raise KeyError(target)
+        if target in (None, '', 'all'):
+            return list(self.devices.values())
+        if target in self.groups:
+            return [self.devices[name] for name in self.groups[target]]
+        return [self.devices[target]]
+
+    def fan_out(self, controllers, build):
+        """build(contrôleur) -> paquet (ou None) ; envoi simultané, résultat par appareil"""
+        return self.fan_out_sequences({c: [p for p in [build(c)] if p is not None] for c in controllers})
+
+    def fan_out_sequences(self, sequences):
+        """{contrôleur: [paquets]} : le k-ième paquet de chaque bande part en même temps"""
+        results = {controller.name: {"success": True, "error": None} for controller in sequences}
+        for index in range(max((len(p) for p in sequences.values()), default=0)):
+            pending = [
+                (controller, packets[index], controller.submit(packets[index]))
+                for controller, packets in sequences.items()
+                if index < len(packets) and results[controller.name]['success']
+            ]
+            for controller, packet, future in pending:
+                results[controller.name] = controller.wait(future, packet)
+        return results
+
+    def status(self):
+        return {
+            'devices': {
+                name: {'address': c.address, 'connected': c.is_connected}
+                for name, c in self.devices.items()
+            },
+            'groups': self.groups
+        }
@@ -0,0 +1,262 @@
+# led_profiler.py - Profilage à la demande du serveur LED (fenêtre bornée)
+import asyncio
+import collections
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Limites de sécurité pour une session de profilage
+MAX_DURATION = 300.0        # secondes
+MIN_INTERVAL = 0.001        # 1 ms entre deux échantillons
+MAX_SLOW_CALLBACKS = 200    # callbacks lents conservés par session
+# Depuis Python 3.12, cProfile passe par sys.monitoring : un seul profileur actif pour tout
+# le processus (tous les threads). Avant, le hook est propre à chaque thread.
+PROCESS_WIDE_PROFILER = sys.version_info >= (3, 12)
+# Threads vus par le mode déterministe (avant 3.12, ni les effets ni les autres threads)
+DETERMINISTIC_COVERAGE = (
+    "tous les threads" if PROCESS_WIDE_PROFILER
+    else "boucle BLE et requêtes Flask seulement, pas les threads d'effets (mode sampling pour eux)"
+)
+
+
+class SamplingProfiler:
+    """Profileur par échantillonnage couvrant tous les threads (Flask, effets, BLE)"""
+
+    def __init__(self, interval=0.005):
+        self.interval = max(MIN_INTERVAL, interval)
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                stack.reverse()
+                self.stacks[';'.join(stack)] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """Format 'collapsed stacks' (compatible flamegraph.pl / speedscope)"""
+        return '\n'.join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Capture les avertissements 'Executing ... took X seconds' du mode debug asyncio"""
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.records = collections.deque(maxlen=MAX_SLOW_CALLBACKS)
+
+    def emit(self, record):
+        message = record.getMessage()
+        if message.startswith('Executing'):
+            self.records.append({'time': record.created, 'message': message})
+
+
+class ProfilerManager:
+    """Démarre/arrête une session de profilage bornée dans le temps.
+
+    Aucun coût quand inactif : aucun thread d'échantillonnage, aucun hook
+    cProfile et la boucle asyncio reste hors mode debug.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.lock = threading.Lock()
+        self.active = False
+        self.session = None
+        self.last_result = None
+        self._timer = None
+
+    def start(self, loop, mode='sampling', duration=30.0, interval=0.005, slow_callback=0.05):
+        """Démarre une session. Retourne (ok, message)"""
+        if mode not in ('sampling', 'deterministic'):
+            return False, "mode doit être 'sampling' ou 'deterministic'"
+
+        with self.lock:
+            if self.active:
+                return False, "Une session de profilage est déjà active"
+
+            duration = max(1.0, min(float(duration), MAX_DURATION))
+            session = {
+                'mode': mode,
+                'started_at': time.time(),
+                'duration': duration,
+                'loop': loop,
+                'sampler': None,
+                'loop_profile': None,
+                'request_profiles': [],
+                'requests': 0,
+                'slow_handler': _SlowCallbackHandler(),
+            }
+
+            if mode == 'sampling':
+                session['sampler'] = SamplingProfiler(interval)
+                session['sampler'].start()
+            else:
+                session['loop_profile'] = cProfile.Profile()
+
+            if loop is not None and loop.is_running():
+                loop.call_soon_threadsafe(self._enable_loop_hooks, session, slow_callback)
+            elif session['loop_profile'] and PROCESS_WIDE_PROFILER:
+                # Pas de boucle BLE : le profileur de session suit quand même tout le processus
+                session['loop_profile'].enable()
+                session['enabled_here'] = True
+
+            self.session = session
+            self.active = True
+            self._timer = threading.Timer(duration, self.stop)
+            self._timer.daemon = True
+            self._timer.start()
+
+        if mode == 'deterministic':
+            return True, f"Profilage '{mode}' démarré pour {duration:.0f}s ; couverture : {DETERMINISTIC_COVERAGE}"
+        return True, f"Profilage '{mode}' démarré pour {duration:.0f}s"
+
+    def _enable_loop_hooks(self, session, slow_callback):
+        """Exécuté DANS le thread de la boucle BLE"""
+        loop = session['loop']
+        logging.getLogger('asyncio').addHandler(session['slow_handler'])
+        loop.slow_callback_duration = slow_callback
+        loop.set_debug(True)
+        if session['loop_profile']:
+            session['loop_profile'].enable()
+
+    @staticmethod
+    def _disable_loop_hooks(session, done):
+        """Exécuté DANS le thread de la boucle BLE"""
+        loop = session['loop']
+        if session['loop_profile']:
+            session['loop_profile'].disable()
+        loop.set_debug(False)
+        logging.getLogger('asyncio').removeHandler(session['slow_handler'])
+        done.set()
+
+    def stop(self):
+        """Arrête la session en cours et sauvegarde les résultats"""
+        with self.lock:
+            if not self.active:
+                return self.last_result
+            session = self.session
+            self.active = False
+            self.session = None
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+        if session['sampler']:
+            session['sampler'].stop()
+
+        loop = session['loop']
+        if session.get('enabled_here'):
+            session['loop_profile'].disable()
+        elif loop is not None and loop.is_running():
+            done = threading.Event()
+            loop.call_soon_threadsafe(self._disable_loop_hooks, session, done)
+            done.wait(timeout=2)
+
+        self.last_result = self._save(session)
+        return self.last_result
+
+    # Profilage déterministe des requêtes Flask (appelé par before/teardown_request)
+    def begin_request(self):
+        with self.lock:
+            if not self.active or self.session['mode'] != 'deterministic':
+                return None
+            self.session['requests'] += 1
+        if PROCESS_WIDE_PROFILER:
+            # Le profileur de session voit déjà ce thread ; en activer un second lèverait
+            # "Another profiling tool is already active"
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def end_request(self, profile):
+        profile.disable()
+        with self.lock:
+            if self.session is not None:
+                self.session['request_profiles'].append(profile)
+
+    def _save(self, session):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(session['started_at']))
+        result = {
+            'mode': session['mode'],
+            'started_at': session['started_at'],
+            'elapsed_seconds': round(time.time() - session['started_at'], 3),
+            'slow_callbacks': list(session['slow_handler'].records),
+        }
+
+        if session['sampler']:
+            sampler = session['sampler']
+            path = self.output_dir / f"profile-{stamp}.folded"
+            path.write_text(sampler.collapsed(), encoding='utf-8')
+            result['samples'] = sampler.samples
+            result['file'] = str(path)
+            result['top_stacks'] = [
+                {'stack': stack, 'count': count}
+                for stack, count in sampler.stacks.most_common(10)
+            ]
+        else:
+            # Un profil vide (boucle arrêtée, rien d'exécuté) ferait lever pstats.Stats
+            profiles = [
+                profile for profile in [session['loop_profile']] + session['request_profiles']
+                if profile.getstats()
+            ]
+            result['requests_profiled'] = session['requests']
+            result['coverage'] = DETERMINISTIC_COVERAGE
+            if not profiles:
+                result['file'] = None
+                result['summary'] = "Aucune donnée : rien n'a été exécuté dans les threads profilés"
+                return result
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            path = self.output_dir / f"profile-{stamp}.pstats"
+            stats.dump_stats(str(path))
+            result['file'] = str(path)
+
+            summary = io.StringIO()
+            pstats.Stats(str(path), stream=summary).sort_stats('cumulative').print_stats(15)
+            result['summary'] = summary.getvalue()
+
+        return result
+
+    def status(self):
+        with self.lock:
+            if not self.active:
+                return {'active': False, 'last_result': self.last_result}
+            return {
+                'active': True,
+                'mode': self.session['mode'],
+                'elapsed_seconds': round(time.time() - self.session['started_at'], 3),
+                'duration': self.session['duration'],
+            }
@@ -0,0 +1,253 @@
+# led_replay.py - Rejoue une capture de trafic API contre le transport BLE simulé
+#
+# Usage:
+#   python led_replay.py trafic/matin.jsonl.gz --save-baseline trafic/matin.baseline.json
+#   python led_replay.py trafic/matin.jsonl.gz --baseline trafic/matin.baseline.json
+#
+# Code de sortie 1 si le flux de paquets ou les latences régressent par rapport à la référence.
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Le serveur doit être importé APRÈS l'activation du transport simulé, avec des fichiers
+# jetables : les bandes simulées et les PUT/DELETE rejoués ne touchent pas aux vrais fichiers
+os.environ['LED_SIMULATION'] = 'true'
+REPLAY_DIR = tempfile.mkdtemp(prefix='led-replay-')
+os.environ['DEVICE_REGISTRY'] = os.path.join(REPLAY_DIR, 'appareils.json')
+os.environ['SCENES_FILE'] = os.path.join(REPLAY_DIR, 'scenes.json')
+os.environ['RECORDING_DIR'] = os.path.join(REPLAY_DIR, 'enregistrements')
+os.environ['SCHEDULE_FILE'] = os.path.join(REPLAY_DIR, 'planning.json')
+
+from led_trafic import load_traffic  # noqa: E402
+
+PACKET_TYPES = {0x01: 'brightness', 0x04: 'power', 0x05: 'color'}
+# Flux qui changent d'une exécution à l'autre (tirages aléatoires, source externe, transitions
+# échantillonnées à l'horloge) : seul leur volume est comparé
+RANDOM_EFFECTS = {'aurora', 'fire', 'audio', 'ambient', 'transition'}
+# Écart de volume toujours toléré (frames), en plus de --tolerance
+COUNT_SLACK = 2
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def latency_summary(values):
+    return {
+        'count': len(values),
+        'p50_ms': round(percentile(values, 50), 2),
+        'p95_ms': round(percentile(values, 95), 2),
+        'max_ms': round(max(values), 2) if values else 0.0
+    }
+
+
+def activity(led_serveur):
+    """Effet en cours ('transition' si seule une transition tourne), None sinon"""
+    effect = led_serveur.device_state.snapshot()[1].get('effect')
+    if effect is None and any(c.transitions.active for c in led_serveur.pool.devices.values()):
+        return 'transition'
+    return effect
+
+
+def segment(route, labels, packets):
+    """Paquets envoyés pendant une requête et jusqu'à la suivante, par bande et dans l'ordre.
+
+    exact : commandes seules, comparées paquet par paquet ; effect : effet déterministe dont
+    la durée dépend du timing (préfixe commun identique) ; random : volume seulement.
+    """
+    labels = sorted(label for label in labels if label)
+    kind = 'random' if RANDOM_EFFECTS.intersection(labels) else 'effect' if labels else 'exact'
+    by_device = {}
+    for _, device, packet in sorted(packets, key=lambda item: (item[1], item[0])):
+        by_device.setdefault(device, []).append(packet.hex())
+    result = {'route': route, 'kind': kind, 'effects': labels, 'count': len(packets)}
+    if kind != 'random':
+        result['packets'] = by_device
+    return result
+
+
+def replay(entries, speed, settle):
+    """Rejoue les requêtes avec leur timing d'origine. Retourne le résumé"""
+    import led_serveur
+
+    pool = led_serveur.pool
+    if not pool.start():
+        raise RuntimeError("Impossible de démarrer le contrôleur simulé")
+
+    client = led_serveur.app.test_client()
+    latencies = {}
+    status_mismatches = 0
+    # Une fenêtre par requête : (début, route, effet avant, effet juste après)
+    windows = []
+
+    start = time.monotonic()
+    for offset, method, path, body, status, _ in entries:
+        delay = start + offset / speed - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        before = activity(led_serveur)
+        sent = time.monotonic()
+        response = client.open(path, method=method, json=body)
+        elapsed = (time.monotonic() - sent) * 1000
+
+        route = path.split('?', 1)[0]
+        windows.append((sent, route, before, activity(led_serveur)))
+        latencies.setdefault(route, []).append(elapsed)
+        if response.status_code != status:
+            status_mismatches += 1
+
+    time.sleep(settle)
+    final = activity(led_serveur)
+    client.post('/api/effect/stop')
+
+    packets = sorted(
+        (stamp, name, packet)
+        for name, controller in pool.devices.items()
+        for stamp, packet in controller.client.packets
+    )
+    # Une fenêtre se termine au début de la requête suivante : l'effet alors en cours en fait partie
+    bounds = [window[0] for window in windows[1:]] + [float('inf')]
+    ends = [window[2] for window in windows[1:]] + [final]
+    segments = [
+        segment(route, {before, after, end}, [item for item in packets if begin <= item[0] < until])
+        for (begin, route, before, after), until, end in zip(windows, bounds, ends)
+    ]
+
+    digest = hashlib.sha256()
+    by_type = {}
+    for _, _, packet in packets:
+        digest.update(packet)
+        kind = PACKET_TYPES.get(packet[2], f'0x{packet[2]:02x}')
+        by_type[kind] = by_type.get(kind, 0) + 1
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        'requests': len(entries),
+        'status_mismatches': status_mismatches,
+        'latency': latency_summary(all_latencies),
+        'routes': {route: latency_summary(values) for route, values in sorted(latencies.items())},
+        'packets': {
+            'count': len(packets),
+            'by_type': by_type,
+            'sha256': digest.hexdigest(),
+            'duration_s': round(packets[-1][0] - packets[0][0], 3) if packets else 0.0,
+            'segments': segments
+        }
+    }
+
+
+def within(count, expected, tolerance):
+    return abs(count - expected) <= max(COUNT_SLACK, tolerance * expected)
+
+
+def first_difference(sent, expected):
+    for index, (packet, reference) in enumerate(zip(sent, expected)):
+        if packet != reference:
+            return f"paquet {index + 1}: {packet} au lieu de {reference}"
+    return f"{len(sent)} paquets au lieu de {len(expected)}"
+
+
+def compare_packets(segments, baseline_segments, tolerance):
+    """Flux de paquets requête par requête (type et contenu, dans l'ordre, par bande)"""
+    if baseline_segments is None:
+        return ["référence sans flux par requête : la régénérer avec --save-baseline"]
+    if len(segments) != len(baseline_segments):
+        return [f"requêtes: {len(segments)} vs {len(baseline_segments)} dans la référence"]
+
+    problems = []
+    for index, (current, base) in enumerate(zip(segments, baseline_segments), 1):
+        where = f"requête {index} ({current['route']})"
+        # Le timing peut faire finir une transition avant ou après la requête : le plus tolérant l'emporte
+        kinds = {current['kind'], base['kind']}
+        kind = 'random' if 'random' in kinds else 'effect' if 'effect' in kinds else 'exact'
+        if kind == 'random':
+            if not within(current['count'], base['count'], tolerance):
+                problems.append(f"{where}: {current['count']} paquets vs {base['count']} (effet aléatoire)")
+            continue
+        for device in sorted(set(current['packets']) | set(base['packets'])):
+            sent = current['packets'].get(device, [])
+            expected = base['packets'].get(device, [])
+            if kind == 'exact':
+                if sent != expected:
+                    problems.append(f"{where} {device}: {first_difference(sent, expected)}")
+                continue
+            common = min(len(sent), len(expected))
+            if sent[:common] != expected[:common]:
+                problems.append(f"{where} {device}: {first_difference(sent[:common], expected[:common])}")
+            elif not within(len(sent), len(expected), tolerance):
+                problems.append(f"{where} {device}: {len(sent)} paquets vs {len(expected)} ({', '.join(current['effects'])})")
+    return problems
+
+
+def compare(result, baseline, tolerance):
+    """Compare au résultat de référence. Retourne la liste des régressions"""
+    problems = []
+    if result['packets']['sha256'] != baseline['packets']['sha256']:
+        problems.extend(compare_packets(
+            result['packets']['segments'], baseline['packets'].get('segments'), tolerance
+        ))
+
+    for route, stats in result['routes'].items():
+        base = baseline['routes'].get(route)
+        if not base:
+            continue
+        limit = base['p95_ms'] * (1 + tolerance) + 1.0  # 1 ms de marge absolue
+        if stats['p95_ms'] > limit:
+            problems.append(f"{route}: p95 {stats['p95_ms']} ms > {limit:.2f} ms (référence {base['p95_ms']} ms)")
+
+    if result['status_mismatches'] > baseline.get('status_mismatches', 0):
+        problems.append(f"statuts HTTP différents de la capture: {result['status_mismatches']}")
+
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejoue une capture de trafic API (transport BLE simulé)")
+    parser.add_argument('capture', help="Fichier .jsonl.gz produit par /api/admin/traffic")
+    parser.add_argument('--speed', type=float, default=1.0, help="Facteur d'accélération du temps (défaut 1.0)")
+    parser.add_argument('--settle', type=float, default=1.0, help="Attente après la dernière requête (s)")
+    parser.add_argument('--seed', type=int, default=0, help="Graine aléatoire (effets aléatoires)")
+    parser.add_argument('--baseline', help="Résultat de référence à comparer")
+    parser.add_argument('--save-baseline', help="Enregistre le résultat comme référence")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Écart toléré (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    _, entries = load_traffic(args.capture)
+    print(f"[REPLAY] {len(entries)} requêtes, vitesse x{args.speed}")
+
+    result = replay(entries, max(args.speed, 0.01), args.settle)
+    summary = {**result, 'packets': {k: v for k, v in result['packets'].items() if k != 'segments'}}
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"[REPLAY] Référence enregistrée: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        problems = compare(result, baseline, args.tolerance)
+        if problems:
+            print("[REPLAY] ❌ Régressions détectées:")
+            for problem in problems:
+                print(f"  - {problem}")
+            return 1
+        print("[REPLAY] ✅ Conforme à la référence")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+# led_scenes.py - Scènes nommées (allumage, couleur, luminosité, effet) compilées en paquets
+#
+# Fichier JSON : {"<nom>": {"power": true, "color": [r, g, b], "brightness": 60, "effect": "aurora"}}
+# Les paquets sont construits à l'enregistrement ; le rappel n'a plus qu'à comparer
+# avec l'état mémorisé du contrôleur et envoyer la différence.
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+from commun.led_logging import get_logger
+from commun.led_protocole import (
+    POWER_OFF, POWER_ON, TYPE_BRIGHTNESS, TYPE_COLOR, TYPE_POWER,
+    brightness_packet, color_packet
+)
+
+log = get_logger('scenes')
+
+NAME_PATTERN = re.compile(r'^[a-z0-9_-]{1,40}$')
+MAX_SCENES = 200
+
+# Scènes créées au premier lancement (fichier absent)
+DEFAULT_SCENES = {
+    'maison': {'power': True, 'color': [255, 180, 50], 'brightness': 60},
+    'focus': {'power': True, 'color': [255, 255, 255], 'brightness': 100},
+    'nuit': {'power': True, 'color': [255, 0, 0], 'brightness': 10},
+    'eteint': {'power': False},
+}
+
+
+class SceneError(ValueError):
+    """Scène invalide ou introuvable (message destiné au client de l'API)"""
+
+
+class Scene:
+    """Scène validée : spécification + étapes précompilées (type, valeur, paquet)"""
+
+    __slots__ = ('name', 'spec', 'steps')
+
+    def __init__(self, name, spec, steps):
+        self.name = name
+        self.spec = spec
+        self.steps = steps
+
+    @property
+    def effect(self):
+        return self.spec.get('effect')
+
+
+def compile_scene(name, spec, effects=()):
+    """Valide une scène et construit ses paquets. Lève SceneError"""
+    if not NAME_PATTERN.match(name):
+        raise SceneError("nom invalide (a-z, 0-9, - et _, 40 caractères max)")
+    if not isinstance(spec, dict):
+        raise SceneError("la scène doit être un objet JSON")
+
+    power = spec.get('power', True)
+    if not isinstance(power, bool):
+        raise SceneError("power doit être true ou false")
+    clean = {'power': power}
+    # Allumage en premier (comme la réconciliation du disjoncteur)
+    steps = [(TYPE_POWER, power, POWER_ON if power else POWER_OFF)]
+
+    if power:
+        if 'color' in spec:
+            color = spec['color']
+            if not isinstance(color, (list, tuple)) or len(color) != 3:
+                raise SceneError("color doit être [r, g, b]")
+            try:
+                color = tuple(max(0, min(int(c), 255)) for c in color)
+            except (TypeError, ValueError):
+                raise SceneError("color doit contenir des entiers")
+            clean['color'] = list(color)
+            steps.append((TYPE_COLOR, color, color_packet(*color)))
+
+        if 'brightness' in spec:
+            try:
+                brightness = max(0, min(int(spec['brightness']), 100))
+            except (TypeError, ValueError):
+                raise SceneError("brightness doit être un entier 0-100")
+            clean['brightness'] = brightness
+            steps.append((TYPE_BRIGHTNESS, brightness, brightness_packet(brightness)))
+
+        effect = spec.get('effect')
+        if effect is not None:
+            if effect not in effects:
+                raise SceneError(f"effet inconnu: {effect}")
+            clean['effect'] = effect
+
+    return Scene(name, clean, tuple(steps))
+
+
+class SceneStore:
+    """Scènes sur disque (un fichier JSON) avec index en mémoire"""
+
+    def __init__(self, path, effects=()):
+        self.path = Path(path)
+        self.effects = frozenset(effects)
+        self.lock = threading.Lock()
+        self.index = {}
+        # Scènes du fichier refusées au chargement : réécrites telles quelles, jamais perdues
+        self.invalid = {}
+        self._load()
+
+    def _load(self):
+        specs = DEFAULT_SCENES
+        if self.path.exists():
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    specs = json.load(f)
+                if not isinstance(specs, dict):
+                    raise ValueError("objet JSON attendu")
+            except ValueError as e:  # json.JSONDecodeError est un ValueError
+                # Mis de côté : le prochain enregistrement n'écrase pas le fichier à réparer
+                aside = self.path.with_name(self.path.name + '.corrompu')
+                log.error("Scènes %s illisibles (%s) : scènes par défaut, fichier déplacé vers %s", self.path, e, aside)
+                os.replace(self.path, aside)
+                specs = DEFAULT_SCENES
+            except OSError as e:
+                log.error("Scènes %s illisibles (%s) : scènes par défaut", self.path, e)
+                specs = DEFAULT_SCENES
+        for name, spec in specs.items():
+            try:
+                self.index[name] = compile_scene(name, spec, self.effects)
+            except SceneError as e:
+                log.error("Scène %s ignorée : %s", name, e)
+                self.invalid[name] = spec
+        if not self.path.exists():
+            self._persist()
+
+    def _persist(self):
+        """Écriture atomique (fichier temporaire puis remplacement)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix('.tmp')
+        specs = {**self.invalid, **{name: scene.spec for name, scene in self.index.items()}}
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(specs, f, indent=2)
+        os.replace(temporary, self.path)
+
+    def get(self, name):
+        scene = self.index.get(name)
+        if scene is None:
+            raise SceneError(f"scène inconnue: {name}")
+        return scene
+
+    def save(self, name, spec):
+        scene = compile_scene(name, spec, self.effects)
+        with self.lock:
+            if name not in self.index and len(self.index) >= MAX_SCENES:
+                raise SceneError(f"au plus {MAX_SCENES} scènes")
+            self.index[name] = scene
+            self.invalid.pop(name, None)
+            self._persist()
+        return scene
+
+    def delete(self, name):
+        with self.lock:
+            if self.index.pop(name, None) is None and self.invalid.pop(name, None) is None:
+                raise SceneError(f"scène inconnue: {name}")
+            self._persist()
+
+    def list(self):
+        return {name: scene.spec for name, scene in sorted(self.index.items())}
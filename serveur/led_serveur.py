@@ -1,29 +1,133 @@
 # led_serveur.py - Serveur API avec CONNEXION PERSISTANTE (Optimisé)
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, g, send_file
 from flask_cors import CORS
+from functools import partial, wraps
 import asyncio
+import concurrent.futures
+import hmac
 import os
-import random
+import sys
+import tempfile
 import threading
 import time
 from pathlib import Path
-from bleak import BleakClient
+from urllib.parse import parse_qs
+from bleak import BleakClient, BleakScanner
 from dotenv import load_dotenv
 
-# Charger les variables d'environnement depuis .env
+try:
+    import waitress
+except ImportError:  # Dépendance optionnelle : serveur HTTP/1.1 keep-alive
+    waitress = None
+
+# Charger les variables d'environnement depuis .env (avant les modules qui lisent leur configuration)
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
-app = Flask(__name__)
+# Modules partagés avec le CLI (dossier commun/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from commun.led_logging import setup_logging, get_logger, route_logger, dropped_messages
+from commun.led_frames import compile_transition, compile_palette_cycle, compile_breathing, normalize_palette, cache_info
+from commun.led_couleur import mix
+from commun.led_aleatoire import UniformBatch, fire_frames, scale
+from commun import led_protocole as protocole
+from commun.led_audio import audio_frames, numpy_available, socket_source, stdin_source, wav_source
+from commun import led_ambiance as ambiance
+from commun.led_registre import DEFAULT_PATH as REGISTRY_DEFAULT_PATH, DeviceRegistry
+
+from led_profiler import ProfilerManager
+from led_simulation import SimulatedBleakClient, SimulatedBleakScanner, is_simulation_enabled
+from led_trafic import TrafficRecorder
+from led_stats import RollingStats
+from led_breaker import CircuitBreaker
+from led_timeline import TimelineError, TimelineLibrary
+from led_scenes import SceneError, SceneStore
+from led_tempo import BeatClock, MAX_BPM, MIN_BPM
+from led_transition import MAX_DURATION_MS as TRANSITION_MAX_MS, TransitionEngine
+from led_pool import ControllerPool, parse_devices, parse_groups
+from led_sync import SyncPlayer, cycle_stream
+from led_admission import AdmissionController
+from led_singleflight import SingleFlight, request_key
+from led_etat import VersionedState
+from led_assets import IMMUTABLE, REVALIDATE, AssetStore
+from led_planificateur import JobError, Scheduler
+from led_enregistrement import EXTENSION as RECORDING_EXTENSION, PacketRecorder, RecordingError, RecordingReader, list_recordings
+
+# Ressources statiques servies par /static/<nom versionné> (voir led_assets)
+app = Flask(__name__, static_folder=None)
 CORS(app)
 
+# Journalisation non bloquante : les écritures console/pipe se font dans un thread dédié
+setup_logging()
+route_logger('werkzeug')  # Journal des requêtes HTTP
+log_bt = get_logger('bt')
+log_api = get_logger('api')
+log_effect = get_logger('effect')
+log_pomodoro = get_logger('pomodoro')
+
 # Configuration depuis les variables d'environnement
 LED_ADDRESS = os.getenv('LED_ADDRESS', 'XX:XX:XX:XX:XX:XX')
+# Plusieurs bandes : 'salon=AA:..,bureau=BB:..' (prioritaire sur LED_ADDRESS)
+LED_ADDRESSES = os.getenv('LED_ADDRESSES', '')
+LED_GROUPS = os.getenv('LED_GROUPS', '')
 CHAR_UUID = os.getenv('CHAR_UUID', '0000fff3-0000-1000-8000-00805f9b34fb')
 BLUETOOTH_TIMEOUT = float(os.getenv('BLUETOOTH_TIMEOUT', '10'))
 FLASK_HOST = os.getenv('FLASK_HOST', '0.0.0.0')
 FLASK_PORT = int(os.getenv('FLASK_PORT', '5000'))
 FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+PROFILE_DIR = os.getenv('PROFILE_DIR') or str(Path(__file__).parent / 'profils')
+TRAFFIC_DIR = os.getenv('TRAFFIC_DIR') or str(Path(__file__).parent / 'trafic')
+TRAFFIC_CAPTURE = os.getenv('TRAFFIC_CAPTURE', '')
+# En simulation (replay, benchmarks), les bandes simulées restent hors du vrai registre
+DEVICE_REGISTRY = os.getenv('DEVICE_REGISTRY') or (
+    str(Path(tempfile.gettempdir()) / 'led-appareils-simulation.json') if is_simulation_enabled()
+    else str(REGISTRY_DEFAULT_PATH)
+)
+# Scan BLE périodique qui garde le registre frais (secondes, 0 = désactivé)
+REGISTRY_SCAN_INTERVAL = float(os.getenv('REGISTRY_SCAN_INTERVAL', '0'))
+RECORDING_DIR = os.getenv('RECORDING_DIR') or str(Path(__file__).parent / 'enregistrements')
+SCENES_FILE = os.getenv('SCENES_FILE') or str(Path(__file__).parent / 'scenes.json')
+AUDIO_DIR = os.getenv('AUDIO_DIR') or str(Path(__file__).parent / 'audio')
+AUDIO_PORT = int(os.getenv('AUDIO_PORT', '5055'))
+AUDIO_FPS = min(float(os.getenv('AUDIO_FPS', '20')), 20)
+AMBIENT_DIR = os.getenv('AMBIENT_DIR') or str(Path(__file__).parent / 'ambiance')
+AMBIENT_FIFO = os.getenv('AMBIENT_FIFO', '/tmp/led-ambiance.fifo')
+AMBIENT_FPS = float(os.getenv('AMBIENT_FPS', '30'))
+HEALTH_MIN_SUCCESS_RATE = float(os.getenv('HEALTH_MIN_SUCCESS_RATE', '90'))
+BEAT_BPM = float(os.getenv('BEAT_BPM', '120'))
+
+# Flux en direct (audio, ambiance) : au-delà de ce retard, le producteur a marqué une pause
+LIVE_RESYNC_S = 1.0
+# Lissage de la durée d'écriture BLE mesurée par bande (moyenne exponentielle)
+WRITE_LATENCY_SMOOTHING = 0.2
+# Pause après chaque écriture BLE (le contrôleur BLEDDM perd les paquets trop rapprochés)
+WRITE_PACING_S = 0.05
+# Contrôle d'admission des routes qui écrivent sur le lien BLE
+ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'True').lower() == 'true'
+# Part de la capacité du lien accordée à un seul client, et sa réserve (requêtes)
+ADMISSION_CLIENT_SHARE = float(os.getenv('ADMISSION_CLIENT_SHARE', '0.5'))
+ADMISSION_BURST = float(os.getenv('ADMISSION_BURST', '5'))
+# Budget de frame minimal annoncé aux commandes glissées du dashboard (ms)
+PREVIEW_MIN_FRAME_MS = float(os.getenv('PREVIEW_MIN_FRAME_MS', '16'))
+# Fenêtre de déduplication des requêtes identiques (ms, 0 = désactivée)
+SINGLE_FLIGHT_WINDOW_MS = float(os.getenv('SINGLE_FLIGHT_WINDOW_MS', '1000'))
+# Serveur waitress (si installé) : connexion keep-alive inactive fermée après ce délai (s),
+# threads de traitement (long-polls et flux SSE en occupent un chacun)
+KEEP_ALIVE_TIMEOUT = float(os.getenv('KEEP_ALIVE_TIMEOUT', '30'))
+HTTP_THREADS = int(os.getenv('HTTP_THREADS', '16'))
+# Appels par requête POST /api/batch
+BATCH_MAX_CALLS = int(os.getenv('BATCH_MAX_CALLS', '32'))
+# Attente maximale d'un long-poll /api/state?since= (secondes)
+STATE_POLL_TIMEOUT = float(os.getenv('STATE_POLL_TIMEOUT', '25'))
+# Tâches planifiées ; position pour les échéances sunrise/sunset (degrés décimaux)
+SCHEDULE_FILE = os.getenv('SCHEDULE_FILE') or str(Path(__file__).parent / 'planning.json')
+SCHEDULE_GRACE_S = float(os.getenv('SCHEDULE_GRACE_S', '60'))
+LATITUDE = float(os.environ['LATITUDE']) if os.getenv('LATITUDE') else None
+LONGITUDE = float(os.environ['LONGITUDE']) if os.getenv('LONGITUDE') else None
+
+# Tempo réglé par /api/beat, partagé par toutes les bandes (un effet peut être joué par n'importe laquelle)
+beat_clock = BeatClock(BEAT_BPM)
 
 # Variables globales pour gérer les effets avec thread-safety
 stop_effect = False
@@ -42,19 +146,69 @@ pomodoro_state = {
 }
 pomodoro_lock = threading.Lock()  # Verrou pour protéger l'état du Pomodoro
 
+RAINBOW_COLORS = (
+    (255, 0, 0), (255, 127, 0), (255, 255, 0),
+    (0, 255, 0), (0, 0, 255), (75, 0, 130), (148, 0, 211)
+)
+
+# Couleurs par défaut du fondu
+FADE_COLORS = (
+    (255, 0, 0),    # Rouge
+    (255, 165, 0),  # Orange
+    (255, 255, 0),  # Jaune
+    (0, 255, 0),    # Vert
+    (0, 0, 255),    # Bleu
+    (148, 0, 211)   # Violet
+)
+
+# Vague : couleurs chaudes puis froides
+WAVE_COLORS = (
+    (255, 0, 0),      # Rouge
+    (255, 87, 34),    # Rouge orangé
+    (255, 165, 0),    # Orange
+    (255, 193, 7),    # Ambre
+    (255, 255, 0),    # Jaune
+    (0, 255, 255),    # Cyan
+    (0, 191, 255),    # Bleu ciel
+    (0, 0, 255),      # Bleu
+    (75, 0, 130),     # Indigo
+    (148, 0, 211)     # Violet
+)
+
+
+def fade_table(colors=None, speed=1.0):
+    """Fondu : 50 étapes par transition, 50 ms par étape à vitesse 1"""
+    return compile_palette_cycle(tuple(colors or FADE_COLORS), 50, 0.05 / speed)
+
+
+def wave_table(speed=1.0):
+    """Vague : transitions très douces (80 étapes, 100 ms par étape à vitesse 1)"""
+    return compile_palette_cycle(WAVE_COLORS, 80, 0.1 / speed)
+
+
 class PersistentLEDController:
     """Contrôleur LED avec connexion Bluetooth persistante"""
 
-    def __init__(self, address, char_uuid):
+    def __init__(self, name, address, char_uuid):
+        self.name = name
         self.address = address
         self.char_uuid = char_uuid
         self.client = None
+        # Transport simulé (LED_SIMULATION=true) : aucun matériel requis
+        self.client_class = SimulatedBleakClient if is_simulation_enabled() else BleakClient
+        self.scanner_class = SimulatedBleakScanner if is_simulation_enabled() else BleakScanner
+        # Cible des écritures : handle GATT mis en cache par le registre, UUID à défaut
+        self.write_target = char_uuid
         self.is_connected = False
         self.current_color = (255, 255, 255)  # Blanc par défaut
         self.current_brightness = 100
+        self.is_on = None  # Inconnu tant qu'aucune commande d'allumage n'est partie
+        # Types de paquets dont l'état mémorisé reflète celui des LEDs (vidé à chaque connexion)
+        self.shadow_known = set()
 
-        # Thread et event loop pour gérer la connexion asynchrone
+        # Boucle asyncio partagée par le pool et file d'écriture propre à cette bande
         self.loop = None
+        self.write_queue = None
         self.connection_lock = threading.Lock()
         self.reconnect_attempts = 0
         self.max_reconnect_attempts = 5
@@ -66,69 +220,109 @@ class PersistentLEDController:
             'reconnections': 0,
             'uptime_start': time.time()
         }
+        # Fenêtres glissantes (1 min, 5 min, 1 h) : reflètent la qualité actuelle du lien
+        self.rolling = RollingStats()
+        self._has_connected = False
+
+        # Disjoncteur : échec immédiat hors connexion, dernier état réappliqué au retour du lien
+        self.breaker = CircuitBreaker()
+
+        # Enregistrement binaire des paquets envoyés (relecture par mmap)
+        self.recorder = PacketRecorder()
+
+        # Transitions douces demandées par l'API (transition_ms)
+        self.transitions = TransitionEngine(self._apply_transition)
+
+        # Horloge de tempo des effets rythmés (stroboscope, police, clignotement), commune aux bandes
+        self.beat_clock = beat_clock
+        self.last_write_done = 0.0
+        self.write_latency = 0.0
+
+        # Prévisualisation (glisser du dashboard) : dernière valeur en attente par type de paquet
+        self.preview_lock = threading.Lock()
+        self.preview_pending = {}
+        self.preview_busy = False
+        self.preview_stats = {'received': 0, 'written': 0, 'coalesced': 0, 'superseded': 0}
+
+        # Bandes qui rejouent les commandes de l'effet que joue cette bande (target d'un effet)
+        self.mirrors = ()
+
+    def attach(self, loop):
+        """Lance le superviseur de connexion et la file d'écriture sur la boucle partagée du pool"""
+        self.loop = loop
+        self.write_queue = asyncio.Queue()
+        log_bt.info("[STARTUP] %s: démarrage de la connexion persistante (%s)", self.name, self.address)
+        asyncio.run_coroutine_threadsafe(self._maintain_connection(), loop)
+        asyncio.run_coroutine_threadsafe(self._writer(), loop)
+
+    async def _writer(self):
+        """Vide la file d'écriture : une écriture BLE à la fois par bande"""
+        while True:
+            command, future = await self.write_queue.get()
+            try:
+                result = await self._send_command_async(command)
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            if not future.done():
+                future.set_result(result)
 
-    def start(self):
-        """Démarre le contrôleur avec connexion persistante"""
-        print("\n[STARTUP] Démarrage du contrôleur LED avec connexion persistante...")
-
-        # Créer un nouveau thread pour gérer la connexion Bluetooth
-        self.connection_thread = threading.Thread(target=self._run_connection_loop, daemon=True)
-        self.connection_thread.start()
-
-        # Attendre que la connexion soit établie
-        max_wait = 15
-        waited = 0
-        while not self.is_connected and waited < max_wait:
-            time.sleep(0.5)
-            waited += 0.5
-
-        if self.is_connected:
-            print("[STARTUP] ✅ Connexion Bluetooth établie avec succès!")
-            return True
-        else:
-            print("[STARTUP] ❌ Échec de la connexion initiale")
-            return False
-
-    def _run_connection_loop(self):
-        """Exécute la boucle de connexion dans un thread séparé"""
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
-
-        try:
-            self.loop.run_until_complete(self._maintain_connection())
-        except Exception as e:
-            print(f"[ERROR] Erreur dans la boucle de connexion: {e}")
-        finally:
-            self.loop.close()
+    async def _enqueue(self, command):
+        future = self.loop.create_future()
+        self.write_queue.put_nowait((command, future))
+        return await future
 
     async def _maintain_connection(self):
         """Maintient la connexion Bluetooth active et reconnecte si nécessaire"""
         while True:
+            cached = False
             try:
-                print(f"[BT] Tentative de connexion à {self.address}...")
-
-                async with BleakClient(self.address, timeout=BLUETOOTH_TIMEOUT) as client:
+                log_bt.info("[BT] Tentative de connexion à %s...", self.address)
+
+                # Appareil déjà découvert (registre) : pas de nouveau scan avant la connexion
+                connect_start = time.perf_counter()
+                target, cached = await device_registry.resolve(self.address, self.scanner_class, BLUETOOTH_TIMEOUT)
+                async with self.client_class(target, timeout=BLUETOOTH_TIMEOUT) as client:
+                    device_registry.record_connect(self.address, time.perf_counter() - connect_start, cached)
+                    try:
+                        self.write_target = device_registry.characteristic(
+                            self.address, self.char_uuid, getattr(client, 'services', None)
+                        )
+                    except Exception as e:
+                        log_bt.warning("[BT] Handle GATT introuvable (%s), écriture par UUID", e)
+                        self.write_target = self.char_uuid
                     self.client = client
                     self.is_connected = True
                     self.reconnect_attempts = 0
+                    if self._has_connected:
+                        self.rolling.record_reconnect()
+                    self._has_connected = True
 
-                    print(f"[BT] ✅ Connecté! RSSI: {client.rssi if hasattr(client, 'rssi') else 'N/A'}")
+                    log_bt.info("[BT] ✅ Connecté! RSSI: %s", client.rssi if hasattr(client, 'rssi') else 'N/A')
+                    self.shadow_known.clear()
+
+                    # Semi-ouvert : réappliquer l'état voulu pendant la coupure
+                    self.breaker.half_open()
+                    await self._reconcile()
 
                     # Maintenir la connexion active
                     while client.is_connected:
                         await asyncio.sleep(1)
                         # Vérification périodique de la connexion
 
-                    print("[BT] ⚠️ Connexion perdue")
+                    log_bt.warning("[BT] ⚠️ Connexion perdue")
                     self.is_connected = False
+                    self.breaker.open()
 
             except asyncio.TimeoutError:
                 self.is_connected = False
+                self.breaker.open()
+                if cached:
+                    device_registry.forget(self.address)
                 self.reconnect_attempts += 1
-                print(f"[BT] ❌ Timeout de connexion (tentative {self.reconnect_attempts}/{self.max_reconnect_attempts})")
+                log_bt.warning("[BT] ❌ Timeout de connexion (tentative %d/%d)", self.reconnect_attempts, self.max_reconnect_attempts)
 
                 if self.reconnect_attempts >= self.max_reconnect_attempts:
-                    print(f"[BT] ⚠️ Nombre maximum de tentatives atteint, attente 30s...")
+                    log_bt.warning("[BT] ⚠️ Nombre maximum de tentatives atteint, attente 30s...")
                     await asyncio.sleep(30)
                     self.reconnect_attempts = 0
                 else:
@@ -136,80 +330,208 @@ class PersistentLEDController:
 
             except Exception as e:
                 self.is_connected = False
-                print(f"[BT] ❌ Erreur: {e}")
+                self.breaker.open()
+                if cached:
+                    device_registry.forget(self.address)
+                log_bt.error("[BT] ❌ Erreur: %s", e)
                 await asyncio.sleep(5)
 
             # Incrémenter le compteur de reconnexions
             if self.stats['reconnections'] > 0 or not self.is_connected:
                 self.stats['reconnections'] += 1
 
+    async def _reconcile(self):
+        """Envoie le dernier état mémorisé pendant la coupure puis ferme le disjoncteur"""
+        while True:
+            packets = self.breaker.take_pending_or_close()
+            if not packets:
+                return
+            log_bt.info("[BT] Réconciliation: %d commande(s) en attente", len(packets))
+            for packet in packets:
+                result = await self._send_command_async(packet)
+                if not result['success']:
+                    log_bt.warning("[BT] Échec de réconciliation: %s", result['error'])
+
     async def _send_command_async(self, command):
         """Envoie une commande de manière asynchrone (thread-safe)"""
         if not self.is_connected or not self.client:
             return {"success": False, "error": "Non connecté aux LEDs"}
 
         try:
+            write_start = time.perf_counter()
             await self.client.write_gatt_char(
-                self.char_uuid,
-                bytearray(command),
+                self.write_target,
+                bytearray(protocole.to_wire(command)),
                 response=False
             )
-            await asyncio.sleep(0.05)  # Réduit de 0.1s à 0.05s
+            self.last_write_done = time.monotonic()
+            write_time = time.perf_counter() - write_start
+            self.rolling.record_write(True, write_time)
+            # Durée d'écriture lissée : avance donnée aux frames des effets de groupe
+            if self.write_latency == 0.0:
+                self.write_latency = write_time
+            else:
+                self.write_latency += (write_time - self.write_latency) * WRITE_LATENCY_SMOOTHING
+            self.recorder.record(command)
+            self.shadow_known.add(command[2])
+            written_at = self.last_write_done
+            await asyncio.sleep(WRITE_PACING_S)
             self.stats['commands_sent'] += 1
-            return {"success": True, "error": None}
+            return {"success": True, "error": None, "written_at": written_at}
 
         except Exception as e:
             self.stats['commands_failed'] += 1
+            self.rolling.record_write(False)
             return {"success": False, "error": str(e)}
 
-    def send_command(self, command):
-        """Envoie une commande de manière synchrone (pour appels depuis Flask)"""
-        if not self.is_connected:
-            return {"success": False, "error": "Bluetooth non connecté"}
-
-        # Utiliser asyncio.run_coroutine_threadsafe pour exécuter dans le bon event loop
-        future = asyncio.run_coroutine_threadsafe(
-            self._send_command_async(command),
-            self.loop
-        )
-
+    def submit(self, command, preview=False):
+        """Place la commande dans la file d'écriture sans attendre (Future concurrent)"""
+        # Une commande normale remplace la prévisualisation du même type encore en attente
+        if not preview and self.preview_pending:
+            with self.preview_lock:
+                if self.preview_pending.pop(command[2], None) is not None:
+                    self.preview_stats['superseded'] += 1
+        future = concurrent.futures.Future()
+        # Disjoncteur ouvert : pas d'attente, la commande remplace l'état voulu en attente
+        if self.breaker.buffer(command):
+            future.set_result({
+                "success": False,
+                "error": "Bluetooth non connecté (état mémorisé, appliqué à la reconnexion)",
+                "buffered": True
+            })
+            return future
+        return asyncio.run_coroutine_threadsafe(self._enqueue(command), self.loop)
+
+    def wait(self, future, command):
+        """Attend le résultat d'une commande soumise"""
         try:
             result = future.result(timeout=2.0)
+            if not result['success']:
+                self.shadow_known.discard(command[2])
             return result
         except TimeoutError:
+            self.shadow_known.discard(command[2])
             self.stats['commands_failed'] += 1
+            self.rolling.record_write(False)
             return {"success": False, "error": "Timeout lors de l'envoi de la commande"}
         except Exception as e:
+            self.shadow_known.discard(command[2])
             self.stats['commands_failed'] += 1
+            self.rolling.record_write(False)
             return {"success": False, "error": str(e)}
 
+    def send_command(self, command):
+        """Envoie une commande de manière synchrone (effets, transitions), répliquée sur les miroirs"""
+        mirrored = [(mirror, mirror.submit(mirror.stage_packet(command))) for mirror in self.mirrors]
+        result = self.wait(self.submit(command), command)
+        for mirror, future in mirrored:
+            mirror.wait(future, command)
+        return result
+
+    def submit_preview(self, packet):
+        """Écriture de faible priorité : une seule en vol, seule la valeur la plus récente attend"""
+        with self.preview_lock:
+            self.preview_stats['received'] += 1
+            if packet[2] in self.preview_pending:
+                self.preview_stats['coalesced'] += 1
+            self.preview_pending[packet[2]] = packet
+            if self.preview_busy:
+                return
+            self.preview_busy = True
+        self._preview_next()
+
+    def _preview_next(self, packet=None, future=None):
+        """Écrit la prochaine prévisualisation en attente (appelé à la fin de la précédente)"""
+        if future is not None and (future.cancelled() or future.exception() or not future.result()['success']):
+            self.shadow_known.discard(packet[2])
+        with self.preview_lock:
+            if not self.preview_pending:
+                self.preview_busy = False
+                return
+            packet = self.preview_pending.pop(next(iter(self.preview_pending)))
+            self.preview_stats['written'] += 1
+        self.submit(packet, preview=True).add_done_callback(partial(self._preview_next, packet))
+
+    def stage_power(self, on):
+        """Met à jour l'état mémorisé et retourne le paquet d'allumage/extinction"""
+        self.is_on = on
+        return protocole.POWER_ON if on else protocole.POWER_OFF
+
+    def stage_color(self, r, g, b):
+        self.current_color = (r, g, b)
+        return protocole.color_packet(r, g, b)
+
+    def stage_brightness(self, brightness):
+        self.current_brightness = brightness
+        return protocole.brightness_packet(brightness)
+
     def power_on(self):
         """Allumer"""
-        return self.send_command([0x7e, 0x00, 0x04, 0xf0, 0x00, 0x01, 0xff, 0x00, 0xef])
+        return self.send_command(self.stage_power(True))
 
     def power_off(self):
         """Éteindre"""
-        return self.send_command([0x7e, 0x00, 0x04, 0x00, 0x00, 0x00, 0xff, 0x00, 0xef])
+        return self.send_command(self.stage_power(False))
 
     def set_color(self, r, g, b):
         """Changer couleur"""
-        self.current_color = (r, g, b)
-        return self.send_command([0x7e, 0x00, 0x05, 0x03, r, g, b, 0x00, 0xef])
+        return self.send_command(self.stage_color(r, g, b))
 
     def set_brightness(self, brightness):
         """Définir la luminosité (0-100)"""
-        value = int((brightness / 100) * 255)
-        self.current_brightness = brightness
-        return self.send_command([0x7e, 0x00, 0x01, value, 0x00, 0x00, 0x00, 0x00, 0xef])
+        return self.send_command(self.stage_brightness(brightness))
+
+    def stage_packet(self, packet):
+        """Met à jour l'état mémorisé d'après un paquet précompilé et le retourne"""
+        kind, value = protocole.decode(packet)
+        if kind == protocole.TYPE_COLOR:
+            self.current_color = value
+        elif kind == protocole.TYPE_BRIGHTNESS:
+            self.current_brightness = value
+        elif kind == protocole.TYPE_POWER:
+            self.is_on = value
+        return packet
+
+    def send_packet(self, packet):
+        """Envoie un paquet précompilé en tenant à jour l'état mémorisé"""
+        return self.send_command(self.stage_packet(packet))
+
+    def scene_packets(self, scene):
+        """Paquets précompilés qui diffèrent de l'état mémorisé (l'état est mis à jour)"""
+        shadow = {
+            protocole.TYPE_POWER: self.is_on,
+            protocole.TYPE_COLOR: self.current_color,
+            protocole.TYPE_BRIGHTNESS: self.current_brightness,
+        }
+        packets = []
+        for kind, value, packet in scene.steps:
+            if kind in self.shadow_known and shadow[kind] == value:
+                continue
+            if kind == protocole.TYPE_POWER:
+                self.is_on = value
+            elif kind == protocole.TYPE_COLOR:
+                self.current_color = value
+            else:
+                self.current_brightness = value
+            packets.append(packet)
+        return packets
+
+    def _apply_transition(self, kind, value):
+        if kind == 'color':
+            self.set_color(*value)
+        else:
+            self.set_brightness(value)
 
-    def set_white(self, brightness=255):
-        """Mode blanc pur"""
-        result = self.set_color(255, 255, 255)
-        if not result['success']:
-            return result
-        if brightness < 255:
-            return self.set_brightness(int((brightness / 255) * 100))
-        return {"success": True, "error": None}
+    def fade_color(self, r, g, b, duration_ms):
+        """Transition vers (r, g, b) ; recible depuis la couleur courante si une transition tourne"""
+        self.transitions.start('color', self.current_color, (r, g, b), duration_ms / 1000, mix)
+
+    def fade_brightness(self, brightness, duration_ms):
+        """Transition de luminosité (0-100)"""
+        self.transitions.start(
+            'brightness', self.current_brightness, brightness, duration_ms / 1000,
+            lambda start, target, progress: round(start + (target - start) * progress)
+        )
 
     def get_stats(self):
         """Retourne les statistiques"""
@@ -218,6 +540,20 @@ class PersistentLEDController:
             **self.stats,
             'uptime_seconds': uptime,
             'is_connected': self.is_connected,
+            'log_dropped': dropped_messages(),
+            'windows': self.rolling.snapshot(),
+            'circuit': self.breaker.status(),
+            'frame_cache': cache_info(),
+            'transitions': self.transitions.status(),
+            'beat': self.beat_clock.status(),
+            'write_latency_ms': round(self.write_latency * 1000, 2),
+            'preview': dict(self.preview_stats),
+            'shadow': {
+                'is_on': self.is_on,
+                'color': self.current_color,
+                'brightness': self.current_brightness,
+                'known': sorted(self.shadow_known)
+            },
             'success_rate': (
                 self.stats['commands_sent'] /
                 (self.stats['commands_sent'] + self.stats['commands_failed']) * 100
@@ -226,25 +562,194 @@ class PersistentLEDController:
             )
         }
 
+    def _effect_wait(self, delay):
+        """Pause d'un effet ; suspend l'effet tant que le lien BLE est coupé"""
+        time.sleep(delay)
+        while not stop_effect and not self.breaker.is_closed():
+            self.breaker.wait_closed(timeout=0.5)
+
+    def _play_cycle(self, table):
+        """Joue une table de frames en boucle jusqu'à l'arrêt de l'effet"""
+        rgb, delays = table.rgb, table.delays
+        index, length = 0, len(delays)
+        while not stop_effect:
+            base = index * 3
+            self.set_color(rgb[base], rgb[base + 1], rgb[base + 2])
+            self._effect_wait(delays[index])
+            index = (index + 1) % length
+
+    def _play_timed(self, events, origin, max_lateness=None):
+        """Envoie des (instant relatif, paquet) sur des échéances absolues (horloge monotone).
+
+        Le temps d'envoi ne décale pas la suite : en retard, un paquet est sauté si le
+        suivant, du même type, est déjà échu. Pour un flux en direct (lecture bloquante),
+        max_lateness remplace cette anticipation : un paquet plus en retard que ce seuil
+        est sauté (arriéré du producteur). Retourne l'origine, décalée des coupures du lien.
+        """
+        events = iter(events)
+        current = next(events, None)
+        resync = max_lateness is not None
+        while current is not None and not stop_effect:
+            offset, packet = current
+            delay = origin + offset - time.monotonic()
+            if delay > 0:
+                # Tranches courtes : l'arrêt de l'effet reste réactif pendant les longues pauses
+                time.sleep(min(delay, 0.1))
+                continue
+            if max_lateness is not None:
+                # Flux en direct : l'origine suit le producteur (premier paquet, reprise après un blanc)
+                if resync or -delay > LIVE_RESYNC_S:
+                    origin = time.monotonic() - offset
+                    resync = False
+                elif -delay > max_lateness:
+                    current = next(events, None)
+                    continue
+                following = None
+            else:
+                following = next(events, None)
+                if (following is not None and following[1][2] == packet[2]
+                        and origin + following[0] <= time.monotonic()):
+                    current = following
+                    continue
+            self.send_packet(packet)
+            if not self.breaker.is_closed():
+                # Lien coupé : pause, puis reprise décalée de la durée de coupure
+                paused = time.monotonic()
+                self._effect_wait(0)
+                origin += time.monotonic() - paused
+            current = following if max_lateness is None else next(events, None)
+        return origin
+
+    def play_stream(self, stream):
+        """Joue un flux de paquets compilé (timeline), en boucle si demandé"""
+        if not len(stream):
+            return
+        iteration = 0
+        origin = time.monotonic()
+        while not stop_effect and (stream.repeat == 0 or iteration < stream.repeat):
+            events = ((stream.times[index], stream.packet(index)) for index in range(len(stream)))
+            origin = self._play_timed(events, origin)
+            iteration += 1
+            origin += stream.duration
+            # Plus d'une itération de retard : repartir de maintenant plutôt que rattraper
+            if origin + stream.duration < time.monotonic():
+                origin = time.monotonic()
+
+    def timeline_effect(self, stream):
+        """Effet décrit en JSON (timeline compilée)"""
+        log_effect.info("[TIMELINE] Démarrage timeline %s (%d paquets)", stream.digest[:12], len(stream))
+        self.play_stream(stream)
+        log_effect.info("[TIMELINE] Effet arrêté")
+
+    def recording_effect(self, path, loop=False):
+        """Relecture d'un enregistrement binaire, lu à la volée par mmap"""
+        log_effect.info("[RECORDING] Relecture %s", path.name)
+        try:
+            with RecordingReader(path) as reader:
+                while not stop_effect:
+                    self._play_timed(reader.events(), time.monotonic())
+                    if not loop:
+                        break
+        except (OSError, RecordingError) as e:
+            log_effect.error("[RECORDING] Lecture impossible: %s", e)
+        log_effect.info("[RECORDING] Effet arrêté")
+
+    def audio_effect(self, open_source, live):
+        """Effet audio-réactif : une couleur par bloc de 1/AUDIO_FPS s de son"""
+        log_effect.info("[AUDIO] Démarrage effet audio")
+        try:
+            source = open_source()
+        except (OSError, ValueError) as e:
+            log_effect.error("[AUDIO] Source indisponible: %s", e)
+            return
+        if source is None:  # Arrêté avant la connexion d'un producteur
+            return
+
+        try:
+            # Luminosité repliée dans la couleur : une écriture par frame
+            if self.current_brightness != 100:
+                self.set_brightness(100)
+            events = (
+                (offset, protocole.color_packet(*color))
+                for offset, color in audio_frames(source, AUDIO_FPS)
+            )
+            # En direct, on ne rattrape pas : une frame de plus d'un pas de retard est sautée
+            self._play_timed(events, time.monotonic(), 1 / AUDIO_FPS if live else None)
+        finally:
+            source.close()
+        log_effect.info("[AUDIO] Effet arrêté")
+
+    def ambient_effect(self, frames, fps, mode, live):
+        """Éclairage d'ambiance : couleur d'images/vidéo, seulement si perceptiblement différente"""
+        log_effect.info("[AMBIENT] Démarrage ambiance (%s)", mode)
+        try:
+            if self.current_brightness != 100:
+                self.set_brightness(100)
+            started = time.monotonic()
+            events = (
+                # En direct, le producteur impose sa cadence : instant d'arrivée de l'image
+                (time.monotonic() - started if live else offset, protocole.color_packet(*color))
+                for offset, color in ambiance.ambient_colors(frames, fps, mode)
+            )
+            self._play_timed(events, started, 1 / fps if live else None)
+        except (OSError, ValueError) as e:
+            log_effect.error("[AMBIENT] Source illisible: %s", e)
+        finally:
+            frames.close()
+        log_effect.info("[AMBIENT] Effet arrêté")
+
+    def _play_on_beat(self, colors, subdivision, steps=None):
+        """Joue colors[k % n] au front k, un front toutes les `subdivision` battements.
+
+        Chaque front vise un instant absolu de l'horloge de tempo (pas de dérive) et part
+        en avance de la latence d'écriture mesurée. Un front raté de plus d'un demi-pas
+        est sauté (compté dans missed) au lieu de décaler les suivants. Retourne le
+        nombre de fronts joués.
+        """
+        clock = self.beat_clock
+        # Premier front : début de motif suivant (colors[0] tombe sur le temps)
+        length = len(colors)
+        step = (int(clock.beat_at(time.monotonic()) / subdivision) // length + 1) * length
+        played = 0
+        while not stop_effect and (steps is None or played < steps):
+            # Recalculé à chaque tour : un changement de BPM s'applique immédiatement
+            target = clock.time_of(step * subdivision)
+            now = time.monotonic()
+            delay = target - clock.latency - now
+            if delay > 0:
+                time.sleep(min(delay, 0.05))
+                continue
+            if now - target > subdivision * 30 / clock.bpm:
+                clock.record_missed()
+                step += 1
+                continue
+
+            decided = time.monotonic()
+            result = self.set_color(*colors[step % len(colors)])
+            if result['success']:
+                clock.observe_latency(self.last_write_done - decided)
+                clock.record_edge(target, self.last_write_done)
+            if not self.breaker.is_closed():
+                self._effect_wait(0)
+                step = int(clock.beat_at(time.monotonic()) / subdivision)
+            step += 1
+            played += 1
+        return played
+
     # Effets spéciaux (exécutés dans le thread d'effets)
     def rainbow_effect(self):
         """Effet arc-en-ciel"""
         global stop_effect
-        print("[RAINBOW] Démarrage effet arc-en-ciel")
-
-        colors = [
-            (255, 0, 0), (255, 127, 0), (255, 255, 0),
-            (0, 255, 0), (0, 0, 255), (75, 0, 130), (148, 0, 211)
-        ]
+        log_effect.info("[RAINBOW] Démarrage effet arc-en-ciel")
 
         while not stop_effect:
-            for color in colors:
+            for color in RAINBOW_COLORS:
                 if stop_effect:
                     break
                 self.set_color(*color)
-                time.sleep(1.0)
+                self._effect_wait(1.0)
 
-        print("[RAINBOW] Effet arrêté")
+        log_effect.info("[RAINBOW] Effet arrêté")
 
     def breathing_effect(self, color=None):
         """Effet respiration - utilise la couleur actuelle si non spécifiée"""
@@ -254,26 +759,21 @@ class PersistentLEDController:
         if color is None:
             color = self.current_color
 
-        print(f"[BREATH] Démarrage effet respiration avec couleur {color}")
+        log_effect.info("[BREATH] Démarrage effet respiration avec couleur %s", color)
 
         # Définir la couleur une seule fois au début
         self.set_color(*color)
 
+        # Rampe perceptuelle précalculée (niveaux identiques fusionnés)
+        levels, delays = compile_breathing(20, 0.05)
+        index = 0
         while not stop_effect:
-            for brightness in range(0, 101, 5):
-                if stop_effect:
-                    break
-                self.set_brightness(brightness)
-                time.sleep(0.05)
-
-            for brightness in range(100, -1, -5):
-                if stop_effect:
-                    break
-                self.set_brightness(brightness)
-                time.sleep(0.05)
+            self.set_brightness(levels[index])
+            self._effect_wait(delays[index])
+            index = (index + 1) % len(levels)
 
         self.set_brightness(100)
-        print("[BREATH] Effet arrêté")
+        log_effect.info("[BREATH] Effet arrêté")
 
     def strobe_effect(self, color=None):
         """Effet stroboscopique - utilise la couleur actuelle si non spécifiée"""
@@ -283,206 +783,125 @@ class PersistentLEDController:
         if color is None:
             color = self.current_color
 
-        print(f"[STROBE] Démarrage effet stroboscope avec couleur {color}")
-
-        while not stop_effect:
-            self.set_color(*color)
-            time.sleep(0.1)
-            self.set_color(0, 0, 0)
-            time.sleep(0.1)
+        log_effect.info("[STROBE] Démarrage effet stroboscope avec couleur %s", color)
+        # Deux flashs par battement (allumé un quart de battement, éteint un quart)
+        self._play_on_beat((color, (0, 0, 0)), 0.25)
 
         # Restaurer la couleur d'origine après l'effet
         self.set_color(*color)
 
-        print("[STROBE] Effet arrêté")
+        log_effect.info("[STROBE] Effet arrêté")
 
     def police_effect(self):
         """Effet sirène de police"""
         global stop_effect
-        print("[POLICE] Démarrage effet sirène de police")
+        log_effect.info("[POLICE] Démarrage effet sirène de police")
 
-        while not stop_effect:
-            self.set_color(255, 0, 0)
-            time.sleep(0.3)
-            if stop_effect:
-                break
-            self.set_color(0, 0, 255)
-            time.sleep(0.3)
+        # Rouge / bleu en alternance à chaque demi-battement
+        self._play_on_beat(((255, 0, 0), (0, 0, 255)), 0.5)
 
-        print("[POLICE] Effet arrêté")
+        log_effect.info("[POLICE] Effet arrêté")
 
     def aurora_effect(self):
         """Effet aurores boréales"""
         global stop_effect
-        print("[AURORA] Démarrage effet aurores boréales")
+        log_effect.info("[AURORA] Démarrage effet aurores boréales")
 
-        aurora_colors = [
+        aurora_colors = (
             (0, 255, 100), (50, 255, 150), (0, 200, 255),
             (100, 150, 255), (150, 100, 255), (100, 255, 200)
-        ]
-
-        color_index = 0
+        )
+        steps = 10
+        delay = 0.1
 
-        while not stop_effect:
-            target_color = aurora_colors[color_index]
+        batch = UniformBatch()
 
-            steps = 10
-            delay = 0.1
-            start_r, start_g, start_b = self.current_color
-            target_r, target_g, target_b = target_color
+        # Le scintillement est replié dans la couleur : une écriture par frame
+        if self.current_brightness != 100:
+            self.set_brightness(100)
 
-            for i in range(steps + 1):
+        def play_transition(table, number):
+            rgb, delays = table.rgb, table.delays
+            for index in table.segment(number):
                 if stop_effect:
-                    break
+                    return
+                base = index * 3
+                level = batch.randint(70, 100)
+                self.set_color(*scale((rgb[base], rgb[base + 1], rgb[base + 2]), level))
+                self._effect_wait(delays[index])
+            # Pause sur la couleur
+            self._effect_wait(batch.uniform(1.5, 3.0))
+
+        # Première transition depuis la couleur actuelle, puis cycle précalculé
+        # (la transition k va de aurora_colors[k] à aurora_colors[k + 1])
+        play_transition(compile_transition(self.current_color, aurora_colors[0], steps, delay), 0)
+        cycle = compile_palette_cycle(aurora_colors, steps, delay)
+        transition = 0
+        while not stop_effect:
+            play_transition(cycle, transition)
+            transition = (transition + 1) % len(aurora_colors)
 
-                progress = i / steps
-                r = int(start_r + (target_r - start_r) * progress)
-                g = int(start_g + (target_g - start_g) * progress)
-                b = int(start_b + (target_b - start_b) * progress)
+        log_effect.info("[AURORA] Effet arrêté")
 
-                self.set_color(r, g, b)
-                brightness = random.randint(70, 100)
-                self.set_brightness(brightness)
-                time.sleep(delay)
+    def fire_effect(self):
+        """Effet feu/flammes : tirage pondéré O(1), luminosité repliée dans la couleur"""
+        global stop_effect
+        log_effect.info("[FIRE] Démarrage effet flammes")
 
-            time.sleep(random.uniform(1.5, 3.0))
-            color_index = (color_index + 1) % len(aurora_colors)
+        if self.current_brightness != 100:
+            self.set_brightness(100)
 
-        self.set_brightness(100)
-        print("[AURORA] Effet arrêté")
+        for color, delay in fire_frames():
+            if stop_effect:
+                break
+            self.set_color(*color)
+            self._effect_wait(delay)
+
+        log_effect.info("[FIRE] Effet arrêté")
 
     def fade_colors_effect(self, colors=None, speed=1.0):
         """Effet fondu entre plusieurs couleurs personnalisées"""
         global stop_effect
-        print("[FADE] Démarrage effet fondu de couleurs")
-
-        # Couleurs par défaut si non spécifiées
-        if colors is None:
-            colors = [
-                (255, 0, 0),    # Rouge
-                (255, 165, 0),  # Orange
-                (255, 255, 0),  # Jaune
-                (0, 255, 0),    # Vert
-                (0, 0, 255),    # Bleu
-                (148, 0, 211)   # Violet
-            ]
-
-        color_index = 0
-        steps = 50  # Nombre d'étapes pour la transition
-        base_delay = 0.05 / speed  # Ajuster la vitesse
+        log_effect.info("[FADE] Démarrage effet fondu de couleurs")
 
-        while not stop_effect:
-            start_color = colors[color_index]
-            next_index = (color_index + 1) % len(colors)
-            target_color = colors[next_index]
-
-            # Transition douce entre les deux couleurs
-            for i in range(steps + 1):
-                if stop_effect:
-                    break
-
-                progress = i / steps
-                r = int(start_color[0] + (target_color[0] - start_color[0]) * progress)
-                g = int(start_color[1] + (target_color[1] - start_color[1]) * progress)
-                b = int(start_color[2] + (target_color[2] - start_color[2]) * progress)
-
-                self.set_color(r, g, b)
-                time.sleep(base_delay)
-
-            color_index = next_index
+        self._play_cycle(fade_table(colors, speed))
 
-        print("[FADE] Effet arrêté")
+        log_effect.info("[FADE] Effet arrêté")
 
     def wave_effect(self, speed=1.0):
         """Effet vague - cycle lent entre couleurs chaudes et froides"""
         global stop_effect
-        print("[WAVE] Démarrage effet vague")
-
-        # Couleurs chaudes
-        warm_colors = [
-            (255, 0, 0),      # Rouge
-            (255, 87, 34),    # Rouge orangé
-            (255, 165, 0),    # Orange
-            (255, 193, 7),    # Ambre
-            (255, 255, 0)     # Jaune
-        ]
-
-        # Couleurs froides
-        cool_colors = [
-            (0, 255, 255),    # Cyan
-            (0, 191, 255),    # Bleu ciel
-            (0, 0, 255),      # Bleu
-            (75, 0, 130),     # Indigo
-            (148, 0, 211)     # Violet
-        ]
+        log_effect.info("[WAVE] Démarrage effet vague")
 
-        all_colors = warm_colors + cool_colors
-        color_index = 0
-        steps = 80  # Transitions très douces
-        base_delay = 0.1 / speed
+        self._play_cycle(wave_table(speed))
 
-        while not stop_effect:
-            start_color = all_colors[color_index]
-            next_index = (color_index + 1) % len(all_colors)
-            target_color = all_colors[next_index]
-
-            # Transition ultra-douce
-            for i in range(steps + 1):
-                if stop_effect:
-                    break
-
-                progress = i / steps
-                r = int(start_color[0] + (target_color[0] - start_color[0]) * progress)
-                g = int(start_color[1] + (target_color[1] - start_color[1]) * progress)
-                b = int(start_color[2] + (target_color[2] - start_color[2]) * progress)
-
-                self.set_color(r, g, b)
-                time.sleep(base_delay)
-
-            color_index = next_index
-
-        print("[WAVE] Effet arrêté")
+        log_effect.info("[WAVE] Effet arrêté")
 
     def custom_blink_effect(self, count=10, speed=1.0, color=None):
         """Effet clignotement personnalisé"""
         global stop_effect
-        print(f"[BLINK] Démarrage clignotement ({count} fois)")
+        log_effect.info("[BLINK] Démarrage clignotement (%d fois)", count)
 
         # Utiliser la couleur actuelle si non spécifiée
         if color is None:
             color = self.current_color
 
-        base_delay = 0.3 / speed
-
-        blinks_done = 0
-        while not stop_effect and (count == 0 or blinks_done < count):
-            # Allumer
-            self.set_color(*color)
-            time.sleep(base_delay)
-
-            if stop_effect:
-                break
-
-            # Éteindre
-            self.set_color(0, 0, 0)
-            time.sleep(base_delay)
-
-            blinks_done += 1
+        # Un clignotement par battement à vitesse 1 (allumé puis éteint un demi-battement chacun)
+        flashes = (color, (0, 0, 0))
+        blinks_done = self._play_on_beat(flashes, 0.5 / speed, None if count == 0 else 2 * count) // 2
 
         # Restaurer la couleur à la fin
         self.set_color(*color)
-        print(f"[BLINK] Effet arrêté ({blinks_done} clignotements)")
+        log_effect.info("[BLINK] Effet arrêté (%d clignotements)", blinks_done)
 
     def pomodoro_effect(self, work_minutes=25, break_minutes=5, cycles=4):
         """Mode concentration Pomodoro avec synchronisation SSE"""
         global stop_effect, pomodoro_state, pomodoro_lock
 
-        print("=" * 60)
-        print("[POMODORO] Mode concentration démarré!")
-        print(f"  - Travail: {work_minutes} min (blanc)")
-        print(f"  - Pause: {break_minutes} min (vert)")
-        print(f"  - Cycles: {cycles}")
-        print("=" * 60)
+        log_pomodoro.info(
+            "[POMODORO] Mode concentration démarré! Travail: %d min (blanc), Pause: %d min (vert), Cycles: %d",
+            work_minutes, break_minutes, cycles
+        )
 
         # Initialiser l'état du Pomodoro
         with pomodoro_lock:
@@ -496,7 +915,7 @@ class PersistentLEDController:
                 break
 
             # PHASE TRAVAIL
-            print(f"\n[POMODORO] Cycle {cycle}/{cycles} - TRAVAIL ({work_minutes} min)")
+            log_pomodoro.info("[POMODORO] Cycle %d/%d - TRAVAIL (%d min)", cycle, cycles, work_minutes)
             self.set_color(255, 255, 255)  # Blanc pour concentration
             self.set_brightness(100)
 
@@ -504,6 +923,7 @@ class PersistentLEDController:
             with pomodoro_lock:
                 pomodoro_state['phase'] = 'work'
                 pomodoro_state['current_cycle'] = cycle
+            publish_pomodoro(work_minutes * 60)
 
             # Compte à rebours avec mise à jour de l'état
             work_seconds = work_minutes * 60
@@ -518,7 +938,7 @@ class PersistentLEDController:
                 break
 
             # ALERTE FIN TRAVAIL
-            print("\n[POMODORO] Temps de travail terminé!")
+            log_pomodoro.info("[POMODORO] Temps de travail terminé!")
             for _ in range(3):
                 self.set_color(0, 255, 0)  # Vert
                 time.sleep(0.5)
@@ -527,13 +947,14 @@ class PersistentLEDController:
 
             # PHASE PAUSE (sauf au dernier cycle)
             if cycle < cycles:
-                print(f"[POMODORO] PAUSE ({break_minutes} min) - Reposez-vous!")
+                log_pomodoro.info("[POMODORO] PAUSE (%d min) - Reposez-vous!", break_minutes)
                 self.set_color(0, 255, 0)  # Vert relaxant
                 self.set_brightness(70)
 
                 # Mettre à jour l'état
                 with pomodoro_lock:
                     pomodoro_state['phase'] = 'break'
+                publish_pomodoro(break_minutes * 60)
 
                 # Compte à rebours avec mise à jour de l'état
                 break_seconds = break_minutes * 60
@@ -548,7 +969,7 @@ class PersistentLEDController:
                     break
 
                 # ALERTE FIN PAUSE
-                print("\n[POMODORO] Pause terminée! Retour au travail.")
+                log_pomodoro.info("[POMODORO] Pause terminée! Retour au travail.")
                 for _ in range(2):
                     self.set_color(0, 255, 0)
                     time.sleep(0.5)
@@ -556,7 +977,7 @@ class PersistentLEDController:
                     time.sleep(0.5)
 
         # Session terminée
-        print("\n[POMODORO] Session Pomodoro terminée! Bravo! 🎉")
+        log_pomodoro.info("[POMODORO] Session Pomodoro terminée! Bravo! 🎉")
         self.set_color(0, 255, 0)
         self.set_brightness(100)
         time.sleep(2)
@@ -567,9 +988,233 @@ class PersistentLEDController:
             pomodoro_state['phase'] = 'work'
             pomodoro_state['current_cycle'] = 0
             pomodoro_state['remaining_seconds'] = 0
+        publish_pomodoro()
+
+# Registre des appareils découverts (connexions sans découverte, handles GATT en cache)
+device_registry = DeviceRegistry(DEVICE_REGISTRY)
+
+# Initialiser les contrôleurs : un par bande, tous sur la boucle du pool
+DEVICES = parse_devices(LED_ADDRESSES, LED_ADDRESS)
+if is_simulation_enabled():
+    for _, address in DEVICES:
+        SimulatedBleakScanner.advertise(address)
+pool = ControllerPool(
+    [PersistentLEDController(name, address, CHAR_UUID) for name, address in DEVICES],
+    parse_groups(LED_GROUPS, {name for name, _ in DEVICES})
+)
+# Bande principale : effets, tempo et statistiques historiques
+led_controller = pool.primary
+
+def device_fields(controller):
+    """État demandé d'une bande (dernière commande, pas une relecture du matériel)"""
+    return {
+        'power': controller.is_on,
+        'color': list(controller.current_color),
+        'brightness': controller.current_brightness
+    }
+
+def pomodoro_fields(phase_seconds=0):
+    """Phase du Pomodoro ; phase_ends_at (heure Unix) évite une version par seconde"""
+    with pomodoro_lock:
+        return {
+            'is_running': pomodoro_state['is_running'],
+            'phase': pomodoro_state['phase'],
+            'current_cycle': pomodoro_state['current_cycle'],
+            'total_cycles': pomodoro_state['total_cycles'],
+            'phase_ends_at': round(time.time() + phase_seconds, 1) if phase_seconds else None
+        }
+
+# État versionné exposé par /api/state (ETag, long-poll)
+device_state = VersionedState({
+    'devices': {name: device_fields(controller) for name, controller in pool.devices.items()},
+    'effect': None,
+    'pomodoro': pomodoro_fields()
+})
+
+def publish_devices(controllers, **target):
+    """Publie l'état mémorisé des bandes (target : valeur finale d'une transition)"""
+    return device_state.update_devices({c.name: {**device_fields(c), **target} for c in controllers})
+
+def publish_pomodoro(phase_seconds=0):
+    return device_state.update(pomodoro=pomodoro_fields(phase_seconds))
+
+# Timelines JSON compilées (cache par empreinte du contenu)
+timeline_library = TimelineLibrary()
+
+# Effets utilisables dans une scène (sans paramètre : couleur et luminosité viennent de la scène)
+SCENE_EFFECTS = {
+    'rainbow': 'rainbow_effect',
+    'breathing': 'breathing_effect',
+    'strobe': 'strobe_effect',
+    'police': 'police_effect',
+    'aurora': 'aurora_effect',
+    'fire': 'fire_effect',
+    'wave': 'wave_effect',
+}
+scene_store = SceneStore(
+    SCENES_FILE,
+    effects=set(SCENE_EFFECTS) | {f"timeline:{name}" for name in timeline_library.builtin_names()}
+)
+
+# Profilage à la demande (inactif par défaut)
+profiler = ProfilerManager(PROFILE_DIR)
+
+def admin_required(view):
+    """Réserve une route aux requêtes portant l'en-tête X-Admin-Token"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = request.headers.get('X-Admin-Token', '')
+        if not ADMIN_TOKEN or not hmac.compare_digest(token, ADMIN_TOKEN):
+            return jsonify({
+                "status": "error",
+                "message": "Accès administrateur refusé"
+            }), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+# Capture du trafic API pour replay (inactive par défaut)
+traffic_recorder = TrafficRecorder()
+
+# Coût des routes soumises à l'admission : nombre d'écritures BLE séquentielles par bande
+ADMISSION_COSTS = {
+    'led_on': 1,
+    'led_off': 1,
+    'led_color': 1,
+    'led_brightness': 1,
+    'led_white': 2,
+    'home_arrival': 2,
+    'scene_recall': 3,
+}
+# Routes d'état (la dernière valeur l'emporte) : l'excès est fusionné au lieu d'être refusé
+COALESCIBLE_ROUTES = {'led_color', 'led_brightness', 'led_white'}
+
+def link_capacity():
+    """Écritures/s que tient le lien : bande la plus lente (écriture mesurée + pause)"""
+    return min(1 / (c.write_latency + WRITE_PACING_S) for c in pool.devices.values())
+
+admission = AdmissionController(link_capacity, ADMISSION_CLIENT_SHARE, ADMISSION_BURST)
+
+def replay_request(endpoint, path, body):
+    """Rejoue la dernière requête fusionnée (thread du minuteur, hors pool Flask)"""
+    with app.test_request_context(path, method='POST', json=body):
+        response = app.make_response(app.view_functions[endpoint]())
+    if response.status_code >= 400:
+        log_api.warning("Requête fusionnée %s en échec: %s", path, response.get_json().get('message'))
+
+@app.before_request
+def _profile_request_start():
+    if profiler.active:
+        g.request_profile = profiler.begin_request()
+
+@app.before_request
+def _traffic_request_start():
+    if traffic_recorder.active and traffic_recorder.should_capture(request.path):
+        g.traffic_start = time.monotonic()
+
+# Requêtes identiques rapprochées : une seule exécution, résultat partagé
+single_flight = SingleFlight(SINGLE_FLIGHT_WINDOW_MS / 1000)
+SINGLE_FLIGHT_PREFIXES = ('led_', 'effect_', 'scene_recall', 'home_arrival')
+
+def single_flight_key():
+    """Clé de déduplication (POST qui agit sur les LEDs), None pour les autres requêtes"""
+    if SINGLE_FLIGHT_WINDOW_MS <= 0 or request.method != 'POST' or not request.endpoint:
+        return None
+    if not request.endpoint.startswith(SINGLE_FLIGHT_PREFIXES):
+        return None
+    return request_key(
+        request.endpoint, request.view_args, request.query_string.decode(), request.get_json(silent=True)
+    )
+
+@app.before_request
+def _single_flight_start():
+    key = single_flight_key()
+    if key is None:
+        # Arrêt d'effet, aperçu, lot, tâche planifiée... : police, stop puis police relance l'effet
+        if request.method in ('POST', 'PUT', 'DELETE'):
+            single_flight.invalidate()
+        return None
+    role, value = single_flight.begin(key)
+    if role == 'leader':
+        g.single_flight = (key, value)
+    elif role == 'shared':
+        status_code, headers, body = value
+        log_api.debug("Requête dédupliquée: %s", request.endpoint)
+        response = app.response_class(body, status=status_code, headers=headers)
+        response.headers['X-Deduplicated'] = 'true'
+        return response
+    return None
+
+@app.after_request
+def _single_flight_end(response):
+    flight = g.pop('single_flight', None)
+    if flight is not None:
+        if g.pop('admission_refused', False):
+            # 429 ou 202 « fusionnée » : rien n'a été exécuté, chaque doublon passe par l'admission
+            single_flight.finish(*flight, None)
+            return response
+        headers = [(name, value) for name, value in response.headers if name in ('Content-Type', 'Retry-After')]
+        result = (response.status_code, headers, response.get_data())
+        # Seul un succès est réutilisé ; un échec n'est partagé qu'avec les doublons en cours
+        single_flight.finish(*flight, result, reusable=200 <= response.status_code < 300)
+    return response
+
+@app.teardown_request
+def _single_flight_abort(exc):
+    flight = g.pop('single_flight', None)
+    if flight is not None:
+        single_flight.finish(*flight, None)
+
+@app.before_request
+def _admission_check():
+    """Seaux à jetons par client et par route devant le contrôleur"""
+    cost = ADMISSION_COSTS.get(request.endpoint)
+    if not ADMISSION_ENABLED or cost is None:
+        return None
+    wait = admission.admit(request.remote_addr or '-', request.endpoint, cost)
+    if not wait:
+        return None
+    g.admission_refused = True
+
+    if request.endpoint in COALESCIBLE_ROUTES:
+        body = request.get_json(silent=True) or {}
+        key = (request.endpoint, str(body.get('target') or request.args.get('target') or 'all'))
+        admission.coalesce(key, partial(replay_request, request.endpoint, request.full_path.rstrip('?'), body), wait)
+        log_api.debug("Requête fusionnée (%s), appliquée dans %.2f s", request.endpoint, wait)
+        return jsonify({
+            "status": "success",
+            "message": "Requête fusionnée : la dernière valeur sera appliquée",
+            "coalesced": True,
+            "apply_in_ms": round(wait * 1000)
+        }), 202
 
-# Initialiser le contrôleur
-led_controller = PersistentLEDController(LED_ADDRESS, CHAR_UUID)
+    log_api.debug("Requête refusée (%s), réessayer dans %.2f s", request.endpoint, wait)
+    response = jsonify({
+        "status": "error",
+        "message": "Trop de requêtes : lien Bluetooth saturé"
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = admission.retry_after(wait)
+    return response
+
+@app.after_request
+def _traffic_request_end(response):
+    started = g.pop('traffic_start', None)
+    if started is not None:
+        traffic_recorder.record(
+            started,
+            request.method,
+            request.full_path.rstrip('?'),
+            request.get_json(silent=True),
+            response.status_code,
+            time.monotonic() - started
+        )
+    return response
+
+@app.teardown_request
+def _profile_request_end(exc):
+    profile = g.pop('request_profile', None)
+    if profile is not None:
+        profiler.end_request(profile)
 
 # ====== ROUTES API ======
 
@@ -584,6 +1229,7 @@ def home():
             "/dashboard",
             "/pomodoro",
             "/api/status",
+            "/api/state",
             "/api/health",
             "/api/stats",
             "/api/pomodoro/stream",
@@ -592,29 +1238,82 @@ def home():
             "/api/led/color",
             "/api/led/brightness",
             "/api/led/white",
+            "/api/preview",
+            "/api/batch",
             "/api/home-arrival",
+            "/api/devices",
+            "/api/devices/scan",
+            "/api/beat",
+            "/api/beat/tap",
+            "/api/scenes",
+            "/api/scene/<name>",
+            "/api/schedule",
+            "/api/schedule/<name>",
             "/api/effect/rainbow",
             "/api/effect/breathing",
             "/api/effect/strobe",
             "/api/effect/police",
             "/api/effect/aurora",
+            "/api/effect/fire",
             "/api/effect/fade",
             "/api/effect/wave",
             "/api/effect/blink",
             "/api/effect/pomodoro",
-            "/api/effect/stop"
+            "/api/effect/timeline",
+            "/api/effect/timelines",
+            "/api/effect/group",
+            "/api/effect/recording",
+            "/api/effect/audio",
+            "/api/effect/ambient",
+            "/api/effect/stop",
+            "/api/admin/profile",
+            "/api/admin/traffic",
+            "/api/admin/recording"
         ]
     })
 
+# CSS/JS versionnés et précompressés, pages rendues une seule fois au démarrage
+assets = AssetStore(Path(__file__).resolve().parent / 'static')
+with app.app_context():
+    DASHBOARD_PAGE = assets.render('/dashboard', render_template, 'index.html')
+    POMODORO_PAGE = assets.render('/pomodoro', render_template, 'pomodoro.html')
+for route, weight in assets.weights().items():
+    log_api.debug(
+        "Page %s : %d o avant, %d o (1re visite), %d o (visites suivantes)",
+        route, weight['before_bytes'], weight['first_visit_bytes'], weight['repeat_visit_bytes']
+    )
+
+def precompressed(encoded, cache_control):
+    """Réponse depuis un corps précompressé : encodage négocié, 304 si l'ETag correspond"""
+    if encoded.etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        encoding = encoded.choose(request.accept_encodings)
+        response = app.response_class(encoded.bodies[encoding], content_type=encoded.content_type)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(encoded.etag)
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/static/<name>')
+def static_asset(name):
+    """CSS/JS versionnés (nom = empreinte du contenu) : en cache immuable côté navigateur"""
+    encoded = assets.assets.get(name)
+    if encoded is None:
+        return jsonify({"status": "error", "message": f"Ressource inconnue : {name}"}), 404
+    return precompressed(encoded, IMMUTABLE)
+
 @app.route('/dashboard')
 def dashboard():
     """Interface web de contrôle"""
-    return render_template('index.html')
+    return precompressed(DASHBOARD_PAGE, REVALIDATE)
 
 @app.route('/pomodoro')
 def pomodoro():
     """Page dédiée au mode Pomodoro"""
-    return render_template('pomodoro.html')
+    return precompressed(POMODORO_PAGE, REVALIDATE)
 
 @app.route('/api/pomodoro/stream')
 def pomodoro_stream():
@@ -623,7 +1322,7 @@ def pomodoro_stream():
         """Générateur qui envoie l'état du Pomodoro en temps réel"""
         import json
 
-        print("[SSE] Client connecté au stream Pomodoro")
+        log_api.info("[SSE] Client connecté au stream Pomodoro")
 
         try:
             while True:
@@ -639,7 +1338,7 @@ def pomodoro_stream():
                 time.sleep(1)
 
         except GeneratorExit:
-            print("[SSE] Client déconnecté du stream Pomodoro")
+            log_api.info("[SSE] Client déconnecté du stream Pomodoro")
 
     return app.response_class(
         event_stream(),
@@ -656,57 +1355,158 @@ def status():
     return jsonify({
         "status": "online",
         "message": "Serveur LED actif",
-        "bluetooth_connected": led_controller.is_connected,
-        "version": "2.0-persistent"
+        "bluetooth_connected": all(c.is_connected for c in pool.devices.values()),
+        "version": "2.0-persistent",
+        **pool.status()
     })
 
+@app.route('/api/state', methods=['GET'])
+def get_state():
+    """État versionné (ETag). ?since=<version> : long-poll jusqu'au prochain changement"""
+    since = request.args.get('since')
+    if since is None:
+        version, state = device_state.snapshot()
+    else:
+        try:
+            since = int(since)
+            timeout = min(float(request.args.get('timeout', STATE_POLL_TIMEOUT)), STATE_POLL_TIMEOUT)
+        except ValueError:
+            return jsonify({
+                "status": "error",
+                "message": "Paramètres invalides : since doit être un entier, timeout un nombre"
+            }), 400
+        version, state = device_state.wait(since, max(timeout, 0))
+
+    # Inchangé pour ce client (ETag identique ou long-poll expiré) : 304 sans corps
+    tag = device_state.tag(version)
+    if tag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        response = jsonify({"version": version, **state})
+    response.set_etag(tag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def device_health(controller):
+    """Santé d'une bande : connectée et taux de succès de la dernière minute suffisant"""
+    stats = controller.get_stats()
+    recent = stats['windows']['1m']
+    # Qualité actuelle du lien (dernière minute) plutôt que l'historique complet
+    healthy = controller.is_connected and (
+        recent['success_rate'] is None or recent['success_rate'] >= HEALTH_MIN_SUCCESS_RATE
+    )
+    return healthy, stats
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check détaillé"""
-    stats = led_controller.get_stats()
+    devices = {name: device_health(controller) for name, controller in pool.devices.items()}
+    _, stats = devices[led_controller.name]
+    recent = stats['windows']['1m']
     return jsonify({
-        "status": "healthy" if led_controller.is_connected else "degraded",
+        "status": "healthy" if all(ok for ok, _ in devices.values()) else "degraded",
         "bluetooth": {
             "connected": led_controller.is_connected,
-            "address": LED_ADDRESS,
-            "reconnections": stats['reconnections']
+            "address": led_controller.address,
+            "reconnections": stats['reconnections'],
+            "reconnections_1h": stats['windows']['1h']['reconnections']
         },
         "performance": {
             "commands_sent": stats['commands_sent'],
             "commands_failed": stats['commands_failed'],
             "success_rate": f"{stats['success_rate']:.2f}%",
-            "uptime_seconds": int(stats['uptime_seconds'])
+            "uptime_seconds": int(stats['uptime_seconds']),
+            "last_minute": recent
+        },
+        "devices": {
+            name: {
+                "status": "healthy" if ok else "degraded",
+                "address": pool.devices[name].address,
+                "connected": device_stats['is_connected'],
+                "success_rate": f"{device_stats['success_rate']:.2f}%",
+                "last_minute": device_stats['windows']['1m']
+            }
+            for name, (ok, device_stats) in devices.items()
         }
     })
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
-    """Statistiques du contrôleur"""
-    return jsonify(led_controller.get_stats())
+    """Statistiques du contrôleur principal ; ?device=<nom> pour une autre bande"""
+    name = request.args.get('device', led_controller.name)
+    if name not in pool.devices:
+        return jsonify({"status": "error", "message": f"Bande inconnue : {name}"}), 404
+    return jsonify({
+        **pool.devices[name].get_stats(),
+        "device": name,
+        "devices": list(pool.devices),
+        "admission": admission.status(),
+        "single_flight": single_flight.status(),
+        "assets": assets.status(),
+        "schedule": scheduler.status()
+    })
+
+def resolve_target(data):
+    """Champ target : 'all' (défaut), un groupe ou une bande. Lève KeyError si inconnu"""
+    return pool.resolve(data.get('target') or request.args.get('target'))
+
+def unknown_target(data):
+    target = data.get('target') or request.args.get('target')
+    if not isinstance(target, str):
+        return jsonify({
+            "status": "error",
+            "message": "Paramètre invalide : target doit être une chaîne (bande, groupe ou 'all')"
+        }), 400
+    return jsonify({
+        "status": "error",
+        "message": f"Cible inconnue : {target} (bandes : {', '.join(pool.devices)} ; groupes : {', '.join(pool.groups) or 'aucun'})"
+    }), 404
+
+def fan_out_response(results, message, **extra):
+    """Réponse d'une commande envoyée à une ou plusieurs bandes"""
+    failed = {name: result['error'] for name, result in results.items() if not result['success']}
+    if not failed:
+        return jsonify({"status": "success", "message": message, "devices": list(results), **extra})
+    if len(results) == 1:
+        error = next(iter(failed.values()))
+    else:
+        error = "; ".join(f"{name}: {error}" for name, error in failed.items())
+    return jsonify({"status": "error", "message": f"Echec: {error}", "failed": failed}), 500
 
 @app.route('/api/led/on', methods=['POST'])
 def led_on():
     """Allumer les LEDs"""
-    print("[INFO] Demande d'allumage des LEDs")
-    result = led_controller.power_on()
-    if result['success']:
-        return jsonify({"status": "success", "message": "LEDs allumees"})
-    return jsonify({
-        "status": "error",
-        "message": f"Echec: {result['error']}"
-    }), 500
+    data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+
+    log_api.info("Demande d'allumage des LEDs (%d bande(s))", len(controllers))
+    results = pool.fan_out(controllers, lambda c: c.stage_power(True))
+    publish_devices(controllers)
+    return fan_out_response(results, "LEDs allumees")
 
 @app.route('/api/led/off', methods=['POST'])
 def led_off():
     """Éteindre les LEDs"""
-    print("[INFO] Demande d'extinction des LEDs")
-    result = led_controller.power_off()
-    if result['success']:
-        return jsonify({"status": "success", "message": "LEDs eteintes"})
-    return jsonify({
-        "status": "error",
-        "message": f"Echec: {result['error']}"
-    }), 500
+    data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+
+    log_api.info("Demande d'extinction des LEDs (%d bande(s))", len(controllers))
+    results = pool.fan_out(controllers, lambda c: c.stage_power(False))
+    publish_devices(controllers)
+    return fan_out_response(results, "LEDs eteintes")
+
+def parse_transition(data):
+    """transition_ms optionnel (0 = immédiat). Lève ValueError si invalide"""
+    transition_ms = int(data.get('transition_ms') or 0)
+    if not 0 <= transition_ms <= TRANSITION_MAX_MS:
+        raise ValueError(transition_ms)
+    return transition_ms
 
 @app.route('/api/led/color', methods=['POST'])
 def led_color():
@@ -724,22 +1524,40 @@ def led_color():
             "message": "Paramètres invalides : r, g, b doivent être des entiers"
         }), 400
 
+    try:
+        transition_ms = parse_transition(data)
+    except (ValueError, TypeError):
+        return jsonify({
+            "status": "error",
+            "message": f"Paramètre invalide : transition_ms doit être un entier (0-{TRANSITION_MAX_MS})"
+        }), 400
+
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+
     # Limiter à la plage 0-255
     r = max(0, min(r, 255))
     g = max(0, min(g, 255))
     b = max(0, min(b, 255))
 
-    print(f"[INFO] Changement de couleur: RGB({r}, {g}, {b})")
-    result = led_controller.set_color(r, g, b)
-    if result['success']:
+    if transition_ms:
+        log_api.debug("Transition de couleur: RGB(%d, %d, %d) en %d ms", r, g, b, transition_ms)
+        for controller in controllers:
+            controller.fade_color(r, g, b, transition_ms)
+        publish_devices(controllers, color=[r, g, b])
         return jsonify({
             "status": "success",
-            "message": f"Couleur changee: RGB({r},{g},{b})"
+            "message": f"Transition vers RGB({r},{g},{b}) en {transition_ms} ms"
         })
-    return jsonify({
-        "status": "error",
-        "message": f"Echec: {result['error']}"
-    }), 500
+
+    log_api.debug("Changement de couleur: RGB(%d, %d, %d)", r, g, b)
+    for controller in controllers:
+        controller.transitions.cancel('color')
+    results = pool.fan_out(controllers, lambda c: c.stage_color(r, g, b))
+    publish_devices(controllers)
+    return fan_out_response(results, f"Couleur changee: RGB({r},{g},{b})")
 
 @app.route('/api/led/brightness', methods=['POST'])
 def led_brightness():
@@ -755,20 +1573,38 @@ def led_brightness():
             "message": "Paramètre invalide : brightness doit être un entier"
         }), 400
 
+    try:
+        transition_ms = parse_transition(data)
+    except (ValueError, TypeError):
+        return jsonify({
+            "status": "error",
+            "message": f"Paramètre invalide : transition_ms doit être un entier (0-{TRANSITION_MAX_MS})"
+        }), 400
+
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+
     # Limiter à la plage 0-100
     brightness = max(0, min(brightness, 100))
 
-    print(f"[INFO] Changement de luminosité: {brightness}%")
-    result = led_controller.set_brightness(brightness)
-    if result['success']:
+    if transition_ms:
+        log_api.debug("Transition de luminosité: %d%% en %d ms", brightness, transition_ms)
+        for controller in controllers:
+            controller.fade_brightness(brightness, transition_ms)
+        publish_devices(controllers, brightness=brightness)
         return jsonify({
             "status": "success",
-            "message": f"Luminosite: {brightness}%"
+            "message": f"Transition vers {brightness}% en {transition_ms} ms"
         })
-    return jsonify({
-        "status": "error",
-        "message": f"Echec: {result['error']}"
-    }), 500
+
+    log_api.debug("Changement de luminosité: %d%%", brightness)
+    for controller in controllers:
+        controller.transitions.cancel('brightness')
+    results = pool.fan_out(controllers, lambda c: c.stage_brightness(brightness))
+    publish_devices(controllers)
+    return fan_out_response(results, f"Luminosite: {brightness}%")
 
 @app.route('/api/led/white', methods=['POST'])
 def led_white():
@@ -784,43 +1620,378 @@ def led_white():
             "message": "Paramètre invalide : brightness doit être un entier"
         }), 400
 
+    try:
+        transition_ms = parse_transition(data)
+    except (ValueError, TypeError):
+        return jsonify({
+            "status": "error",
+            "message": f"Paramètre invalide : transition_ms doit être un entier (0-{TRANSITION_MAX_MS})"
+        }), 400
+
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+
     # Limiter à la plage 0-255
     brightness = max(0, min(brightness, 255))
 
-    print(f"[INFO] Mode blanc: {brightness}")
-    result = led_controller.set_white(brightness)
-    if result['success']:
+    if transition_ms:
+        log_api.debug("Transition vers le blanc: %d en %d ms", brightness, transition_ms)
+        for controller in controllers:
+            controller.fade_color(255, 255, 255, transition_ms)
+            if brightness < 255:
+                controller.fade_brightness(int((brightness / 255) * 100), transition_ms)
+        target = {'brightness': int((brightness / 255) * 100)} if brightness < 255 else {}
+        publish_devices(controllers, color=[255, 255, 255], **target)
         return jsonify({
             "status": "success",
-            "message": f"Mode blanc: {brightness}"
+            "message": f"Transition vers le blanc ({brightness}) en {transition_ms} ms"
         })
+
+    log_api.debug("Mode blanc: %d", brightness)
+    sequences = {}
+    for controller in controllers:
+        controller.transitions.cancel()
+        sequences[controller] = [controller.stage_color(255, 255, 255)]
+        if brightness < 255:
+            sequences[controller].append(controller.stage_brightness(int((brightness / 255) * 100)))
+    results = pool.fan_out_sequences(sequences)
+    publish_devices(controllers)
+    return fan_out_response(results, f"Mode blanc: {brightness}")
+
+def frame_budget_ms():
+    """Intervalle minimal entre deux prévisualisations : une écriture de la bande la plus lente"""
+    return round(max(PREVIEW_MIN_FRAME_MS, 1000 / link_capacity()), 1)
+
+@app.route('/api/preview', methods=['GET'])
+def preview_status():
+    """Budget de frame des commandes glissées et compteurs par bande"""
     return jsonify({
-        "status": "error",
-        "message": f"Echec: {result['error']}"
-    }), 500
+        "frame_ms": frame_budget_ms(),
+        "devices": {name: dict(c.preview_stats) for name, c in pool.devices.items()}
+    })
+
+@app.route('/api/preview', methods=['POST'])
+def preview():
+    """Prévisualisation pendant un glisser : écritures de faible priorité, la plus récente gagne.
+
+    Répond sans attendre le Bluetooth. La valeur finale est envoyée au relâchement par la
+    route normale (/api/led/color, /api/led/brightness), qui remplace toute prévisualisation
+    encore en attente.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        color = data.get('color')
+        if color is not None:
+            r, g, b = (max(0, min(int(value), 255)) for value in color)
+        brightness = data.get('brightness')
+        if brightness is not None:
+            brightness = max(0, min(int(brightness), 100))
+    except (ValueError, TypeError):
+        return jsonify({
+            "status": "error",
+            "message": "Paramètres invalides : color = [r, g, b] (0-255), brightness entier (0-100)"
+        }), 400
+    if color is None and brightness is None:
+        return jsonify({"status": "error", "message": "color ou brightness requis"}), 400
+
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+
+    for controller in controllers:
+        if color is not None:
+            controller.transitions.cancel('color')
+            controller.submit_preview(controller.stage_color(r, g, b))
+        if brightness is not None:
+            controller.transitions.cancel('brightness')
+            controller.submit_preview(controller.stage_brightness(brightness))
+
+    budget = frame_budget_ms()
+    response = jsonify({"status": "success", "message": "Prévisualisation acceptée", "frame_ms": budget})
+    response.status_code = 202
+    response.headers['X-Frame-Budget-Ms'] = str(budget)
+    return response
+
+# Routes interdites dans un lot : flux sans fin et lots imbriqués
+BATCH_EXCLUDED = ('/api/batch', '/api/pomodoro/stream')
+
+def full_dispatch(method, path, body, client):
+    """Exécute un appel interne comme une requête à part entière (admission, déduplication, journal)"""
+    # Contexte d'application propre : g n'est pas partagé avec la requête appelante
+    with app.app_context(), app.test_request_context(
+        path, method=method, json=body if method == 'GET' else body or {}, environ_base={'REMOTE_ADDR': client}
+    ):
+        return app.full_dispatch_request()
+
+def dispatch_call(method, path, body):
+    """Exécute un appel d'un lot"""
+    response = full_dispatch(method, path, body, request.remote_addr or '-')
+    result = {"status": response.status_code, "body": response.get_json(silent=True)}
+    if response.status_code == 429:
+        result["retry_after"] = response.headers.get('Retry-After')
+    return result
+
+@app.route('/api/batch', methods=['POST'])
+def batch():
+    """Plusieurs appels en une requête HTTP, exécutés dans l'ordre.
+
+    Corps : {"calls": [{"method": "POST", "path": "/api/led/color", "body": {...}}, ...]}.
+    Chaque appel garde son propre statut (un échec n'interrompt pas les suivants).
+    """
+    data = request.get_json(silent=True) or {}
+    calls = data.get('calls')
+    if not isinstance(calls, list) or not calls:
+        return jsonify({"status": "error", "message": "calls doit être une liste non vide"}), 400
+    if len(calls) > BATCH_MAX_CALLS:
+        return jsonify({"status": "error", "message": f"Au plus {BATCH_MAX_CALLS} appels par lot"}), 400
+    for call in calls:
+        path = call.get('path') if isinstance(call, dict) else None
+        if not isinstance(path, str) or not path.startswith('/api/') or path.split('?')[0] in BATCH_EXCLUDED:
+            return jsonify({"status": "error", "message": f"Appel invalide : {call}"}), 400
+        # Un long-poll bloquerait tout le lot (et un thread du serveur) jusqu'à STATE_POLL_TIMEOUT
+        route, _, query = path.partition('?')
+        if route == '/api/state' and 'since' in parse_qs(query, keep_blank_values=True):
+            return jsonify({"status": "error", "message": "Long-poll /api/state?since= interdit dans un lot"}), 400
+        if str(call.get('method', 'POST')).upper() not in ('GET', 'POST', 'PUT', 'DELETE'):
+            return jsonify({"status": "error", "message": f"Méthode invalide : {call.get('method')}"}), 400
+
+    log_api.debug("Lot de %d appel(s)", len(calls))
+    results = [
+        dispatch_call(str(call.get('method', 'POST')).upper(), call['path'], call.get('body'))
+        for call in calls
+    ]
+    return jsonify({"status": "success", "results": results})
 
 @app.route('/api/home-arrival', methods=['POST'])
 def home_arrival():
     """Déclencheur automatique quand tu arrives chez toi"""
-    print("[INFO] *** ARRIVEE A LA MAISON DETECTEE ***")
+    log_api.info("*** ARRIVEE A LA MAISON DETECTEE ***")
 
-    # Allume en couleur chaleureuse (orange)
-    led_controller.power_on()
-    led_controller.set_color(255, 180, 50)
+    # Scène 'maison' si elle existe, sinon couleur chaleureuse (orange), sur toutes les bandes
+    if 'maison' in scene_store.index:
+        recall_scene(scene_store.get('maison'))
+    else:
+        pool.fan_out_sequences({
+            controller: [controller.stage_power(True), controller.stage_color(255, 180, 50)]
+            for controller in pool.devices.values()
+        })
+        publish_devices(pool.devices.values())
 
     return jsonify({
         "status": "success",
         "message": "Bienvenue a la maison! LEDs allumees."
     })
 
+# ====== APPAREILS ======
+
+async def registry_scan_loop():
+    """Scan périodique : garde le registre frais pour des reconnexions sans découverte"""
+    while True:
+        try:
+            count = await device_registry.scan(led_controller.scanner_class)
+            log_bt.debug("[SCAN] %d appareil(s) BLEDDM visible(s)", count)
+        except Exception as e:
+            log_bt.warning("[SCAN] Échec du scan: %s", e)
+        await asyncio.sleep(REGISTRY_SCAN_INTERVAL)
+
+@app.route('/api/devices', methods=['GET'])
+def list_devices():
+    """Appareils BLEDDM connus, bandes configurées et temps de connexion avec/sans cache"""
+    configured = {controller.address.upper(): name for name, controller in pool.devices.items()}
+    return jsonify({
+        "status": "success",
+        "devices": [
+            {**entry, "strip": configured.get(entry['address'])}
+            for entry in device_registry.list()
+        ],
+        "connect_time": device_registry.connect_stats(),
+        "scan_interval_s": REGISTRY_SCAN_INTERVAL
+    })
+
+@app.route('/api/devices/scan', methods=['POST'])
+@admin_required
+def scan_devices():
+    """Lance un scan BLE immédiat (5 s)"""
+    future = asyncio.run_coroutine_threadsafe(device_registry.scan(led_controller.scanner_class), pool.loop)
+    try:
+        count = future.result(timeout=10)
+    except Exception as e:
+        return jsonify({"status": "error", "message": f"Échec du scan: {e}"}), 500
+    return jsonify({"status": "success", "message": f"{count} appareil(s) BLEDDM trouvé(s)", "found": count})
+
+# ====== TEMPO ======
+
+@app.route('/api/beat', methods=['GET'])
+def beat_status():
+    """BPM, position et erreur de phase mesurée des effets rythmés"""
+    return jsonify({"status": "success", **led_controller.beat_clock.status()})
+
+@app.route('/api/beat', methods=['POST'])
+def beat_set():
+    """Définit le tempo : {"bpm": 128, "downbeat": false}"""
+    data = request.get_json(silent=True) or {}
+    try:
+        bpm = float(data['bpm'])
+    except (KeyError, ValueError, TypeError):
+        return jsonify({
+            "status": "error",
+            "message": f"Paramètre invalide : bpm doit être un nombre ({MIN_BPM}-{MAX_BPM})"
+        }), 400
+
+    bpm = led_controller.beat_clock.set_bpm(bpm, downbeat=bool(data.get('downbeat', False)))
+    return jsonify({"status": "success", "message": f"Tempo: {bpm:g} BPM", "bpm": bpm})
+
+@app.route('/api/beat/tap', methods=['POST'])
+def beat_tap():
+    """Tap tempo : appeler à chaque temps, le BPM suit l'intervalle médian"""
+    bpm = led_controller.beat_clock.tap()
+    if bpm is None:
+        return jsonify({"status": "success", "message": "Premier tap enregistré", "bpm": None})
+    return jsonify({"status": "success", "message": f"Tempo: {bpm:.1f} BPM", "bpm": round(bpm, 2)})
+
+# ====== SCÈNES ======
+
+def recall_scene(scene, controllers=None):
+    """Envoie la différence d'état à chaque bande puis lance l'effet de la scène sur ces bandes.
+
+    L'effet en cours est arrêté (il écraserait la scène à la frame suivante), sauf un
+    Pomodoro rappelé par une scène sans effet. Retourne (résultats par bande, nombre de paquets envoyés).
+    """
+    controllers = list(controllers or pool.devices.values())
+    with pomodoro_lock:
+        pomodoro_running = pomodoro_state['is_running']
+    if scene.effect or not pomodoro_running:
+        halt_effect()
+    for controller in controllers:
+        controller.transitions.cancel()
+    sequences = {controller: controller.scene_packets(scene) for controller in controllers}
+    results = pool.fan_out_sequences(sequences)
+    publish_devices(sequences)
+    sent = sum(len(sequences[pool.devices[name]]) for name, result in results.items() if result['success'])
+    if all(result['success'] for result in results.values()) and scene.effect:
+        lead = controllers[0]
+        if scene.effect.startswith('timeline:'):
+            stream = timeline_library.compile(timeline_library.load_builtin(scene.effect[len('timeline:'):]))
+            start_effect(lead.timeline_effect, stream, controllers=controllers)
+        else:
+            start_effect(getattr(lead, SCENE_EFFECTS[scene.effect]), controllers=controllers)
+    return results, sent
+
+@app.route('/api/scenes', methods=['GET'])
+def list_scenes():
+    """Scènes enregistrées"""
+    return jsonify({"status": "success", "scenes": scene_store.list()})
+
+@app.route('/api/scene/<name>', methods=['POST'])
+def scene_recall(name):
+    """Rappelle une scène en un appel (seuls les paquets nécessaires partent)"""
+    try:
+        scene = scene_store.get(name)
+    except SceneError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+
+    data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+
+    results, sent = recall_scene(scene, controllers)
+    return fan_out_response(results, f"Scène {name} appliquée", packets_sent=sent)
+
+@app.route('/api/scene/<name>', methods=['PUT'])
+def scene_save(name):
+    """Crée ou remplace une scène : {"power": true, "color": [r, g, b], "brightness": 60, "effect": "aurora"}"""
+    try:
+        scene = scene_store.save(name, request.get_json(silent=True))
+    except SceneError as e:
+        return jsonify({"status": "error", "message": f"Scène invalide : {e}"}), 400
+    return jsonify({"status": "success", "message": f"Scène {name} enregistrée", "scene": scene.spec})
+
+@app.route('/api/scene/<name>', methods=['DELETE'])
+def scene_delete(name):
+    """Supprime une scène"""
+    try:
+        scene_store.delete(name)
+    except SceneError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    return jsonify({"status": "success", "message": f"Scène {name} supprimée"})
+
+# ====== TÂCHES PLANIFIÉES ======
+
+def call_route(path, body):
+    """Exécute une route POST hors requête HTTP (tâche planifiée). Retourne le statut HTTP"""
+    response = full_dispatch('POST', path, body, 'planificateur')
+    if response.status_code == 429:
+        # Lien saturé : une seconde tentative quand l'admission le permet
+        time.sleep(float(response.headers.get('Retry-After', 1)))
+        response = full_dispatch('POST', path, body, 'planificateur')
+    if response.status_code >= 400:
+        log_api.warning("Tâche planifiée %s en échec: %s", path, (response.get_json(silent=True) or {}).get('message'))
+    return response.status_code
+
+def run_job(calls):
+    """Action d'une tâche : routes appelées dans l'ordre, statut le plus élevé"""
+    return max(call_route(path, body) for path, body in calls)
+
+def known_route(path):
+    return not path.startswith('/api/admin/') and app.url_map.bind('localhost').test(path, 'POST')
+
+@app.route('/api/schedule', methods=['GET'])
+def list_schedule():
+    """Tâches planifiées, prochaines échéances, exécutions manquées et retards"""
+    return jsonify({"status": "success", "jobs": scheduler.list(), "metrics": scheduler.status()})
+
+@app.route('/api/schedule/<name>', methods=['PUT'])
+def schedule_save(name):
+    """Crée ou remplace une tâche : {"cron": "30 6 * * 1-5", "action": {"scene": "maison"}}"""
+    try:
+        job = scheduler.save(name, request.get_json(silent=True))
+    except JobError as e:
+        return jsonify({"status": "error", "message": f"Tâche invalide : {e}"}), 400
+    return jsonify({"status": "success", "message": f"Tâche {name} enregistrée", "job": job})
+
+@app.route('/api/schedule/<name>', methods=['DELETE'])
+def schedule_delete(name):
+    """Supprime une tâche"""
+    try:
+        scheduler.delete(name)
+    except JobError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    return jsonify({"status": "success", "message": f"Tâche {name} supprimée"})
+
+@app.route('/api/schedule/<name>/run', methods=['POST'])
+def schedule_run(name):
+    """Exécute une tâche tout de suite (son échéancier ne change pas)"""
+    try:
+        status = scheduler.run_now(name)
+    except JobError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    if status >= 400:
+        return jsonify({"status": "error", "message": f"Tâche {name} en échec (HTTP {status})"}), 500
+    return jsonify({"status": "success", "message": f"Tâche {name} exécutée"})
+
 # ====== ROUTES EFFETS ======
 
 @app.route('/api/effect/stop', methods=['POST'])
 def stop_current_effect():
-    """Arrêter l'effet en cours avec protection thread-safe"""
+    """Arrêter l'effet en cours"""
+    halt_effect()
+    return jsonify({
+        "status": "success",
+        "message": "Effet arrêté"
+    })
+
+def halt_effect():
+    """Arrête l'effet en cours (et réinitialise le Pomodoro) avec protection thread-safe"""
     global stop_effect, current_effect_thread, pomodoro_state, pomodoro_lock
 
-    print("[INFO] Arrêt de l'effet en cours")
+    log_effect.info("Arrêt de l'effet en cours")
+    for controller in pool.devices.values():
+        controller.transitions.cancel()
 
     with effect_lock:  # ✅ Protection thread-safe
         stop_effect = True
@@ -830,11 +2001,11 @@ def stop_current_effect():
             effect_lock.release()
             try:
                 current_effect_thread.join(timeout=2)
-                print("[INFO] Effet arrêté avec succès")
+                log_effect.info("Effet arrêté avec succès")
             finally:
                 effect_lock.acquire()
         else:
-            print("[INFO] Aucun effet actif à arrêter")
+            log_effect.info("Aucun effet actif à arrêter")
 
     # Réinitialiser l'état du Pomodoro si nécessaire
     with pomodoro_lock:
@@ -843,22 +2014,30 @@ def stop_current_effect():
             pomodoro_state['phase'] = 'work'
             pomodoro_state['current_cycle'] = 0
             pomodoro_state['remaining_seconds'] = 0
-            print("[INFO] État Pomodoro réinitialisé")
+            log_pomodoro.info("État Pomodoro réinitialisé")
 
-    return jsonify({
-        "status": "success",
-        "message": "Effet arrêté"
-    })
+    # Dernière frame de l'effet arrêté
+    publish_devices(pool.devices.values())
+    device_state.update(effect=None, pomodoro=pomodoro_fields())
+
+def start_effect(effect_func, *args, controllers=None):
+    """Démarre un effet dans un thread séparé avec protection thread-safe.
 
-def start_effect(effect_func, *args):
-    """Démarre un effet dans un thread séparé avec protection thread-safe"""
+    controllers : bandes visées (défaut : la bande principale). Un effet méthode de la
+    première bande y est joué, les autres rejouent ses commandes (miroirs).
+    """
     global stop_effect, current_effect_thread
+    controllers = list(controllers or [led_controller])
+
+    # Un effet remplace les transitions en cours
+    for controller in controllers:
+        controller.transitions.cancel()
 
     with effect_lock:  # ✅ Protection thread-safe
         # Arrêter l'effet précédent
         stop_effect = True
         if current_effect_thread and current_effect_thread.is_alive():
-            print(f"[EFFECT] Arrêt de l'effet précédent...")
+            log_effect.info("[EFFECT] Arrêt de l'effet précédent...")
             # Relâcher le lock temporairement pour permettre au thread de se terminer
             effect_lock.release()
             try:
@@ -867,36 +2046,79 @@ def start_effect(effect_func, *args):
                 effect_lock.acquire()
 
         # Démarrer le nouvel effet
-        print(f"[EFFECT] Démarrage du nouvel effet: {effect_func.__name__}")
+        log_effect.info("[EFFECT] Démarrage du nouvel effet: %s", effect_func.__name__)
         stop_effect = False
+        lead = controllers[0]
+        mirrors = tuple(controllers[1:]) if getattr(effect_func, '__self__', None) is lead else ()
         current_effect_thread = threading.Thread(
-            target=effect_func,
-            args=args,
+            target=run_effect,
+            args=(effect_func, lead, mirrors, *args),
             daemon=True
         )
+        device_state.update(effect=effect_name(effect_func))
         current_effect_thread.start()
 
+def effect_name(effect_func):
+    """Nom publié dans /api/state : rainbow_effect -> rainbow"""
+    name = getattr(effect_func, '__name__', None) or getattr(effect_func, 'func', effect_func).__name__
+    return name[:-len('_effect')] if name.endswith('_effect') else name
+
+def run_effect(effect_func, lead, mirrors, *args):
+    """Corps du thread d'effet : à la fin naturelle de l'effet, l'état ne l'annonce plus"""
+    lead.mirrors = mirrors
+    try:
+        effect_func(*args)
+    finally:
+        # Un effet arrêté en retard ne retire pas les miroirs de l'effet qui l'a remplacé
+        if lead.mirrors is mirrors:
+            lead.mirrors = ()
+        if threading.current_thread() is current_effect_thread:
+            publish_devices(pool.devices.values())
+            device_state.update(effect=None)
+
+def start_effect_on(controllers, method, *args):
+    """Joue l'effet `method` (méthode du contrôleur) sur la première bande visée, les autres en miroir"""
+    start_effect(getattr(controllers[0], method), *args, controllers=controllers)
+
 @app.route('/api/effect/rainbow', methods=['POST'])
 def effect_rainbow():
     """Effet arc-en-ciel"""
-    start_effect(led_controller.rainbow_effect)
+    data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+    start_effect_on(controllers, 'rainbow_effect')
     return jsonify({
         "status": "success",
         "message": "Effet arc-en-ciel démarré"
     })
 
+def effect_color(data):
+    """Couleur optionnelle d'un effet (r, g, b bornés 0-255), None = couleur actuelle. Lève ValueError"""
+    if not ('r' in data and 'g' in data and 'b' in data):
+        return None
+    try:
+        return tuple(max(0, min(int(data[key]), 255)) for key in ('r', 'g', 'b'))
+    except (ValueError, TypeError):
+        raise ValueError("Couleur invalide : r, g, b doivent être des entiers (0-255)")
+
 @app.route('/api/effect/breathing', methods=['POST'])
 def effect_breathing():
     """Effet respiration"""
     data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
 
     # Si une couleur est fournie, l'utiliser, sinon utiliser la couleur actuelle (None)
-    if 'r' in data and 'g' in data and 'b' in data:
-        color = (data['r'], data['g'], data['b'])
-    else:
-        color = None  # Utilisera self.current_color
+    try:
+        color = effect_color(data)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
 
-    start_effect(led_controller.breathing_effect, color)
+    start_effect_on(controllers, 'breathing_effect', color)
     return jsonify({
         "status": "success",
         "message": "Effet respiration démarré"
@@ -906,14 +2128,18 @@ def effect_breathing():
 def effect_strobe():
     """Effet stroboscope"""
     data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
 
     # Si une couleur est fournie, l'utiliser, sinon utiliser la couleur actuelle (None)
-    if 'r' in data and 'g' in data and 'b' in data:
-        color = (data['r'], data['g'], data['b'])
-    else:
-        color = None  # Utilisera self.current_color
+    try:
+        color = effect_color(data)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
 
-    start_effect(led_controller.strobe_effect, color)
+    start_effect_on(controllers, 'strobe_effect', color)
     return jsonify({
         "status": "success",
         "message": "Effet stroboscope démarré"
@@ -922,7 +2148,12 @@ def effect_strobe():
 @app.route('/api/effect/police', methods=['POST'])
 def effect_police():
     """Effet sirène de police"""
-    start_effect(led_controller.police_effect)
+    data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+    start_effect_on(controllers, 'police_effect')
     return jsonify({
         "status": "success",
         "message": "Effet sirène de police démarré"
@@ -931,16 +2162,39 @@ def effect_police():
 @app.route('/api/effect/aurora', methods=['POST'])
 def effect_aurora():
     """Effet aurores boréales"""
-    start_effect(led_controller.aurora_effect)
+    data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+    start_effect_on(controllers, 'aurora_effect')
     return jsonify({
         "status": "success",
         "message": "Effet aurores boréales démarré"
     })
 
+@app.route('/api/effect/fire', methods=['POST'])
+def effect_fire():
+    """Effet feu/flammes"""
+    data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+    start_effect_on(controllers, 'fire_effect')
+    return jsonify({
+        "status": "success",
+        "message": "Effet flammes démarré"
+    })
+
 @app.route('/api/effect/fade', methods=['POST'])
 def effect_fade():
     """Effet fondu de couleurs"""
     data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
 
     # Validation de la vitesse
     try:
@@ -956,8 +2210,16 @@ def effect_fade():
 
     # Récupérer les couleurs personnalisées si fournies
     colors = data.get('colors', None)
+    if colors is not None:
+        try:
+            colors = normalize_palette(colors)
+        except (ValueError, TypeError) as e:
+            return jsonify({
+                "status": "error",
+                "message": f"Paramètre invalide : colors doit être une liste de [r, g, b] ({e})"
+            }), 400
 
-    start_effect(led_controller.fade_colors_effect, colors, speed)
+    start_effect_on(controllers, 'fade_colors_effect', colors, speed)
     return jsonify({
         "status": "success",
         "message": f"Effet fondu de couleurs démarré (vitesse: {speed}x)"
@@ -967,6 +2229,10 @@ def effect_fade():
 def effect_wave():
     """Effet vague de couleurs"""
     data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
 
     # Validation de la vitesse
     try:
@@ -980,7 +2246,7 @@ def effect_wave():
     # Limiter la vitesse à une plage raisonnable
     speed = max(0.1, min(speed, 5.0))
 
-    start_effect(led_controller.wave_effect, speed)
+    start_effect_on(controllers, 'wave_effect', speed)
     return jsonify({
         "status": "success",
         "message": f"Effet vague démarré (vitesse: {speed}x)"
@@ -990,6 +2256,10 @@ def effect_wave():
 def effect_blink():
     """Effet clignotement personnalisé"""
     data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
 
     # Validation des paramètres
     try:
@@ -1005,31 +2275,279 @@ def effect_blink():
     count = max(1, min(count, 100))  # 1-100 clignotements
     speed = max(0.1, min(speed, 5.0))  # 0.1x-5x vitesse
 
-    # Récupérer la couleur si fournie
-    if 'r' in data and 'g' in data and 'b' in data:
+    # Récupérer la couleur si fournie (sinon : couleur actuelle)
+    try:
+        color = effect_color(data)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    start_effect_on(controllers, 'custom_blink_effect', count, speed, color)
+    return jsonify({
+        "status": "success",
+        "message": f"Effet clignotement démarré ({count} fois à {speed}x)"
+    })
+
+@app.route('/api/effect/timeline', methods=['POST'])
+def effect_timeline():
+    """Effet décrit en JSON : {"name": "police"} ou {"timeline": {...}}"""
+    data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+
+    try:
+        if 'timeline' in data:
+            spec = data['timeline']
+        elif 'name' in data:
+            spec = timeline_library.load_builtin(str(data['name']))
+        else:
+            raise TimelineError("name ou timeline requis")
+        stream = timeline_library.compile(spec)
+    except TimelineError as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Timeline invalide : {e}"
+        }), 400
+
+    start_effect_on(controllers, 'timeline_effect', stream)
+    return jsonify({
+        "status": "success",
+        "message": "Timeline démarrée",
+        "hash": stream.digest,
+        "packets": len(stream),
+        "duration_ms": round(stream.duration * 1000)
+    })
+
+@app.route('/api/effect/timelines', methods=['GET'])
+def effect_timelines():
+    """Timelines fournies et état du cache de compilation"""
+    return jsonify({
+        "status": "success",
+        **timeline_library.info()
+    })
+
+# ====== EFFETS DE GROUPE ======
+
+GROUP_EFFECTS = ('rainbow', 'fade', 'wave', 'timeline')
+MAX_PHASE_MS = 60000
+
+# Dernier effet de groupe lancé (métriques de synchronisation)
+group_player = None
+
+def group_effect(player, stream):
+    """Effet de groupe (thread d'effet) : s'arrête avec stop_effect"""
+    log_effect.info("[GROUP] %d bande(s), %d paquets par cycle", len(player.controllers), len(stream))
+    player.play(stream, lambda: stop_effect)
+    log_effect.info("[GROUP] Effet arrêté")
+
+def group_stream(data):
+    """Flux rendu une seule fois pour tout le groupe. Lève ValueError / TypeError"""
+    effect = str(data.get('effect', 'rainbow'))
+    speed = max(0.1, min(float(data.get('speed', 1.0)), 5.0))
+    if effect == 'rainbow':
+        return cycle_stream((*color, 1.0 / speed) for color in RAINBOW_COLORS)
+    if effect == 'fade':
+        colors = data.get('colors')
+        return cycle_stream(fade_table(normalize_palette(colors) if colors is not None else None, speed).frames())
+    if effect == 'wave':
+        return cycle_stream(wave_table(speed).frames())
+    if effect == 'timeline':
+        spec = data['timeline'] if 'timeline' in data else timeline_library.load_builtin(str(data.get('name', '')))
+        return timeline_library.compile(spec)
+    raise ValueError(f"effet inconnu : {effect} ({', '.join(GROUP_EFFECTS)})")
+
+@app.route('/api/effect/group', methods=['POST'])
+def effect_group():
+    """Effet synchronisé : {"effect": "rainbow", "target": "all", "phase_ms": 250}"""
+    global group_player
+    data = request.get_json(silent=True) or {}
+
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+
+    try:
+        stream = group_stream(data)
+        phase_ms = float(data.get('phase_ms', 0))
+        if abs(phase_ms) > MAX_PHASE_MS:
+            raise ValueError(f"phase_ms hors limites (±{MAX_PHASE_MS})")
+    except (ValueError, TypeError) as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Paramètres invalides : {e}"
+        }), 400
+    if not len(stream):
+        return jsonify({"status": "error", "message": "Effet vide"}), 400
+
+    # Poursuite : chaque bande décalée de phase_ms par rapport à la précédente
+    offsets = [index * phase_ms / 1000 for index in range(len(controllers))]
+    offsets = [offset - min(offsets) for offset in offsets]
+    for controller in controllers:
+        controller.transitions.cancel()
+
+    group_player = SyncPlayer(controllers, offsets)
+    start_effect(group_effect, group_player, stream, controllers=controllers)
+    return jsonify({
+        "status": "success",
+        "message": f"Effet {data.get('effect', 'rainbow')} synchronisé sur {len(controllers)} bande(s)",
+        "devices": [controller.name for controller in controllers]
+    })
+
+@app.route('/api/effect/group', methods=['GET'])
+def effect_group_status():
+    """Synchronisation du dernier effet de groupe : latence par bande, frames sautées, skew"""
+    if group_player is None:
+        return jsonify({"status": "success", "running": False})
+    return jsonify({"status": "success", **group_player.status()})
+
+@app.route('/api/effect/recording', methods=['POST'])
+def effect_recording():
+    """Rejoue un enregistrement binaire : {"name": "...", "loop": false}"""
+    data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+    name = Path(str(data.get('name', ''))).name
+    path = Path(RECORDING_DIR) / f"{name}{RECORDING_EXTENSION}"
+
+    if not name or not path.is_file():
+        return jsonify({
+            "status": "error",
+            "message": f"Enregistrement introuvable : {name}"
+        }), 404
+
+    start_effect_on(controllers, 'recording_effect', path, bool(data.get('loop', False)))
+    return jsonify({
+        "status": "success",
+        "message": f"Relecture démarrée: {name}"
+    })
+
+@app.route('/api/effect/audio', methods=['POST'])
+def effect_audio():
+    """Effet audio-réactif : {"source": "wav", "file": "..."} ou {"source": "socket"|"stdin", "rate", "channels"}"""
+    if not numpy_available():
+        return jsonify({
+            "status": "error",
+            "message": "NumPy requis pour l'effet audio (pip install numpy)"
+        }), 500
+
+    data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+    kind = data.get('source', 'socket')
+    try:
+        rate = int(data.get('rate', 44100))
+        channels = int(data.get('channels', 1))
+    except (ValueError, TypeError):
+        return jsonify({
+            "status": "error",
+            "message": "Paramètres invalides : rate et channels doivent être des entiers"
+        }), 400
+    if not (8000 <= rate <= 192000 and 1 <= channels <= 8):
+        return jsonify({
+            "status": "error",
+            "message": "Paramètres invalides : rate 8000-192000, channels 1-8"
+        }), 400
+
+    if kind == 'wav':
+        path = Path(AUDIO_DIR) / Path(str(data.get('file', ''))).name
+        if not path.is_file():
+            return jsonify({
+                "status": "error",
+                "message": f"Fichier introuvable dans {AUDIO_DIR}"
+            }), 404
+        open_source = lambda: wav_source(path)
+        message = f"Effet audio démarré: {path.name}"
+    elif kind == 'socket':
+        open_source = lambda: socket_source(AUDIO_PORT, rate, channels, lambda: stop_effect)
+        message = f"Effet audio en attente de PCM s16le sur 127.0.0.1:{AUDIO_PORT}"
+    elif kind == 'stdin':
+        open_source = lambda: stdin_source(rate, channels)
+        message = "Effet audio démarré sur l'entrée standard"
+    else:
+        return jsonify({
+            "status": "error",
+            "message": "source doit être 'wav', 'socket' ou 'stdin'"
+        }), 400
+
+    start_effect_on(controllers, 'audio_effect', open_source, kind != 'wav')
+    return jsonify({"status": "success", "message": message})
+
+@app.route('/api/effect/ambient', methods=['POST'])
+def effect_ambient():
+    """Ambiance : {"source": "video"|"images", "name": "..."} ou {"source": "pipe", "width", "height"}"""
+    if not ambiance.numpy_available():
+        return jsonify({
+            "status": "error",
+            "message": "NumPy requis pour l'effet ambiance (pip install numpy)"
+        }), 500
+
+    data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
+    kind = data.get('source', 'pipe')
+    mode = data.get('mode', 'average')
+    if mode not in ambiance.MODES:
+        return jsonify({
+            "status": "error",
+            "message": f"mode doit être l'un de {', '.join(ambiance.MODES)}"
+        }), 400
+    should_stop = lambda: stop_effect
+
+    if kind in ('video', 'images'):
+        path = Path(AMBIENT_DIR) / Path(str(data.get('name', ''))).name
+        if not (path.is_dir() if kind == 'images' else path.is_file()):
+            return jsonify({
+                "status": "error",
+                "message": f"Introuvable dans {AMBIENT_DIR} : {path.name}"
+            }), 404
+        if kind == 'video':
+            frames = ambiance.video_frames(path, AMBIENT_FPS, should_stop)
+        else:
+            frames = ambiance.image_frames(path, AMBIENT_FPS, should_stop)
+        message = f"Ambiance démarrée: {path.name}"
+    elif kind == 'pipe':
+        if not ambiance.fifo_available():
+            return jsonify({
+                "status": "error",
+                "message": "source 'pipe' indisponible sur cette plateforme (pas de tube nommé) : utiliser 'video' ou 'images'"
+            }), 501
         try:
-            r = max(0, min(int(data['r']), 255))
-            g = max(0, min(int(data['g']), 255))
-            b = max(0, min(int(data['b']), 255))
-            color = (r, g, b)
+            width = int(data.get('width', 160))
+            height = int(data.get('height', 90))
         except (ValueError, TypeError):
+            width = height = 0
+        if not (1 <= width <= 3840 and 1 <= height <= 2160):
             return jsonify({
                 "status": "error",
-                "message": "Couleur invalide : r, g, b doivent être des entiers (0-255)"
+                "message": "Paramètres invalides : width 1-3840, height 1-2160"
             }), 400
+        frames = ambiance.fifo_frames(AMBIENT_FIFO, width, height, should_stop)
+        message = f"Ambiance en attente de frames rgb24 {width}x{height} sur {AMBIENT_FIFO}"
     else:
-        color = None  # Utilisera self.current_color
+        return jsonify({
+            "status": "error",
+            "message": "source doit être 'video', 'images' ou 'pipe'"
+        }), 400
 
-    start_effect(led_controller.custom_blink_effect, count, speed, color)
-    return jsonify({
-        "status": "success",
-        "message": f"Effet clignotement démarré ({count} fois à {speed}x)"
-    })
+    start_effect_on(controllers, 'ambient_effect', frames, AMBIENT_FPS, mode, kind == 'pipe')
+    return jsonify({"status": "success", "message": message})
 
 @app.route('/api/effect/pomodoro', methods=['POST'])
 def effect_pomodoro():
     """Effet Pomodoro - Mode concentration"""
     data = request.get_json(silent=True) or {}
+    try:
+        controllers = resolve_target(data)
+    except KeyError:
+        return unknown_target(data)
 
     # Validation stricte des paramètres
     try:
@@ -1047,28 +2565,157 @@ def effect_pomodoro():
     break_minutes = max(1, min(break_minutes, 60))  # 1-60 minutes
     cycles = max(1, min(cycles, 20))  # 1-20 cycles
 
-    print(f"[POMODORO] Démarrage avec validation : {work_minutes}/{break_minutes} min, {cycles} cycles")
+    log_pomodoro.info("[POMODORO] Démarrage avec validation : %d/%d min, %d cycles", work_minutes, break_minutes, cycles)
 
-    start_effect(led_controller.pomodoro_effect, work_minutes, break_minutes, cycles)
+    start_effect_on(controllers, 'pomodoro_effect', work_minutes, break_minutes, cycles)
     return jsonify({
         "status": "success",
         "message": f"Mode Pomodoro démarré ({cycles} cycles de {work_minutes}/{break_minutes} min)"
     })
 
+# ====== ROUTES ADMIN ======
+
+@app.route('/api/admin/profile', methods=['GET'])
+@admin_required
+def profile_status():
+    """État de la session de profilage, ou téléchargement du dernier résultat"""
+    if request.args.get('download'):
+        last = profiler.last_result
+        if not last or not last.get('file'):
+            return jsonify({
+                "status": "error",
+                "message": "Aucun résultat de profilage disponible"
+            }), 404
+        return send_file(last['file'], as_attachment=True)
+    return jsonify(profiler.status())
+
+@app.route('/api/admin/profile/start', methods=['POST'])
+@admin_required
+def profile_start():
+    """Démarre un profilage borné (sampling = tous les threads, deterministic = boucle BLE + requêtes)"""
+    data = request.get_json(silent=True) or {}
+
+    try:
+        duration = float(data.get('duration', 30))
+        interval_ms = float(data.get('interval_ms', 5))
+        slow_callback_ms = float(data.get('slow_callback_ms', 50))
+    except (ValueError, TypeError):
+        return jsonify({
+            "status": "error",
+            "message": "Paramètres invalides : duration, interval_ms et slow_callback_ms doivent être des nombres"
+        }), 400
+
+    ok, message = profiler.start(
+        led_controller.loop,
+        mode=data.get('mode', 'sampling'),
+        duration=duration,
+        interval=interval_ms / 1000,
+        slow_callback=slow_callback_ms / 1000
+    )
+    if not ok:
+        return jsonify({"status": "error", "message": message}), 409
+    return jsonify({"status": "success", "message": message})
+
+@app.route('/api/admin/profile/stop', methods=['POST'])
+@admin_required
+def profile_stop():
+    """Arrête le profilage et retourne le résumé"""
+    result = profiler.stop()
+    if result is None:
+        return jsonify({
+            "status": "error",
+            "message": "Aucune session de profilage"
+        }), 404
+    return jsonify({"status": "success", "result": result})
+
+@app.route('/api/admin/traffic', methods=['GET'])
+@admin_required
+def traffic_status():
+    """État de la capture de trafic"""
+    return jsonify(traffic_recorder.status())
+
+@app.route('/api/admin/traffic/start', methods=['POST'])
+@admin_required
+def traffic_start():
+    """Démarre la capture du trafic API (fichier .jsonl.gz rejouable avec led_replay.py)"""
+    data = request.get_json(silent=True) or {}
+    name = Path(str(data.get('name') or time.strftime('trafic-%Y%m%d-%H%M%S'))).name
+    path = Path(TRAFFIC_DIR) / f"{name}.jsonl.gz"
+
+    if not traffic_recorder.start(path):
+        return jsonify({
+            "status": "error",
+            "message": "Une capture est déjà en cours"
+        }), 409
+    return jsonify({"status": "success", "message": f"Capture démarrée: {path}"})
+
+@app.route('/api/admin/traffic/stop', methods=['POST'])
+@admin_required
+def traffic_stop():
+    """Arrête la capture du trafic"""
+    result = traffic_recorder.stop()
+    if result is None:
+        return jsonify({
+            "status": "error",
+            "message": "Aucune capture en cours"
+        }), 404
+    return jsonify({"status": "success", "result": result})
+
+@app.route('/api/admin/recording', methods=['GET'])
+@admin_required
+def recording_status():
+    """État de l'enregistrement et liste des enregistrements disponibles"""
+    return jsonify({
+        **led_controller.recorder.status(),
+        "recordings": list_recordings(RECORDING_DIR)
+    })
+
+@app.route('/api/admin/recording/start', methods=['POST'])
+@admin_required
+def recording_start():
+    """Enregistre les paquets envoyés aux LEDs (fichier binaire rejouable)"""
+    data = request.get_json(silent=True) or {}
+    name = Path(str(data.get('name') or time.strftime('show-%Y%m%d-%H%M%S'))).name
+    path = Path(RECORDING_DIR) / f"{name}{RECORDING_EXTENSION}"
+
+    if not led_controller.recorder.start(path):
+        return jsonify({
+            "status": "error",
+            "message": "Un enregistrement est déjà en cours"
+        }), 409
+    return jsonify({"status": "success", "message": f"Enregistrement démarré: {path}"})
+
+@app.route('/api/admin/recording/stop', methods=['POST'])
+@admin_required
+def recording_stop():
+    """Arrête l'enregistrement"""
+    result = led_controller.recorder.stop()
+    if result is None:
+        return jsonify({
+            "status": "error",
+            "message": "Aucun enregistrement en cours"
+        }), 404
+    return jsonify({"status": "success", "result": result})
+
+# Créé après la déclaration des routes : les actions des tâches sont validées contre elles
+scheduler = Scheduler(SCHEDULE_FILE, run_job, LATITUDE, LONGITUDE, known_route, SCHEDULE_GRACE_S)
+
 if __name__ == '__main__':
     print("=" * 60)
     print("  SERVEUR API LEDS - CONNEXION PERSISTANTE")
     print("=" * 60)
     print(f"  Configuration:")
-    print(f"    - Adresse MAC: {LED_ADDRESS}")
+    for name, address in DEVICES:
+        print(f"    - Bande {name}: {address}")
     print(f"    - Host: {FLASK_HOST}")
     print(f"    - Port: {FLASK_PORT}")
     print(f"    - Debug: {FLASK_DEBUG}")
     print("=" * 60)
 
-    # Démarrer la connexion persistante
-    if led_controller.start():
-        print(f"\n  ✅ Système prêt!")
+    # Démarrer les connexions persistantes (une par bande, sur une seule boucle)
+    connected = pool.start()
+    if connected:
+        print(f"\n  ✅ Système prêt! ({connected}/{len(pool.devices)} bande(s) connectée(s))")
         print(f"  📡 Connexion Bluetooth PERSISTANTE active")
         print(f"  ⚡ Latence réduite de ~3.5s à ~0.1s par commande")
         print("=" * 60)
@@ -1090,5 +2737,22 @@ if __name__ == '__main__':
         print("=" * 60)
         print("\n[SERVEUR] En attente de connexions...\n")
 
-    # Lance le serveur avec configuration depuis .env
-    app.run(host=FLASK_HOST, port=FLASK_PORT, debug=FLASK_DEBUG)
+    if REGISTRY_SCAN_INTERVAL > 0:
+        asyncio.run_coroutine_threadsafe(registry_scan_loop(), pool.loop)
+        print(f"  📶 Scan BLE toutes les {REGISTRY_SCAN_INTERVAL:g} s (registre: {DEVICE_REGISTRY})")
+
+    # Un seul minuteur pour toutes les tâches, sur la boucle asyncio du pool
+    scheduler.start(pool.loop)
+    print(f"  ⏰ {len(scheduler.jobs)} tâche(s) planifiée(s) (fichier: {SCHEDULE_FILE})")
+
+    if TRAFFIC_CAPTURE:
+        traffic_recorder.start(TRAFFIC_CAPTURE)
+        print(f"  📼 Capture du trafic API: {TRAFFIC_CAPTURE}")
+
+    # Lance le serveur avec configuration depuis .env. Le serveur de développement de Flask
+    # ferme chaque connexion ; waitress garde les connexions keep-alive (client/led_client.py)
+    if waitress is not None and not FLASK_DEBUG:
+        print(f"  🔁 Serveur waitress (keep-alive, {HTTP_THREADS} threads)")
+        waitress.serve(app, host=FLASK_HOST, port=FLASK_PORT, threads=HTTP_THREADS, channel_timeout=KEEP_ALIVE_TIMEOUT)
+    else:
+        app.run(host=FLASK_HOST, port=FLASK_PORT, debug=FLASK_DEBUG)
@@ -0,0 +1,118 @@
+# led_simulation.py - Transport BLE simulé (LED_SIMULATION=true) pour tests et replays
+import asyncio
+import os
+import time
+
+
+def _scan_delay():
+    """Durée simulée d'une découverte (LED_SIMULATION_SCAN_MS, 0 par défaut)"""
+    return float(os.getenv('LED_SIMULATION_SCAN_MS', '0')) / 1000
+
+
+class SimulatedDevice:
+    """Équivalent de BLEDevice pour le transport simulé"""
+
+    def __init__(self, address, name='ELK-BLEDOM'):
+        self.address = address
+        self.name = name
+        self.details = {'path': f"/org/bluez/hci0/dev_{address.replace(':', '_')}"}
+
+
+class SimulatedAdvertisement:
+    def __init__(self, local_name, rssi):
+        self.local_name = local_name
+        self.rssi = rssi
+
+
+class SimulatedBleakScanner:
+    """Remplace BleakScanner : annonce les adresses déclarées par advertise()"""
+
+    advertised = {}
+
+    @classmethod
+    def advertise(cls, address, name='ELK-BLEDOM'):
+        cls.advertised[address.upper()] = SimulatedDevice(address.upper(), name)
+
+    @classmethod
+    async def discover(cls, timeout=5.0, return_adv=False):
+        await asyncio.sleep(_scan_delay())
+        if not return_adv:
+            return list(cls.advertised.values())
+        return {
+            address: (device, SimulatedAdvertisement(device.name, -50))
+            for address, device in cls.advertised.items()
+        }
+
+    @classmethod
+    async def find_device_by_address(cls, address, timeout=10.0):
+        await asyncio.sleep(_scan_delay())
+        return cls.advertised.get(address.upper())
+
+
+class SimulatedServices:
+    """Table GATT minimale : une caractéristique par UUID demandé, handles à partir de 13"""
+
+    def __init__(self):
+        self.handles = {}
+
+    def get_characteristic(self, specifier):
+        if isinstance(specifier, int):
+            uuid = next((u for u, h in self.handles.items() if h == specifier), None)
+            return SimulatedCharacteristic(uuid, specifier) if uuid else None
+        handle = self.handles.setdefault(str(specifier).lower(), 13 + len(self.handles))
+        return SimulatedCharacteristic(str(specifier).lower(), handle)
+
+
+class SimulatedCharacteristic:
+    def __init__(self, uuid, handle):
+        self.uuid = uuid
+        self.handle = handle
+
+
+class SimulatedBleakClient:
+    """Remplace BleakClient : garde chaque paquet en mémoire au lieu de l'envoyer.
+
+    Même interface que la partie de BleakClient utilisée par le contrôleur
+    (context manager async, is_connected, services, write_gatt_char). Avec une adresse
+    (et non un appareil déjà découvert), la connexion paie la découverte simulée.
+    """
+
+    def __init__(self, address, timeout=10.0, latency=None):
+        self.needs_discovery = isinstance(address, str)
+        self.address = address if self.needs_discovery else address.address
+        self.timeout = timeout
+        self.services = SimulatedServices()
+        # Latence d'écriture simulée (ms), proche d'une écriture BLE sans réponse
+        if latency is None:
+            latency = float(os.getenv('LED_SIMULATION_LATENCY_MS', '8')) / 1000
+        self.latency = latency
+        self.rssi = -50
+        self.is_connected = False
+        self.packets = []  # [(timestamp monotonic, bytes)]
+
+    async def connect(self):
+        await asyncio.sleep(_scan_delay() if self.needs_discovery else 0)
+        self.is_connected = True
+        return True
+
+    async def disconnect(self):
+        self.is_connected = False
+        return True
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.disconnect()
+
+    async def write_gatt_char(self, char_specifier, data, response=False):
+        if not self.is_connected:
+            raise RuntimeError("Client simulé non connecté")
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.packets.append((time.monotonic(), bytes(data)))
+
+
+def is_simulation_enabled():
+    return os.getenv('LED_SIMULATION', 'False').lower() == 'true'
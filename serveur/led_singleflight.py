@@ -0,0 +1,101 @@
+# led_singleflight.py - Déduplication des requêtes identiques (rafales d'automatisations iOS)
+import json
+import threading
+import time
+
+# Attente maximale d'un suiveur sur l'exécution en cours (au-delà : il s'exécute lui-même)
+FOLLOWER_TIMEOUT_S = 10.0
+PRUNE_ABOVE = 64
+
+
+def request_key(endpoint, view_args, query, body):
+    """Route + paramètres + corps JSON normalisé (ordre des clés indifférent)"""
+    return json.dumps([endpoint, view_args, query, body], sort_keys=True, separators=(',', ':'), default=str)
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'generation', 'started', 'finished')
+
+    def __init__(self, generation):
+        self.event = threading.Event()
+        self.result = None
+        self.generation = generation
+        self.started = time.monotonic()
+        self.finished = None
+
+
+class SingleFlight:
+    """Une seule exécution par clé : les doublons en cours attendent son résultat, les doublons
+    récents (moins de `window` s) le reçoivent directement.
+
+    Un résultat récent n'est réutilisé que si aucune autre requête n'a été exécutée depuis
+    (génération inchangée) : couleur A, B puis A renvoie bien A aux LEDs. Les commandes non
+    dédupliquées (arrêt d'effet, aperçu, lot...) appellent invalidate().
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.generation = 0
+        self.counters = {'executed': 0, 'shared_inflight': 0, 'shared_recent': 0, 'saved_ms': 0.0}
+
+    def begin(self, key):
+        """('leader', appel) : exécuter puis finish() ; ('shared', résultat) ; ('execute', None) si l'attente échoue"""
+        with self.lock:
+            now = time.monotonic()
+            if len(self.calls) > PRUNE_ABOVE:
+                self.calls = {
+                    k: c for k, c in self.calls.items()
+                    if c.finished is None or now - c.finished < self.window
+                }
+            call = self.calls.get(key)
+            if call is not None and call.finished is not None:
+                if call.generation == self.generation and now - call.finished < self.window:
+                    self._shared('shared_recent', call)
+                    return 'shared', call.result
+                call = None
+            if call is None:
+                self.generation += 1
+                call = self.calls[key] = _Call(self.generation)
+                self.counters['executed'] += 1
+                return 'leader', call
+
+        if call.event.wait(FOLLOWER_TIMEOUT_S) and call.result is not None:
+            with self.lock:
+                self._shared('shared_inflight', call)
+            return 'shared', call.result
+        return 'execute', None
+
+    def _shared(self, counter, call):
+        self.counters[counter] += 1
+        if call.finished is not None:
+            self.counters['saved_ms'] += (call.finished - call.started) * 1000
+
+    def finish(self, key, call, result, reusable=True):
+        """Publie le résultat du meneur (None = échec : les suiveurs s'exécutent eux-mêmes).
+
+        reusable=False le réserve aux doublons en cours (une nouvelle tentative s'exécute).
+        """
+        with self.lock:
+            call.result = result
+            call.finished = time.monotonic()
+            if (result is None or not reusable) and self.calls.get(key) is call:
+                del self.calls[key]
+        call.event.set()
+
+    def invalidate(self):
+        """Une autre commande a modifié l'état : aucun résultat récent n'est plus réutilisable"""
+        with self.lock:
+            self.generation += 1
+
+    def status(self):
+        with self.lock:
+            shared = self.counters['shared_inflight'] + self.counters['shared_recent']
+            total = shared + self.counters['executed']
+            return {
+                'window_ms': round(self.window * 1000),
+                **self.counters,
+                'saved_ms': round(self.counters['saved_ms'], 1),
+                'deduplicated_percent': round(shared / total * 100, 1) if total else 0.0
+            }
@@ -0,0 +1,144 @@
+# led_stats.py - Statistiques glissantes (1 min, 5 min, 1 h) en mémoire constante
+import threading
+import time
+from array import array
+
+# Histogramme de latence : bornes log-espacées de ~1 ms à ~16 s (facteur √2)
+LATENCY_BOUNDS_MS = tuple(2 ** (i / 2) for i in range(29))
+LATENCY_BINS = len(LATENCY_BOUNDS_MS) + 1  # + débordement
+
+# Fenêtres exposées : nom -> (durée d'un seau en s, nombre de seaux)
+WINDOWS = {
+    '1m': (1, 60),
+    '5m': (5, 60),
+    '1h': (60, 60),
+}
+
+
+def _latency_bin(latency_ms):
+    for index, bound in enumerate(LATENCY_BOUNDS_MS):
+        if latency_ms <= bound:
+            return index
+    return LATENCY_BINS - 1
+
+
+class RollingWindow:
+    """Tableaux circulaires de seaux : un seau périmé est remis à zéro à sa réutilisation"""
+
+    def __init__(self, bucket_seconds, bucket_count):
+        self.bucket_seconds = bucket_seconds
+        self.bucket_count = bucket_count
+        self.epochs = array('q', [-1] * bucket_count)
+        self.sent = array('l', [0] * bucket_count)
+        self.failed = array('l', [0] * bucket_count)
+        self.reconnects = array('l', [0] * bucket_count)
+        self.latency = array('l', [0] * (bucket_count * LATENCY_BINS))
+
+    def _slot(self, now):
+        epoch = int(now // self.bucket_seconds)
+        slot = epoch % self.bucket_count
+        if self.epochs[slot] != epoch:
+            self.epochs[slot] = epoch
+            self.sent[slot] = 0
+            self.failed[slot] = 0
+            self.reconnects[slot] = 0
+            base = slot * LATENCY_BINS
+            self.latency[base:base + LATENCY_BINS] = array('l', [0] * LATENCY_BINS)
+        return slot
+
+    def add_write(self, now, success, latency_bin):
+        slot = self._slot(now)
+        if success:
+            self.sent[slot] += 1
+            if latency_bin is not None:
+                self.latency[slot * LATENCY_BINS + latency_bin] += 1
+        else:
+            self.failed[slot] += 1
+
+    def add_reconnect(self, now):
+        self.reconnects[self._slot(now)] += 1
+
+    def snapshot(self, now, uptime):
+        current = int(now // self.bucket_seconds)
+        oldest = current - self.bucket_count + 1
+        sent = failed = reconnects = 0
+        histogram = [0] * LATENCY_BINS
+
+        for slot in range(self.bucket_count):
+            if oldest <= self.epochs[slot] <= current:
+                sent += self.sent[slot]
+                failed += self.failed[slot]
+                reconnects += self.reconnects[slot]
+                base = slot * LATENCY_BINS
+                for index in range(LATENCY_BINS):
+                    histogram[index] += self.latency[base + index]
+
+        span = min(self.bucket_seconds * self.bucket_count, max(uptime, 1e-9))
+        total = sent + failed
+        return {
+            'commands_sent': sent,
+            'commands_failed': failed,
+            'success_rate': sent / total * 100 if total else None,
+            'throughput_per_s': round(total / span, 3),
+            'latency_ms': {
+                'p50': _histogram_percentile(histogram, 50),
+                'p95': _histogram_percentile(histogram, 95),
+                'p99': _histogram_percentile(histogram, 99),
+            },
+            'reconnections': reconnects,
+        }
+
+
+def _histogram_percentile(histogram, pct):
+    """Borne haute du seau contenant le percentile (None si vide)"""
+    total = sum(histogram)
+    if not total:
+        return None
+    target = pct / 100 * total
+    cumulative = 0
+    for index, count in enumerate(histogram):
+        cumulative += count
+        if cumulative >= target:
+            if index < len(LATENCY_BOUNDS_MS):
+                return round(LATENCY_BOUNDS_MS[index], 2)
+            return None
+    return None
+
+
+class RollingStats:
+    """Statistiques d'écriture BLE sur plusieurs fenêtres glissantes (thread-safe)"""
+
+    def __init__(self, windows=WINDOWS, clock=time.time):
+        self.clock = clock
+        self.started = clock()
+        self.lock = threading.Lock()
+        self.windows = {
+            name: RollingWindow(bucket_seconds, bucket_count)
+            for name, (bucket_seconds, bucket_count) in windows.items()
+        }
+
+    def record_write(self, success, latency=None):
+        """`latency` en secondes (None si inconnue)"""
+        latency_bin = _latency_bin(latency * 1000) if latency is not None else None
+        now = self.clock()
+        with self.lock:
+            for window in self.windows.values():
+                window.add_write(now, success, latency_bin)
+
+    def record_reconnect(self):
+        now = self.clock()
+        with self.lock:
+            for window in self.windows.values():
+                window.add_reconnect(now)
+
+    def snapshot(self, name=None):
+        """Statistiques d'une fenêtre, ou de toutes si `name` est None"""
+        now = self.clock()
+        uptime = now - self.started
+        with self.lock:
+            if name is not None:
+                return self.windows[name].snapshot(now, uptime)
+            return {
+                window_name: window.snapshot(now, uptime)
+                for window_name, window in self.windows.items()
+            }
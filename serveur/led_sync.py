@@ -0,0 +1,181 @@
+# led_sync.py - Effets de groupe : rendus une fois, joués par plusieurs bandes sur une horloge commune
+import collections
+import hashlib
+import heapq
+import statistics
+import threading
+import time
+from array import array
+
+from commun.led_protocole import color_packet
+from led_timeline import PacketStream
+
+# Avance au démarrage : toutes les bandes partent de la même origine
+START_LEAD_S = 0.2
+SKEW_HISTORY = 512
+# Frames dont on attend encore l'écriture sur toutes les bandes (au-delà : abandonnées)
+PENDING_FRAMES = 256
+
+
+def cycle_stream(frames):
+    """(r, g, b, délai) joués en boucle -> PacketStream infini"""
+    packets = bytearray()
+    times = array('d')
+    moment = 0.0
+    for r, g, b, delay in frames:
+        times.append(moment)
+        packets += color_packet(r, g, b)
+        moment += delay
+    packets = bytes(packets)
+    return PacketStream(packets, times, moment, 0, hashlib.sha256(packets).hexdigest())
+
+
+def strip_events(stream, shift):
+    """(instant relatif, frame, paquet) d'une bande décalée de `shift` secondes.
+
+    En boucle infinie, le décalage fait tourner le cycle : la bande démarre au milieu
+    de l'effet (poursuite d'une bande à l'autre) au lieu de rester éteinte. Une frame
+    est identifiée par (itération, index) pour comparer les bandes entre elles.
+    """
+    period = stream.duration
+    looping = stream.repeat == 0 and period > 0
+    if looping:
+        shift %= period
+    iteration = -1 if looping and shift else 0
+    previous = None
+    while looping or iteration < max(stream.repeat, 1):
+        for index in range(len(stream)):
+            moment = shift + iteration * period + stream.times[index]
+            frame = (iteration, index)
+            if moment < 0:
+                previous = frame
+                continue
+            if previous is not None:
+                # Frame en cours à l'origine (cycle commencé avant le départ)
+                if moment > 0:
+                    yield 0.0, previous, stream.packet(previous[1])
+                previous = None
+            yield moment, frame, stream.packet(index)
+        iteration += 1
+        if not looping and period <= 0:
+            return
+
+
+class SyncPlayer:
+    """Joue un PacketStream sur plusieurs bandes contre les mêmes échéances absolues.
+
+    Chaque paquet part à échéance - durée d'écriture lissée de sa bande (write_latency),
+    pour que l'écriture se termine à l'échéance. Une bande encore occupée ne fait pas la queue :
+    seule la frame la plus récente attend (les autres sont fusionnées). L'écart entre
+    bandes (skew) est mesuré sur chaque frame écrite par toutes les bandes.
+    """
+
+    def __init__(self, controllers, offsets=None):
+        self.controllers = list(controllers)
+        self.offsets = list(offsets or [0.0] * len(self.controllers))
+        self.lock = threading.Lock()
+        self.errors = {c.name: collections.deque(maxlen=SKEW_HISTORY) for c in self.controllers}
+        self.missed = {c.name: 0 for c in self.controllers}
+        self.coalesced = {c.name: 0 for c in self.controllers}
+        self.skews = collections.deque(maxlen=SKEW_HISTORY)
+        self.pending = collections.OrderedDict()  # frame -> {bande: erreur}
+        self.busy = {}       # bande -> Future de l'écriture en cours
+        self.deferred = {}   # bande -> (frame, échéance, paquet) en attente de la fin d'écriture
+        self.running = False
+
+    def play(self, stream, should_stop=lambda: False):
+        """Bloque jusqu'à la fin du flux ou should_stop()"""
+        self.running = True
+        origin = time.monotonic() + START_LEAD_S
+        sources = [strip_events(stream, offset) for offset in self.offsets]
+        heap = []
+
+        def schedule(strip):
+            event = next(sources[strip], None)
+            if event is not None:
+                moment, frame, packet = event
+                deadline = origin + moment
+                latency = self.controllers[strip].write_latency
+                heapq.heappush(heap, (deadline - latency, deadline, strip, frame, packet))
+
+        try:
+            for strip in range(len(self.controllers)):
+                schedule(strip)
+            while heap and not should_stop():
+                delay = heap[0][0] - time.monotonic()
+                if delay > 0:
+                    # Tranches courtes : l'arrêt reste réactif pendant les longues pauses
+                    time.sleep(min(delay, 0.1))
+                    continue
+                _, deadline, strip, frame, packet = heapq.heappop(heap)
+                schedule(strip)
+                # En retard : sauté si la frame suivante de la même bande est déjà due
+                following = next((event for event in heap if event[2] == strip), None)
+                if following is not None and following[0] <= time.monotonic():
+                    with self.lock:
+                        self.missed[self.controllers[strip].name] += 1
+                    continue
+                self._dispatch(self.controllers[strip], frame, deadline, packet)
+        finally:
+            self.running = False
+
+    def _dispatch(self, controller, frame, deadline, packet):
+        with self.lock:
+            current = self.busy.get(controller.name)
+            if current is not None and not current.done():
+                if controller.name in self.deferred:
+                    self.coalesced[controller.name] += 1
+                self.deferred[controller.name] = (frame, deadline, packet)
+                return
+            future = controller.submit(controller.stage_packet(packet))
+            self.busy[controller.name] = future
+        future.add_done_callback(lambda done: self._written(controller, frame, deadline, packet, done))
+
+    def _written(self, controller, frame, deadline, packet, future):
+        """Fin d'écriture (thread de la boucle asyncio) : métriques puis frame différée"""
+        result = future.result() if not future.cancelled() and future.exception() is None else {"success": False}
+        name = controller.name
+        if result['success']:
+            error = result['written_at'] - deadline
+            with self.lock:
+                self.errors[name].append(error)
+                written = self.pending.setdefault(frame, {})
+                written[name] = error
+                if len(written) == len(self.controllers):
+                    del self.pending[frame]
+                    self.skews.append(max(written.values()) - min(written.values()))
+                while len(self.pending) > PENDING_FRAMES:
+                    self.pending.popitem(last=False)
+        else:
+            controller.shadow_known.discard(packet[2])
+
+        with self.lock:
+            deferred = self.deferred.pop(name, None)
+        if deferred is not None:
+            self._dispatch(controller, *deferred)
+
+    def status(self):
+        with self.lock:
+            skews = sorted(self.skews)
+            return {
+                'running': self.running,
+                'devices': {
+                    c.name: {
+                        'offset_ms': round(offset * 1000, 1),
+                        'write_latency_ms': round(c.write_latency * 1000, 2),
+                        'mean_error_ms': (
+                            round(statistics.fmean(self.errors[c.name]) * 1000, 2) if self.errors[c.name] else None
+                        ),
+                        'missed': self.missed[c.name],
+                        'coalesced': self.coalesced[c.name],
+                    }
+                    for c, offset in zip(self.controllers, self.offsets)
+                },
+                'skew': {
+                    'frames': len(skews),
+                    'last_ms': round(self.skews[-1] * 1000, 2) if skews else None,
+                    'mean_ms': round(statistics.fmean(skews) * 1000, 2) if skews else None,
+                    'p95_ms': round(skews[int(0.95 * (len(skews) - 1))] * 1000, 2) if skews else None,
+                    'max_ms': round(skews[-1] * 1000, 2) if skews else None,
+                }
+            }
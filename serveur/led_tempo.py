@@ -0,0 +1,106 @@
+# led_tempo.py - Horloge de tempo : BPM, tap tempo, phase continue et erreur de phase mesurée
+import collections
+import statistics
+import threading
+import time
+
+MIN_BPM = 20
+MAX_BPM = 300
+# Taps séparés de plus de TAP_RESET_S : nouvelle série
+TAP_RESET_S = 2.0
+TAP_HISTORY = 8
+# Lissage de la latence d'écriture mesurée (moyenne exponentielle)
+LATENCY_SMOOTHING = 0.2
+ERROR_HISTORY = 512
+
+
+class BeatClock:
+    """Position en battements = beats_at_anchor + (t - anchor) * bpm / 60.
+
+    Changer de BPM redéfinit l'ancre à l'instant du changement : la phase est continue,
+    aucun saut de position. Les effets calent leurs fronts sur time_of(battement) moins
+    la latence d'écriture mesurée.
+    """
+
+    def __init__(self, bpm=120.0):
+        self.lock = threading.Lock()
+        self.bpm = float(bpm)
+        self.anchor = time.monotonic()
+        self.beats_at_anchor = 0.0
+        self.taps = collections.deque(maxlen=TAP_HISTORY)
+        self.latency = 0.0
+        self.errors = collections.deque(maxlen=ERROR_HISTORY)  # secondes, >0 = en retard
+        self.edges = 0
+        self.missed = 0
+
+    def beat_at(self, moment):
+        return self.beats_at_anchor + (moment - self.anchor) * self.bpm / 60
+
+    def time_of(self, beat):
+        return self.anchor + (beat - self.beats_at_anchor) * 60 / self.bpm
+
+    def _reanchor(self, now, beat):
+        self.anchor = now
+        self.beats_at_anchor = beat
+
+    def set_bpm(self, bpm, downbeat=False):
+        """Nouveau tempo ; downbeat=True place un battement entier à l'instant présent"""
+        bpm = max(MIN_BPM, min(float(bpm), MAX_BPM))
+        with self.lock:
+            now = time.monotonic()
+            beat = self.beat_at(now)
+            self._reanchor(now, float(round(beat)) if downbeat else beat)
+            self.bpm = bpm
+        return bpm
+
+    def tap(self):
+        """Tap tempo : BPM = intervalle médian des taps, phase calée sur le dernier tap"""
+        with self.lock:
+            now = time.monotonic()
+            if self.taps and now - self.taps[-1] > TAP_RESET_S:
+                self.taps.clear()
+            self.taps.append(now)
+            if len(self.taps) < 2:
+                return None
+            intervals = [b - a for a, b in zip(self.taps, list(self.taps)[1:])]
+            self.bpm = max(MIN_BPM, min(60 / statistics.median(intervals), MAX_BPM))
+            self._reanchor(now, float(round(self.beat_at(now))))
+            return self.bpm
+
+    def observe_latency(self, seconds):
+        """Latence entre la décision d'envoyer et la fin de l'écriture BLE"""
+        with self.lock:
+            if self.latency == 0.0:
+                self.latency = seconds
+            else:
+                self.latency += (seconds - self.latency) * LATENCY_SMOOTHING
+
+    def record_edge(self, target, actual):
+        """Front joué : écart entre la fin d'écriture et l'instant visé"""
+        with self.lock:
+            self.errors.append(actual - target)
+            self.edges += 1
+
+    def record_missed(self):
+        with self.lock:
+            self.missed += 1
+
+    def status(self):
+        with self.lock:
+            now = time.monotonic()
+            errors = sorted(abs(e) for e in self.errors)
+            phase_error = {
+                'edges': self.edges,
+                'missed': self.missed,
+                'last_ms': round(self.errors[-1] * 1000, 2) if self.errors else None,
+                'mean_ms': round(statistics.fmean(self.errors) * 1000, 2) if self.errors else None,
+                'mean_abs_ms': round(statistics.fmean(errors) * 1000, 2) if errors else None,
+                'p95_abs_ms': round(errors[int(0.95 * (len(errors) - 1))] * 1000, 2) if errors else None,
+                'max_abs_ms': round(errors[-1] * 1000, 2) if errors else None,
+            }
+            return {
+                'bpm': round(self.bpm, 2),
+                'beat': round(self.beat_at(now), 3),
+                'latency_ms': round(self.latency * 1000, 2),
+                'phase_error': phase_error
+            }
@@ -0,0 +1,287 @@
+# led_timeline.py - Timelines d'effets déclaratives (JSON) compilées en flux de paquets
+#
+# Format :
+# {
+#   "loop": true | false | <nombre de répétitions>,
+#   "fps": 20,                       # échantillonnage des segments interpolés
+#   "easing": "linear",              # par défaut pour chaque segment
+#   "space": "oklab",                # espace d'interpolation des couleurs
+#   "duration": 2000,                # optionnel, ms (défaut : dernier keyframe)
+#   "keyframes": [
+#     {"t": 0,    "color": [255, 0, 0], "brightness": 100},
+#     {"t": 1000, "color": [0, 0, 255], "easing": "ease-in-out"},
+#     {"t": 1500, "brightness": 20, "easing": "step"}
+#   ]
+# }
+# L'easing d'un keyframe s'applique au segment qui y ARRIVE. Couleur et
+# luminosité ont chacune leur propre courbe (un keyframe peut n'en porter qu'une).
+import collections
+import hashlib
+import json
+import threading
+from array import array
+from pathlib import Path
+
+from commun.led_couleur import COLOR_SPACES, correct, mix
+from commun.led_protocole import PACKET_SIZE, brightness_packet, color_packet
+
+MAX_KEYFRAMES = 500
+MAX_DURATION_MS = 3600 * 1000
+MAX_FPS = 50
+MAX_PACKETS = 200000
+# Instants échantillonnés (grille fps + keyframes) : borne le temps de compilation (~0,7 s)
+MAX_SAMPLES = 100000
+CACHE_SIZE = 32
+
+EASINGS = {
+    'linear': lambda p: p,
+    'ease-in': lambda p: p * p,
+    'ease-out': lambda p: 1 - (1 - p) * (1 - p),
+    'ease-in-out': lambda p: 2 * p * p if p < 0.5 else 1 - 2 * (1 - p) * (1 - p),
+    'step': lambda p: 1.0 if p >= 1.0 else 0.0,
+}
+
+BUILTIN_DIR = Path(__file__).parent / 'timelines'
+
+
+class TimelineError(ValueError):
+    """Timeline invalide (message destiné au client de l'API)"""
+
+
+class PacketStream:
+    """Timeline compilée : paquets de 9 octets contigus + instant d'émission (s)"""
+
+    __slots__ = ('packets', 'times', 'duration', 'repeat', 'digest')
+
+    def __init__(self, packets, times, duration, repeat, digest):
+        self.packets = packets      # bytes, len = 9 * n
+        self.times = times          # array('d'), secondes depuis le début de l'itération
+        self.duration = duration    # durée d'une itération (s)
+        self.repeat = repeat        # 0 = infini
+        self.digest = digest
+
+    def __len__(self):
+        return len(self.times)
+
+    def packet(self, index):
+        start = index * PACKET_SIZE
+        return self.packets[start:start + PACKET_SIZE]
+
+
+def _color(value, where):
+    if not isinstance(value, (list, tuple)) or len(value) != 3:
+        raise TimelineError(f"{where}: color doit être [r, g, b]")
+    try:
+        return tuple(max(0, min(int(c), 255)) for c in value)
+    except (TypeError, ValueError):
+        raise TimelineError(f"{where}: color doit contenir des entiers")
+
+
+def validate(spec):
+    """Vérifie et normalise une timeline. Lève TimelineError"""
+    if not isinstance(spec, dict):
+        raise TimelineError("la timeline doit être un objet JSON")
+
+    keyframes = spec.get('keyframes')
+    if not isinstance(keyframes, list) or not keyframes:
+        raise TimelineError("keyframes doit être une liste non vide")
+    if len(keyframes) > MAX_KEYFRAMES:
+        raise TimelineError(f"au plus {MAX_KEYFRAMES} keyframes")
+
+    default_easing = spec.get('easing', 'linear')
+    if default_easing not in EASINGS:
+        raise TimelineError(f"easing inconnu: {default_easing}")
+    space = spec.get('space', 'oklab')
+    if space not in COLOR_SPACES:
+        raise TimelineError(f"space doit être l'un de {', '.join(COLOR_SPACES)}")
+
+    try:
+        fps = float(spec.get('fps', 20))
+    except (TypeError, ValueError):
+        raise TimelineError("fps doit être un nombre")
+    fps = max(1.0, min(fps, MAX_FPS))
+
+    loop = spec.get('loop', False)
+    if loop is True:
+        repeat = 0
+    elif loop is False or loop is None:
+        repeat = 1
+    elif isinstance(loop, int) and loop >= 1:
+        repeat = loop
+    else:
+        raise TimelineError("loop doit être true, false ou un entier >= 1")
+
+    normalized = []
+    last_t = -1
+    for index, keyframe in enumerate(keyframes):
+        where = f"keyframes[{index}]"
+        if not isinstance(keyframe, dict):
+            raise TimelineError(f"{where} doit être un objet")
+        try:
+            t = int(keyframe.get('t'))
+        except (TypeError, ValueError):
+            raise TimelineError(f"{where}: t (ms) est requis")
+        if t < last_t:
+            raise TimelineError(f"{where}: les keyframes doivent être triés par t")
+        if t > MAX_DURATION_MS:
+            raise TimelineError(f"{where}: t dépasse {MAX_DURATION_MS} ms")
+        last_t = t
+
+        entry = {'t': t, 'easing': keyframe.get('easing', default_easing)}
+        if entry['easing'] not in EASINGS:
+            raise TimelineError(f"{where}: easing inconnu {entry['easing']}")
+        if 'color' in keyframe:
+            entry['color'] = _color(keyframe['color'], where)
+        if 'brightness' in keyframe:
+            try:
+                entry['brightness'] = max(0, min(int(keyframe['brightness']), 100))
+            except (TypeError, ValueError):
+                raise TimelineError(f"{where}: brightness doit être un entier 0-100")
+        if 'color' not in entry and 'brightness' not in entry:
+            raise TimelineError(f"{where}: color ou brightness requis")
+        normalized.append(entry)
+
+    try:
+        duration = int(spec.get('duration', last_t))
+    except (TypeError, ValueError):
+        raise TimelineError("duration doit être un entier (ms)")
+    if duration < last_t or duration > MAX_DURATION_MS:
+        raise TimelineError("duration doit couvrir tous les keyframes (max 1 h)")
+    if repeat != 1 and duration <= 0:
+        raise TimelineError("une timeline en boucle doit avoir une durée > 0")
+    if duration / 1000 * fps + len(normalized) > MAX_SAMPLES:
+        raise TimelineError(f"timeline trop longue (> {MAX_SAMPLES} échantillons) : réduire fps ou duration")
+
+    return {
+        'keyframes': normalized,
+        'fps': fps,
+        'space': space,
+        'repeat': repeat,
+        'duration': duration,
+    }
+
+
+def _track(keyframes, key):
+    """Points (t, valeur, easing) d'une piste (couleur ou luminosité)"""
+    return [(kf['t'], kf[key], kf['easing']) for kf in keyframes if key in kf]
+
+
+def _sampler(track, interpolate):
+    """Fonction t (ms) -> valeur de la piste, pour des instants croissants.
+
+    Le segment courant avance avec t : O(keyframes + instants) pour toute la timeline.
+    """
+    index = 0
+
+    def sample(t):
+        nonlocal index
+        if t <= track[0][0]:
+            return track[0][1]
+        # Premier segment qui contient t (t0 <= t <= t1)
+        while index + 1 < len(track) and track[index + 1][0] < t:
+            index += 1
+        if index + 1 == len(track):
+            return track[-1][1]
+        (t0, v0, _), (t1, v1, easing) = track[index], track[index + 1]
+        if t1 == t0:
+            return v1
+        if v0 == v1:
+            return v0
+        return interpolate(v0, v1, EASINGS[easing]((t - t0) / (t1 - t0)))
+
+    return sample
+
+
+def compile_timeline(timeline, digest=''):
+    """Timeline validée -> PacketStream (un paquet seulement quand la valeur change)"""
+    keyframes = timeline['keyframes']
+    space = timeline['space']
+    colors = _track(keyframes, 'color')
+    levels = _track(keyframes, 'brightness')
+
+    # Instants d'échantillonnage : grille fps + chaque keyframe (changements 'step' exacts)
+    frame_ms = 1000 / timeline['fps']
+    instants = {kf['t'] for kf in keyframes}
+    t = 0.0
+    while t < timeline['duration']:
+        instants.add(round(t, 3))
+        t += frame_ms
+    instants = sorted(instants)
+
+    sample_color = _sampler(colors, lambda a, b, p: mix(a, b, p, space)) if colors else None
+    sample_level = _sampler(levels, lambda a, b, p: a + (b - a) * p) if levels else None
+    packets = bytearray()
+    times = array('d')
+    last_color = last_level = None
+    for t in instants:
+        if colors:
+            color = sample_color(t)
+            # Comparée après la LUT gamma : deux couleurs identiques sur le lien n'envoient qu'un paquet
+            if correct(color) != last_color:
+                packets += color_packet(*color)
+                times.append(t / 1000)
+                last_color = correct(color)
+        if levels:
+            level = round(sample_level(t))
+            if level != last_level:
+                packets += brightness_packet(level)
+                times.append(t / 1000)
+                last_level = level
+        if len(times) > MAX_PACKETS:
+            raise TimelineError(f"timeline trop longue (> {MAX_PACKETS} paquets)")
+
+    return PacketStream(bytes(packets), times, timeline['duration'] / 1000, timeline['repeat'], digest)
+
+
+def content_hash(spec):
+    canonical = json.dumps(spec, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class TimelineLibrary:
+    """Cache LRU des timelines compilées, indexé par empreinte du contenu"""
+
+    def __init__(self, builtin_dir=BUILTIN_DIR, size=CACHE_SIZE):
+        self.builtin_dir = Path(builtin_dir)
+        self.size = size
+        self.cache = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, spec):
+        """Valide et compile (ou retrouve en cache). Lève TimelineError"""
+        digest = content_hash(spec)
+        with self.lock:
+            stream = self.cache.get(digest)
+            if stream is not None:
+                self.cache.move_to_end(digest)
+                self.hits += 1
+                return stream
+
+        stream = compile_timeline(validate(spec), digest)
+        with self.lock:
+            self.misses += 1
+            self.cache[digest] = stream
+            while len(self.cache) > self.size:
+                self.cache.popitem(last=False)
+        return stream
+
+    def builtin_names(self):
+        return sorted(path.stem for path in self.builtin_dir.glob('*.json'))
+
+    def load_builtin(self, name):
+        """Spécification d'une timeline fournie (timelines/<name>.json)"""
+        if name not in self.builtin_names():
+            raise TimelineError(f"timeline inconnue: {name}")
+        with open(self.builtin_dir / f"{name}.json", encoding='utf-8') as f:
+            return json.load(f)
+
+    def info(self):
+        with self.lock:
+            return {
+                'cached': len(self.cache),
+                'hits': self.hits,
+                'misses': self.misses,
+                'builtin': self.builtin_names()
+            }
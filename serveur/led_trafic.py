@@ -0,0 +1,86 @@
+# led_trafic.py - Capture du trafic API (routes, corps, timing) pour replay
+import gzip
+import json
+import threading
+import time
+from pathlib import Path
+
+FORMAT_NAME = 'led-trafic'
+FORMAT_VERSION = 1
+
+# Routes jamais capturées (admin, flux continus)
+EXCLUDED_PREFIXES = ('/api/admin', '/api/pomodoro/stream')
+
+
+class TrafficRecorder:
+    """Écrit les requêtes API dans un fichier JSON lines compressé (gzip).
+
+    Ligne 1 : en-tête {"format", "version", "started_at"}.
+    Lignes suivantes : [offset_s, méthode, chemin, corps, statut, latence_ms].
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = False
+        self.path = None
+        self._file = None
+        self._start = 0.0
+        self.count = 0
+
+    def start(self, path):
+        with self.lock:
+            if self.active:
+                return False
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = gzip.open(path, 'wt', encoding='utf-8')
+            self._start = time.monotonic()
+            self._file.write(json.dumps({
+                'format': FORMAT_NAME,
+                'version': FORMAT_VERSION,
+                'started_at': time.time()
+            }) + '\n')
+            self.path = path
+            self.count = 0
+            self.active = True
+            return True
+
+    def stop(self):
+        with self.lock:
+            if not self.active:
+                return None
+            self._file.close()
+            self._file = None
+            self.active = False
+            return {'file': str(self.path), 'requests': self.count}
+
+    def should_capture(self, path):
+        return path.startswith('/api/') and not path.startswith(EXCLUDED_PREFIXES)
+
+    def record(self, started, method, path, body, status, latency):
+        """`started` : instant monotonic de réception de la requête"""
+        line = json.dumps(
+            [round(started - self._start, 4), method, path, body, status, round(latency * 1000, 2)],
+            separators=(',', ':')
+        )
+        with self.lock:
+            if self.active:
+                self._file.write(line + '\n')
+                self.count += 1
+
+    def status(self):
+        return {
+            'active': self.active,
+            'file': str(self.path) if self.path else None,
+            'requests': self.count
+        }
+
+
+def load_traffic(path):
+    """Lit un fichier de capture. Retourne (en-tête, liste d'entrées)"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('format') != FORMAT_NAME:
+            raise ValueError(f"{path} n'est pas une capture de trafic LED")
+        entries = [json.loads(line) for line in f if line.strip()]
+    return header, entries
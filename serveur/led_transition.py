@@ -0,0 +1,90 @@
+# led_transition.py - Transitions douces côté serveur (couleur, luminosité), reciblables
+import threading
+import time
+
+# Plafond de cadence : au-delà, le lien BLE ne suit pas (écriture + pause de ~50 ms)
+MAX_FPS = 20
+MAX_DURATION_MS = 60000
+
+
+class TransitionEngine:
+    """Un thread unique rend toutes les transitions en cours, une frame par tour.
+
+    Le rythme est celui du lien : chaque frame attend la fin de l'écriture précédente,
+    dans la limite de MAX_FPS. Une nouvelle cible pendant une transition repart de la
+    valeur interpolée à cet instant au lieu d'attendre la fin de la précédente.
+    """
+
+    def __init__(self, apply, max_fps=MAX_FPS):
+        self.apply = apply  # apply(kind, value) : envoie une frame
+        self.frame_interval = 1 / max_fps
+        self.condition = threading.Condition()
+        self.active = {}     # kind -> (origine, cible, début, durée, interpolation)
+        self.last_sent = {}
+        self.generation = {}  # kind -> compteur, incrémenté à chaque cible ou annulation
+        self.thread = None
+        self.frames_sent = 0
+        self.retargets = 0
+
+    @staticmethod
+    def _value_at(transition, now):
+        origin, target, started, duration, interpolate = transition
+        progress = min(1.0, (now - started) / duration) if duration > 0 else 1.0
+        return interpolate(origin, target, progress), progress >= 1.0
+
+    def start(self, kind, origin, target, duration, interpolate):
+        """Lance (ou recible) la transition `kind` vers target en `duration` secondes"""
+        with self.condition:
+            now = time.monotonic()
+            running = self.active.get(kind)
+            if running is not None:
+                origin, _ = self._value_at(running, now)
+                self.retargets += 1
+            self.active[kind] = (origin, target, now, duration, interpolate)
+            self.generation[kind] = self.generation.get(kind, 0) + 1
+            self.last_sent.pop(kind, None)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def cancel(self, kind=None):
+        """Abandonne une transition (ou toutes) : la valeur reste où elle en est"""
+        with self.condition:
+            for name in (list(self.active) if kind is None else [kind]):
+                self.active.pop(name, None)
+                self.generation[name] = self.generation.get(name, 0) + 1
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.active:
+                    self.condition.wait()
+                frame_start = time.monotonic()
+                frame = {}
+                for kind, transition in list(self.active.items()):
+                    value, finished = self._value_at(transition, frame_start)
+                    frame[kind] = (value, self.generation[kind])
+                    if finished:
+                        del self.active[kind]
+
+            for kind, (value, generation) in frame.items():
+                # Annulée ou reciblée entre-temps : cette frame est périmée
+                if self.generation.get(kind) != generation:
+                    continue
+                if self.last_sent.get(kind) != value:
+                    self.apply(kind, value)
+                    self.last_sent[kind] = value
+                    self.frames_sent += 1
+
+            remaining = frame_start + self.frame_interval - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def status(self):
+        with self.condition:
+            return {
+                'active': sorted(self.active),
+                'frames_sent': self.frames_sent,
+                'retargets': self.retargets
+            }
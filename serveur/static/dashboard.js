@@ -0,0 +1,265 @@
+// État actuel
+let currentColor = { r: 255, g: 255, b: 255 };
+let currentEffect = "Aucun";
+let currentBrightness = 100;
+
+// Toast notification
+function showToast(message) {
+  const toast = document.getElementById('toast');
+  toast.textContent = message;
+  toast.classList.add('show');
+  setTimeout(() => toast.classList.remove('show'), 3000);
+}
+
+// Switch tabs
+function switchTab(tabName) {
+  // Remove active class from all tabs
+  document.querySelectorAll('.tab-button').forEach(btn => btn.classList.remove('active'));
+  document.querySelectorAll('.tab-content').forEach(content => content.classList.remove('active'));
+
+  // Add active class to selected tab
+  event.target.classList.add('active');
+  document.getElementById('tab-' + tabName).classList.add('active');
+}
+
+// Update displays
+function updateColorDisplay(r, g, b) {
+  currentColor = { r, g, b };
+  const preview = document.getElementById('color-preview-large');
+  const rgb = document.getElementById('rgb-display');
+  preview.style.background = `rgb(${r}, ${g}, ${b})`;
+  rgb.textContent = `RGB(${r}, ${g}, ${b})`;
+}
+
+function updateEffectDisplay(effect) {
+  currentEffect = effect;
+  document.getElementById('effect-display').textContent = effect;
+}
+
+function updateBrightnessDisplay(value) {
+  currentBrightness = value;
+  document.getElementById('brightness-value').textContent = value + '%';
+  document.getElementById('brightness-display').textContent = value + '%';
+}
+
+function updateSpeedDisplay(value) {
+  document.getElementById('speed-value').textContent = parseFloat(value).toFixed(1) + 'x';
+}
+
+function updateBlinkCountDisplay(value) {
+  document.getElementById('blink-count-value').textContent = value;
+}
+
+function updateColorPreview(hex) {
+  const r = parseInt(hex.slice(1, 3), 16);
+  const g = parseInt(hex.slice(3, 5), 16);
+  const b = parseInt(hex.slice(5, 7), 16);
+  document.getElementById('picker-value').textContent = `RGB(${r}, ${g}, ${b})`;
+  // Prévisualisation en temps réel
+  document.getElementById('color-preview-large').style.background = `rgb(${r}, ${g}, ${b})`;
+}
+
+// Prévisualisation pendant un glisser : au plus une requête par budget de frame annoncé
+// par le serveur ; pendant une requête en cours, seule la valeur la plus récente attend
+const livePreview = { frameMs: 50, pending: {}, inflight: null, lastSent: 0, scheduled: false };
+
+fetch('/api/preview')
+  .then(r => r.json())
+  .then(data => { livePreview.frameMs = data.frame_ms; })
+  .catch(() => {});
+
+function preview(kind, value) {
+  livePreview.pending[kind] = value;
+  schedulePreview();
+}
+
+function previewColor(hex) {
+  preview('color', [1, 3, 5].map(i => parseInt(hex.slice(i, i + 2), 16)));
+}
+
+function schedulePreview() {
+  if (!livePreview.scheduled && Object.keys(livePreview.pending).length) {
+    livePreview.scheduled = true;
+    requestAnimationFrame(sendPreview);
+  }
+}
+
+function sendPreview(now) {
+  livePreview.scheduled = false;
+  // Requête en cours : relancé à sa fin ; budget pas encore écoulé : frame suivante
+  if (livePreview.inflight) return;
+  if (now - livePreview.lastSent < livePreview.frameMs) {
+    schedulePreview();
+    return;
+  }
+  const body = livePreview.pending;
+  livePreview.pending = {};
+  livePreview.lastSent = now;
+  livePreview.inflight = fetch('/api/preview', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body)
+  })
+    .then(r => {
+      const budget = parseFloat(r.headers.get('X-Frame-Budget-Ms'));
+      if (budget > 0) livePreview.frameMs = budget;
+    })
+    .catch(() => {})
+    .finally(() => {
+      livePreview.inflight = null;
+      schedulePreview();
+    });
+}
+
+// Relâchement : la valeur finale part par la route normale, après la prévisualisation en cours
+function commitPreview(kind, send) {
+  delete livePreview.pending[kind];
+  Promise.resolve(livePreview.inflight).then(send);
+}
+
+// API Calls
+function ledOn() {
+  fetch('/api/led/on', { method: 'POST' })
+    .then(r => r.json())
+    .then(data => {
+      showToast('✅ LEDs allumées');
+      updateEffectDisplay('Aucun');
+    })
+    .catch(() => showToast('❌ Erreur de connexion'));
+}
+
+function ledOff() {
+  fetch('/api/led/off', { method: 'POST' })
+    .then(r => r.json())
+    .then(data => {
+      showToast('✅ LEDs éteintes');
+      updateEffectDisplay('Aucun');
+    })
+    .catch(() => showToast('❌ Erreur de connexion'));
+}
+
+function ledWhite() {
+  fetch('/api/led/white', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ brightness: 255 })
+  })
+    .then(r => r.json())
+    .then(data => {
+      showToast('✅ Blanc activé');
+      updateColorDisplay(255, 255, 255);
+      updateEffectDisplay('Aucun');
+    })
+    .catch(() => showToast('❌ Erreur de connexion'));
+}
+
+function setColor(r, g, b) {
+  fetch('/api/led/color', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ r, g, b })
+  })
+    .then(r => r.json())
+    .then(data => {
+      showToast('✅ Couleur appliquée');
+      updateColorDisplay(r, g, b);
+      updateEffectDisplay('Aucun');
+    })
+    .catch(() => showToast('❌ Erreur de connexion'));
+}
+
+function setColorFromPicker() {
+  const hex = document.getElementById('color-picker').value;
+  const r = parseInt(hex.slice(1, 3), 16);
+  const g = parseInt(hex.slice(3, 5), 16);
+  const b = parseInt(hex.slice(5, 7), 16);
+  setColor(r, g, b);
+}
+
+function setBrightness(value) {
+  fetch('/api/led/brightness', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ brightness: parseInt(value) })
+  })
+    .then(r => r.json())
+    .then(data => {
+      showToast('✅ Luminosité ajustée');
+      updateBrightnessDisplay(value);
+    })
+    .catch(() => showToast('❌ Erreur de connexion'));
+}
+
+function startEffect(effect) {
+  const effectNames = {
+    rainbow: 'Arc-en-ciel 🌈',
+    breathing: 'Respiration 💨',
+    strobe: 'Stroboscope ⚡',
+    police: 'Sirène Police 🚨',
+    aurora: 'Aurores 🌌'
+  };
+
+  fetch(`/api/effect/${effect}`, { method: 'POST' })
+    .then(r => r.json())
+    .then(data => {
+      showToast('✅ Effet lancé');
+      updateEffectDisplay(effectNames[effect] || effect);
+    })
+    .catch(() => showToast('❌ Erreur de connexion'));
+}
+
+function stopEffect() {
+  fetch('/api/effect/stop', { method: 'POST' })
+    .then(r => r.json())
+    .then(data => {
+      showToast('✅ Effet arrêté');
+      updateEffectDisplay('Aucun');
+    })
+    .catch(() => showToast('❌ Erreur de connexion'));
+}
+
+function startFadeEffect() {
+  const speed = parseFloat(document.getElementById('speed-slider').value);
+  fetch('/api/effect/fade', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ speed })
+  })
+    .then(r => r.json())
+    .then(data => {
+      showToast('✅ Fondu lancé');
+      updateEffectDisplay('Fondu 🎨');
+    })
+    .catch(() => showToast('❌ Erreur de connexion'));
+}
+
+function startWaveEffect() {
+  const speed = parseFloat(document.getElementById('speed-slider').value);
+  fetch('/api/effect/wave', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ speed })
+  })
+    .then(r => r.json())
+    .then(data => {
+      showToast('✅ Vague lancée');
+      updateEffectDisplay('Vague 🌊');
+    })
+    .catch(() => showToast('❌ Erreur de connexion'));
+}
+
+function startBlinkEffect() {
+  const speed = parseFloat(document.getElementById('speed-slider').value);
+  const count = parseInt(document.getElementById('blink-count-slider').value);
+  fetch('/api/effect/blink', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ count, speed })
+  })
+    .then(r => r.json())
+    .then(data => {
+      showToast(`✅ Clignotement lancé (${count}x)`);
+      updateEffectDisplay(`Clignotement 💫 (${count}x)`);
+    })
+    .catch(() => showToast('❌ Erreur de connexion'));
+}
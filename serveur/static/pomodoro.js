@@ -0,0 +1,397 @@
+let isRunning = false;
+let currentPhase = 'work'; // 'work' ou 'break'
+let currentCycle = 0;
+let totalCycles = 4;
+let remainingSeconds = 0;
+let workMinutes = 25;
+let breakMinutes = 5;
+
+// SSE (Server-Sent Events) pour synchronisation
+let eventSource = null;
+let useSyncMode = true; // Mode synchronisé avec le serveur
+
+// Barre de progression circulaire
+let progressRing = null;
+let radius = 190;
+let circumference = 0;
+
+// Initialiser la barre circulaire après le chargement du DOM
+function initCircularProgress() {
+  progressRing = document.getElementById('progress-ring');
+
+  // Adapter le rayon selon la taille d'écran
+  if (window.innerWidth <= 768) {
+    radius = 150;
+    // Mettre à jour le SVG pour mobile
+    const svg = progressRing.closest('svg');
+    svg.setAttribute('width', '320');
+    svg.setAttribute('height', '320');
+
+    const circles = svg.querySelectorAll('circle');
+    circles.forEach(circle => {
+      circle.setAttribute('cx', '160');
+      circle.setAttribute('cy', '160');
+      circle.setAttribute('r', '150');
+    });
+  }
+
+  circumference = 2 * Math.PI * radius;
+  progressRing.style.strokeDasharray = `${circumference} ${circumference}`;
+  progressRing.style.strokeDashoffset = circumference;
+}
+
+// Audio Context pour les sons
+let audioContext = null;
+
+// Initialiser l'AudioContext (nécessite une interaction utilisateur)
+function initAudio() {
+  if (!audioContext) {
+    audioContext = new (window.AudioContext || window.webkitAudioContext)();
+    console.log("[AUDIO] AudioContext initialisé");
+  }
+}
+
+// Fonction pour jouer un bip
+function playBeep(frequency = 440, duration = 200, type = 'sine') {
+  initAudio();
+
+  const oscillator = audioContext.createOscillator();
+  const gainNode = audioContext.createGain();
+
+  oscillator.connect(gainNode);
+  gainNode.connect(audioContext.destination);
+
+  oscillator.frequency.value = frequency;
+  oscillator.type = type;
+
+  gainNode.gain.setValueAtTime(0.3, audioContext.currentTime);
+  gainNode.gain.exponentialRampToValueAtTime(0.01, audioContext.currentTime + duration / 1000);
+
+  oscillator.start(audioContext.currentTime);
+  oscillator.stop(audioContext.currentTime + duration / 1000);
+}
+
+// Sons spécifiques
+function playWorkEndSound() {
+  // Mélodie ascendante (fin de travail = pause méritée)
+  playBeep(523, 150); // Do
+  setTimeout(() => playBeep(659, 150), 150); // Mi
+  setTimeout(() => playBeep(784, 300), 300); // Sol
+  console.log("[AUDIO] Son fin de travail joué");
+}
+
+function playBreakEndSound() {
+  // Mélodie simple (retour au travail)
+  playBeep(659, 200); // Mi
+  setTimeout(() => playBeep(523, 200), 200); // Do
+  console.log("[AUDIO] Son fin de pause joué");
+}
+
+function playSessionCompleteSound() {
+  // Mélodie de victoire
+  playBeep(523, 100); // Do
+  setTimeout(() => playBeep(659, 100), 100); // Mi
+  setTimeout(() => playBeep(784, 100), 200); // Sol
+  setTimeout(() => playBeep(1047, 400), 300); // Do aigu
+  console.log("[AUDIO] Son session terminée joué");
+}
+
+function updateStatus(msg, success = true) {
+  const statusEl = document.getElementById("status");
+  statusEl.innerText = msg;
+  statusEl.style.background = success
+    ? "rgba(76, 175, 80, 0.3)"
+    : "rgba(244, 67, 54, 0.3)";
+  setTimeout(() => {
+    statusEl.style.background = "rgba(255, 255, 255, 0.1)";
+  }, 3000);
+}
+
+function updateWorkDisplay(value) {
+  workMinutes = parseInt(value);
+  document.getElementById("work-value").innerText = value + " min";
+  if (!isRunning && currentPhase === 'work') {
+    remainingSeconds = workMinutes * 60;
+    updateTimerDisplay();
+  }
+}
+
+function updateBreakDisplay(value) {
+  breakMinutes = parseInt(value);
+  document.getElementById("break-value").innerText = value + " min";
+  if (!isRunning && currentPhase === 'break') {
+    remainingSeconds = breakMinutes * 60;
+    updateTimerDisplay();
+  }
+}
+
+function updateCyclesDisplay(value) {
+  totalCycles = parseInt(value);
+  document.getElementById("cycles-value").innerText = value;
+  updateCycleInfo();
+}
+
+function updateTimerDisplay() {
+  const minutes = Math.floor(remainingSeconds / 60);
+  const seconds = remainingSeconds % 60;
+  const display = `${String(minutes).padStart(2, '0')}:${String(seconds).padStart(2, '0')}`;
+  document.getElementById("timer-display").innerText = display;
+
+  // Mettre à jour la barre circulaire
+  updateCircularProgress();
+}
+
+function updateCircularProgress() {
+  // Calculer le pourcentage de progression
+  const totalSeconds = currentPhase === 'work' ? workMinutes * 60 : breakMinutes * 60;
+  const progress = remainingSeconds / totalSeconds;
+  const offset = circumference * (1 - progress);
+
+  // Mettre à jour le cercle
+  progressRing.style.strokeDashoffset = offset;
+
+  // Changer la couleur selon la phase
+  if (currentPhase === 'work') {
+    progressRing.classList.remove('break');
+    progressRing.classList.add('work');
+  } else {
+    progressRing.classList.remove('work');
+    progressRing.classList.add('break');
+  }
+}
+
+function updatePhaseIndicator() {
+  const phaseEl = document.getElementById("phase-indicator");
+  if (currentPhase === 'work') {
+    phaseEl.innerText = `🎯 Phase de travail`;
+    phaseEl.className = "phase-indicator phase-work";
+  } else {
+    phaseEl.innerText = `☕ Phase de pause`;
+    phaseEl.className = "phase-indicator phase-break";
+  }
+}
+
+function updateCycleInfo() {
+  document.getElementById("cycle-info").innerText = `Cycle ${currentCycle}/${totalCycles}`;
+}
+
+// Connexion au flux SSE pour synchronisation
+let lastPhase = null;
+let lastRemainingSeconds = null;
+let sessionJustCompleted = false;
+
+function connectSSE() {
+  if (eventSource) {
+    eventSource.close();
+  }
+
+  console.log("[SSE] Connexion au stream Pomodoro...");
+  eventSource = new EventSource('/api/pomodoro/stream');
+
+  eventSource.onmessage = (event) => {
+    const data = JSON.parse(event.data);
+
+    // Détecter les changements de phase pour jouer les sons
+    const phaseChanged = lastPhase !== null && lastPhase !== data.phase;
+    const justFinishedWork = phaseChanged && lastPhase === 'work' && data.phase === 'break';
+    const justFinishedBreak = phaseChanged && lastPhase === 'break' && data.phase === 'work';
+
+    // Détecter la fin de session
+    const wasRunning = isRunning;
+    const nowStopped = !data.is_running && wasRunning;
+
+    // Mettre à jour l'état depuis le serveur
+    isRunning = data.is_running;
+    currentPhase = data.phase;
+    currentCycle = data.current_cycle;
+    totalCycles = data.total_cycles;
+    remainingSeconds = data.remaining_seconds;
+    workMinutes = data.work_minutes;
+    breakMinutes = data.break_minutes;
+
+    // Jouer les sons lors des transitions
+    if (justFinishedWork) {
+      playWorkEndSound();
+      updateStatus(`✅ Phase de travail terminée ! Pause de ${breakMinutes} min.`);
+    } else if (justFinishedBreak) {
+      playBreakEndSound();
+      updateStatus(`✅ Pause terminée ! Cycle ${currentCycle}/${totalCycles} - Travail de ${workMinutes} min.`);
+    }
+
+    // Détecter la fin de toute la session
+    if (nowStopped && currentCycle === 0 && !sessionJustCompleted) {
+      playSessionCompleteSound();
+      updateStatus("🎉 Session Pomodoro terminée ! Bravo !");
+      sessionJustCompleted = true;
+      setTimeout(() => { sessionJustCompleted = false; }, 2000);
+    }
+
+    // Sauvegarder l'état pour la prochaine itération
+    lastPhase = data.phase;
+    lastRemainingSeconds = remainingSeconds;
+
+    // Mettre à jour l'affichage
+    updateTimerDisplay();
+    updatePhaseIndicator();
+    updateCycleInfo();
+
+    // Ajouter l'animation si en cours
+    const timerDisplayEl = document.getElementById("timer-display");
+    if (isRunning && remainingSeconds > 0) {
+      timerDisplayEl.classList.add("timer-running");
+    } else {
+      timerDisplayEl.classList.remove("timer-running");
+    }
+
+    // Vérifier si la session est terminée
+    if (!isRunning && currentCycle === 0 && remainingSeconds === 0) {
+      // Session terminée ou arrêtée
+      document.getElementById("btn-start").disabled = false;
+      document.getElementById("btn-stop").disabled = true;
+      document.getElementById("work-slider").disabled = false;
+      document.getElementById("break-slider").disabled = false;
+      document.getElementById("cycles-slider").disabled = false;
+    }
+  };
+
+  eventSource.onerror = (error) => {
+    console.error("[SSE] Erreur de connexion:", error);
+    eventSource.close();
+    eventSource = null;
+
+    // Réessayer dans 5 secondes
+    setTimeout(() => {
+      if (isRunning) {
+        connectSSE();
+      }
+    }, 5000);
+  };
+}
+
+// Cette fonction n'est plus nécessaire avec SSE, mais gardée pour compatibilité
+function finishPomodoro() {
+  updateStatus("🎉 Session Pomodoro terminée ! Bravo !");
+}
+
+function startPomodoro() {
+  if (isRunning) return;
+
+  // Initialiser l'audio au premier clic (requis par les navigateurs)
+  initAudio();
+
+  document.getElementById("btn-start").disabled = true;
+  document.getElementById("btn-stop").disabled = false;
+
+  // Désactiver les sliders pendant l'exécution
+  document.getElementById("work-slider").disabled = true;
+  document.getElementById("break-slider").disabled = true;
+  document.getElementById("cycles-slider").disabled = true;
+
+  updateStatus(`🍅 Démarrage Pomodoro (${totalCycles} cycles de ${workMinutes}/${breakMinutes} min)...`);
+
+  // Se connecter au stream SSE pour la synchronisation
+  connectSSE();
+
+  // Réinitialiser les indicateurs de phase
+  lastPhase = null;
+  sessionJustCompleted = false;
+
+  // Lancer le Pomodoro côté serveur (LEDs + timer)
+  fetch("/api/effect/pomodoro", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      work_minutes: workMinutes,
+      break_minutes: breakMinutes,
+      cycles: totalCycles
+    })
+  })
+    .then((r) => r.json())
+    .then((data) => {
+      updateStatus("✅ " + data.message + " (synchronisé avec le serveur)");
+      isRunning = true;
+    })
+    .catch((error) => {
+      console.error("Erreur lors du démarrage:", error);
+      updateStatus("❌ Erreur de connexion au serveur", false);
+      stopPomodoro();
+    });
+}
+
+function stopPomodoro() {
+  if (!isRunning) return;
+
+  isRunning = false;
+
+  // Fermer la connexion SSE
+  if (eventSource) {
+    eventSource.close();
+    eventSource = null;
+    console.log("[SSE] Connexion fermée");
+  }
+
+  const timerDisplayEl = document.getElementById("timer-display");
+  timerDisplayEl.classList.remove("timer-running");
+
+  document.getElementById("btn-start").disabled = false;
+  document.getElementById("btn-stop").disabled = true;
+
+  // Réactiver les sliders
+  document.getElementById("work-slider").disabled = false;
+  document.getElementById("break-slider").disabled = false;
+  document.getElementById("cycles-slider").disabled = false;
+
+  // Réinitialiser l'affichage
+  currentCycle = 0;
+  currentPhase = 'work';
+  remainingSeconds = workMinutes * 60;
+  updateCycleInfo();
+  updatePhaseIndicator();
+  updateTimerDisplay();
+
+  // Arrêter l'effet côté serveur
+  fetch("/api/effect/stop", { method: "POST" })
+    .then((r) => r.json())
+    .then((data) => {
+      updateStatus("⏹️ Session Pomodoro arrêtée");
+    })
+    .catch(() => updateStatus("❌ Erreur lors de l'arrêt", false));
+}
+
+// Initialisation
+document.addEventListener('DOMContentLoaded', () => {
+  initCircularProgress();
+});
+
+// Initialiser immédiatement si le DOM est déjà chargé
+if (document.readyState === 'loading') {
+  document.addEventListener('DOMContentLoaded', initCircularProgress);
+} else {
+  initCircularProgress();
+}
+
+updateTimerDisplay();
+updateCycleInfo();
+updatePhaseIndicator();
+
+// Gestion de la fermeture de la page
+window.addEventListener('beforeunload', (e) => {
+  // Fermer la connexion SSE
+  if (eventSource) {
+    eventSource.close();
+    eventSource = null;
+  }
+
+  if (isRunning) {
+    // Arrêter le serveur avant de fermer
+    fetch("/api/effect/stop", { method: "POST", keepalive: true });
+
+    // Demander confirmation
+    e.preventDefault();
+    e.returnValue = 'Session Pomodoro en cours. Voulez-vous vraiment quitter ?';
+    return e.returnValue;
+  }
+});
+
+// Log de debug pour le développement
+console.log("[POMODORO] Page initialisée avec succès (mode SSE activé)");
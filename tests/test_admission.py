@@ -0,0 +1,90 @@
+# test_admission.py - Seaux à jetons, refus 429 et fusion des requêtes refusées
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'serveur'))
+
+import led_admission  # noqa: E402
+from led_admission import AdmissionController  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(led_admission, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def controller():
+    # Lien à 10 écritures/s : 5/s et 5 en rafale par client
+    return AdmissionController(lambda: 10.0, client_share=0.5, client_burst=5)
+
+
+def test_client_burst_then_refill(clock, controller):
+    for _ in range(5):
+        assert controller.admit('a', '/api/led/color') == 0.0
+    wait = controller.admit('a', '/api/led/color')
+    assert wait == pytest.approx(0.2)
+    clock.now += 0.2
+    assert controller.admit('a', '/api/led/color') == 0.0
+    assert controller.counters['admitted'] == 6
+    assert controller.counters['limited'] == 1
+
+
+def test_route_bucket_shared_between_clients(clock, controller):
+    for client in ('a', 'b'):
+        for _ in range(5):
+            assert controller.admit(client, '/api/led/color') == 0.0
+    # Seau de la route (10 jetons) vide : un troisième client attend aussi
+    assert controller.admit('c', '/api/led/color') == pytest.approx(0.1)
+    # Autre route : seaux indépendants
+    assert controller.admit('c', '/api/led/brightness') == 0.0
+
+
+def test_cost_above_burst_is_admitted_once_full(clock, controller):
+    assert controller.admit('a', '/api/effect/timeline', cost=20) == 0.0
+    assert controller.admit('a', '/api/effect/timeline', cost=20) > 0
+
+
+def test_refused_request_does_not_consume(clock, controller):
+    for _ in range(5):
+        controller.admit('a', '/api/led/color')
+    for _ in range(3):
+        assert controller.admit('a', '/api/led/color') == pytest.approx(0.2)
+
+
+def test_coalesce_replays_latest_once(controller):
+    replayed = []
+    done = threading.Event()
+
+    def replay(value):
+        def run():
+            replayed.append(value)
+            done.set()
+        return run
+
+    for value in (1, 2, 3):
+        controller.coalesce(('a', '/api/led/color'), replay(value), 0.05)
+    assert done.wait(2)
+    assert replayed == [3]
+    assert controller.counters['coalesced'] == 3
+    assert controller.counters['flushed'] == 1
+    assert controller.pending == {}
+
+
+@pytest.mark.parametrize('wait, header', [(0.01, '1'), (0.2, '1'), (1.0, '1'), (2.1, '3')])
+def test_retry_after(wait, header):
+    assert AdmissionController.retry_after(wait) == header
@@ -0,0 +1,77 @@
+# test_cron.py - Prochaine échéance des expressions cron et du lever/coucher du soleil
+import datetime
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'serveur'))
+
+from led_cron import CronError, CronExpression, OneShot, SunSchedule  # noqa: E402
+
+
+def local(*fields):
+    """Horodatage Unix d'une date/heure locale"""
+    return time.mktime(datetime.datetime(*fields).timetuple())
+
+
+def next_run(expression, *fields):
+    return datetime.datetime.fromtimestamp(CronExpression(expression).next_after(local(*fields)))
+
+
+def test_step_minutes():
+    assert next_run('*/15 * * * *', 2026, 10, 19, 10, 7) == datetime.datetime(2026, 10, 19, 10, 15)
+    assert next_run('*/15 * * * *', 2026, 10, 19, 10, 45) == datetime.datetime(2026, 10, 19, 11, 0)
+
+
+def test_next_is_strictly_after():
+    assert next_run('30 6 * * *', 2026, 10, 19, 6, 30) == datetime.datetime(2026, 10, 20, 6, 30)
+
+
+def test_day_of_month_or_day_of_week_when_both_restricted():
+    # Le 13 OU un vendredi
+    assert next_run('0 0 13 * 5', 2026, 10, 10, 12, 0) == datetime.datetime(2026, 10, 13)
+    assert next_run('0 0 13 * fri', 2026, 10, 13, 12, 0) == datetime.datetime(2026, 10, 16)
+
+
+def test_day_of_week_alone_restricts():
+    assert next_run('0 0 * * 5', 2026, 10, 10, 12, 0) == datetime.datetime(2026, 10, 16)
+    # 7 = dimanche, comme 0
+    assert next_run('0 0 * * 7', 2026, 10, 10, 12, 0) == datetime.datetime(2026, 10, 11)
+
+
+def test_month_rollover():
+    # Avril n'a que 30 jours : le 31 suivant est en mai
+    assert next_run('30 6 31 * *', 2026, 4, 30, 12, 0) == datetime.datetime(2026, 5, 31, 6, 30)
+    assert next_run('@yearly', 2026, 12, 31, 23, 59) == datetime.datetime(2027, 1, 1)
+    assert next_run('0 0 29 feb *', 2026, 3, 1) == datetime.datetime(2028, 2, 29)
+
+
+def test_ranges_and_lists():
+    assert next_run('0 8-9,18 * * mon-fri', 2026, 10, 16, 9, 30) == datetime.datetime(2026, 10, 16, 18, 0)
+    assert next_run('0 8-9,18 * * mon-fri', 2026, 10, 16, 18, 30) == datetime.datetime(2026, 10, 19, 8, 0)
+
+
+@pytest.mark.parametrize('expression', ['* * * *', '60 * * * *', '0 0 0 * *', '*/0 * * * *', '0 0 * * xyz'])
+def test_invalid_expressions(expression):
+    with pytest.raises(CronError):
+        CronExpression(expression)
+
+
+def test_one_shot():
+    schedule = OneShot('2026-10-19T07:00:00')
+    assert schedule.next_after(local(2026, 10, 19, 6)) == local(2026, 10, 19, 7)
+    assert schedule.next_after(local(2026, 10, 19, 7)) is None
+
+
+def test_sun_schedule():
+    # Paris : lever avant le coucher, environ 12 h d'écart à l'équinoxe
+    sunrise = SunSchedule('sunrise', 0, 48.85, 2.35).next_after(local(2026, 3, 20))
+    sunset = SunSchedule('sunset', 0, 48.85, 2.35).next_after(sunrise)
+    assert 11.5 * 3600 < sunset - sunrise < 12.7 * 3600
+    shifted = SunSchedule('sunrise', -30, 48.85, 2.35).next_after(local(2026, 3, 20))
+    assert shifted == pytest.approx(sunrise - 1800, abs=120)
+    with pytest.raises(CronError):
+        SunSchedule('sunrise', 0, None, None)
@@ -0,0 +1,88 @@
+# test_planificateur.py - Rattrapage des échéances manquées et actions du planificateur
+import datetime
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'serveur'))
+
+from led_planificateur import JobError, Scheduler, compile_action  # noqa: E402
+
+HOURLY = {'cron': '0 * * * *', 'action': {'power': True}}
+
+
+def local(*fields):
+    return time.mktime(datetime.datetime(*fields).timetuple())
+
+
+class FakeLoop:
+    """Boucle asyncio factice : les réarmements sont ignorés"""
+
+    def call_soon_threadsafe(self, callback, *args):
+        pass
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    return Scheduler(tmp_path / 'planning.json', run=lambda calls: 200, grace=60)
+
+
+def test_plan_counts_missed_runs(scheduler):
+    job = scheduler.compile('hourly', HOURLY, local(2026, 10, 19, 9, 30))
+    scheduler.jobs['hourly'] = job
+    scheduler._plan(job, local(2026, 10, 19, 12, 30))
+    # 10:00, 11:00 et 12:00 manquées (au-delà de la tolérance), prochaine à 13:00
+    assert job.missed == 3
+    assert scheduler.counters['missed'] == 3
+    assert job.next_run == local(2026, 10, 19, 13)
+    assert job.checked_at == local(2026, 10, 19, 12)
+    assert scheduler.heap == [(job.next_run, job.generation, 'hourly')]
+
+
+def test_plan_within_grace_is_not_missed(scheduler):
+    job = scheduler.compile('hourly', HOURLY, local(2026, 10, 19, 11, 30))
+    scheduler._plan(job, local(2026, 10, 19, 12, 0, 30))
+    assert job.missed == 0
+    assert job.next_run == local(2026, 10, 19, 12)
+
+
+def test_disabled_job_is_not_queued(scheduler):
+    job = scheduler.compile('hourly', {**HOURLY, 'enabled': False}, local(2026, 10, 19, 9, 30))
+    scheduler._plan(job, local(2026, 10, 19, 9, 45))
+    assert job.next_run is None
+    assert scheduler.heap == []
+
+
+def test_replaced_job_leaves_stale_entry(scheduler):
+    scheduler.loop = FakeLoop()
+    scheduler.save('hourly', HOURLY)
+    old = scheduler.heap[0]
+    scheduler.save('hourly', {**HOURLY, 'cron': '30 * * * *'})
+    assert scheduler._stale(old)
+    scheduler.delete('hourly')
+    assert all(scheduler._stale(entry) for entry in scheduler.heap)
+
+
+def test_save_persists_and_reloads(tmp_path):
+    path = tmp_path / 'planning.json'
+    Scheduler(path, run=lambda calls: 200).save('hourly', HOURLY)
+    reloaded = Scheduler(path, run=lambda calls: 200)
+    assert list(reloaded.jobs) == ['hourly']
+
+
+def test_compile_action_forwards_target():
+    calls = compile_action({'effect': 'rainbow', 'params': {'speed': 2}, 'target': 'salon'}, lambda path: True)
+    assert calls == [('/api/effect/rainbow', {'speed': 2, 'target': 'salon'})]
+    calls = compile_action({'power': True, 'brightness': 40, 'target': 'salon'}, lambda path: True)
+    assert calls == [('/api/led/on', {'target': 'salon'}),
+                     ('/api/led/brightness', {'brightness': 40, 'target': 'salon'})]
+
+
+@pytest.mark.parametrize('action', [None, {}, {'scene': '../x'}, {'scene': 'a', 'power': True},
+                                    {'color': [1, 2]}])
+def test_compile_action_rejects(action):
+    with pytest.raises(JobError):
+        compile_action(action, lambda path: True)
@@ -0,0 +1,79 @@
+# test_singleflight.py - Déduplication : une commande intermédiaire rend le résultat précédent caduc
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+os.environ['LED_SIMULATION'] = 'true'
+os.environ['LOG_LEVEL'] = 'WARNING'
+os.environ['ADMISSION_ENABLED'] = 'false'
+os.environ['SINGLE_FLIGHT_WINDOW_MS'] = '5000'
+os.environ['SCENES_FILE'] = os.path.join(tempfile.mkdtemp(), 'scenes.json')
+os.environ['SCHEDULE_FILE'] = os.path.join(tempfile.mkdtemp(), 'planning.json')
+sys.path.insert(0, str(Path(__file__).parent.parent / 'serveur'))
+
+import led_serveur  # noqa: E402
+from led_singleflight import SingleFlight  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def client():
+    led_serveur.pool.start()
+    yield led_serveur.app.test_client()
+    led_serveur.halt_effect()
+
+
+def effect_running():
+    thread = led_serveur.current_effect_thread
+    return thread is not None and thread.is_alive() and not led_serveur.stop_effect
+
+
+def test_start_stop_start_restarts_effect(client):
+    first = client.post('/api/effect/police', json={})
+    assert first.status_code == 200
+    assert 'X-Deduplicated' not in first.headers
+    assert effect_running()
+
+    assert client.post('/api/effect/stop').status_code == 200
+    assert not effect_running()
+
+    again = client.post('/api/effect/police', json={})
+    assert again.status_code == 200
+    assert 'X-Deduplicated' not in again.headers
+    time.sleep(0.1)
+    assert effect_running()
+
+
+def test_duplicate_without_intermediate_command_is_shared(client):
+    client.post('/api/effect/stop')
+    first = client.post('/api/effect/police', json={})
+    duplicate = client.post('/api/effect/police', json={})
+    assert 'X-Deduplicated' not in first.headers
+    assert duplicate.headers.get('X-Deduplicated') == 'true'
+    assert effect_running()
+
+
+def test_invalidate_drops_recent_results():
+    flight = SingleFlight(window=60)
+    role, call = flight.begin('a')
+    assert role == 'leader'
+    flight.finish('a', call, (200, [], b'{}'))
+    assert flight.begin('a')[0] == 'shared'
+    flight.invalidate()
+    assert flight.begin('a')[0] == 'leader'
+
+
+def test_admission_refusal_is_not_reused(client, monkeypatch):
+    monkeypatch.setattr(led_serveur, 'ADMISSION_ENABLED', True)
+    waits = iter([1.0])
+    monkeypatch.setattr(led_serveur.admission, 'admit', lambda *args: next(waits, 0.0))
+    monkeypatch.setattr(led_serveur.admission, 'retry_after', lambda wait: '1')
+
+    refused = client.post('/api/led/on', json={})
+    assert refused.status_code == 429
+    admitted = client.post('/api/led/on', json={})
+    assert admitted.status_code == 200
+    assert 'X-Deduplicated' not in admitted.headers